@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+"""Compare ways of reading commits when the history is first loaded.
+
+Workers cannot hand commit objects to the main thread, since those belong
+to the workers’ repository handles. They read subjects and messages
+instead, and the objects of the loader’s handle are either looked up
+right away or only when an update needs them (lazy commits).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+from gi.repository import Ggit
+from gi.repository import Gio
+
+from nonemast.cache_manager import caches
+from nonemast.git_utils import ThreadRepositories
+from nonemast.history import (
+    CommitHydrator,
+    CommitSubjectCache,
+    CommitText,
+    ReviewRange,
+    load_update_groups,
+    lookup_update_commits,
+)
+from synthetic_repo import BASE_TAG, create_synthetic_repo
+
+REVIEW_RANGE = ReviewRange(base_revspec=BASE_TAG)
+
+
+def serial_lazy(repo_path: Gio.File, executor: ThreadPoolExecutor) -> None:
+    repo = Ggit.Repository.open(repo_path)
+    read_texts: dict[str, CommitText] = {}
+    groups = load_update_groups(
+        repo,
+        REVIEW_RANGE,
+        subjects=CommitSubjectCache(),
+        read_texts=read_texts,
+    )
+    lookup_update_commits(repo, groups, read_texts)
+
+
+def parallel_then_lookup(repo_path: Gio.File, executor: ThreadPoolExecutor) -> None:
+    repo = Ggit.Repository.open(repo_path)
+    # Fresh handles, so that the workers do not find the commits in their object caches.
+    hydrator = CommitHydrator(ThreadRepositories(repo_path), executor)
+    groups = load_update_groups(
+        repo,
+        REVIEW_RANGE,
+        subjects=CommitSubjectCache(),
+        hydrator=hydrator,
+    )
+    # Without the texts, every commit is looked up again.
+    lookup_update_commits(repo, groups)
+
+
+def parallel_lazy(repo_path: Gio.File, executor: ThreadPoolExecutor) -> None:
+    repo = Ggit.Repository.open(repo_path)
+    hydrator = CommitHydrator(ThreadRepositories(repo_path), executor)
+    read_texts: dict[str, CommitText] = {}
+    groups = load_update_groups(
+        repo,
+        REVIEW_RANGE,
+        subjects=CommitSubjectCache(),
+        hydrator=hydrator,
+        read_texts=read_texts,
+    )
+    lookup_update_commits(repo, groups, read_texts)
+
+
+def measure(
+    function: Callable[[Gio.File, ThreadPoolExecutor], None],
+    repo_path: Gio.File,
+    repeat: int,
+) -> float:
+    def run() -> None:
+        # Parsed messages would otherwise be warm after the first run.
+        caches.clear()
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            function(repo_path, executor)
+
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    # The history loader stops after 500 commits.
+    parser.add_argument("--updates", type=int, default=400)
+    parser.add_argument("--reviewed", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "repo"
+        create_synthetic_repo(path, args.updates, args.reviewed)
+        repo_path = Gio.File.new_for_path(str(path))
+
+        print(f"{'approach':<36} {'time ms':>9}")
+        for name, function in [
+            ("serial, lazy commits", serial_lazy),
+            ("parallel, then lookup", parallel_then_lookup),
+            ("parallel, lazy commits", parallel_lazy),
+        ]:
+            elapsed_s = measure(function, repo_path, args.repeat)
+            print(f"{name:<36} {elapsed_s * 1000:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+import subprocess
+
+# Tag marking the commit before the updates, to be passed to --base-commit.
+BASE_TAG = "benchmark-base"
+
+COMMITTER = "Tester <test@example.com>"
+
+PACKAGE_TEMPLATE = """{{ lib, stdenv, fetchurl, meson, ninja }}:
+
+stdenv.mkDerivation rec {{
+  pname = "pkg{index}";
+  version = "{version}";
+
+  src = fetchurl {{
+    url = "mirror://gnome/sources/pkg{index}/${{lib.versions.majorMinor version}}/pkg{index}-${{version}}.tar.xz";
+    hash = "sha256-{hash}";
+  }};
+
+  nativeBuildInputs = [
+    meson
+    ninja
+  ];
+}}
+"""
+
+
+def _data(text: str) -> str:
+    encoded = text.encode("utf-8")
+    return f"data {len(encoded)}\n{text}\n"
+
+
+def _commit(message: str, timestamp: int, files: dict[str, str]) -> str:
+    command = f"commit refs/heads/gnome\ncommitter {COMMITTER} {timestamp} +0000\n"
+    command += _data(message)
+    for path, content in files.items():
+        command += f"M 644 inline {path}\n" + _data(content)
+    return command + "\n"
+
+
+def create_synthetic_repo(path: Path, n_updates: int, n_reviewed: int) -> None:
+    """Create a repository resembling a GNOME update branch.
+
+    Contains n_updates version bumps on top of a base commit tagged BASE_TAG,
+    followed by n_reviewed empty squash commits marking some of them as reviewed.
+    """
+    subprocess.run(
+        ["git", "init", "--quiet", "--initial-branch=gnome", str(path)],
+        check=True,
+    )
+
+    def package(index: int, version: str) -> dict[str, str]:
+        return {
+            f"pkgs/pkg{index}/default.nix": PACKAGE_TEMPLATE.format(
+                index=index,
+                version=version,
+                hash=f"{index:043d}=",
+            )
+        }
+
+    timestamp = 1700000000
+    base_files: dict[str, str] = {}
+    for index in range(n_updates):
+        base_files.update(package(index, "1.0"))
+    stream = _commit("base", timestamp, base_files)
+    stream += f"reset refs/tags/{BASE_TAG}\nfrom refs/heads/gnome\n\n"
+
+    for index in range(n_updates):
+        timestamp += 60
+        message = (
+            f"pkg{index}: 1.0 → 1.2\n\n"
+            f"https://gitlab.gnome.org/GNOME/pkg{index}/-/compare/1.0...1.2\n"
+        )
+        stream += _commit(message, timestamp, package(index, "1.2"))
+
+    for index in range(n_reviewed):
+        timestamp += 60
+        message = (
+            f"squash! pkg{index}: 1.0 → 1.2\n\n"
+            f"Changelog-Reviewed-By: Reviewer {index % 5} <reviewer{index % 5}@example.com>\n"
+        )
+        stream += _commit(message, timestamp, {})
+
+    subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        input=stream,
+        encoding="utf-8",
+        cwd=path,
+        check=True,
+    )
+    subprocess.run(
+        ["git", "reset", "--quiet", "--hard", "gnome"],
+        cwd=path,
+        check=True,
+    )
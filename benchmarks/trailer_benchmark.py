@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+"""Compare trailer parsing of accumulating update messages.
+
+Each commit added to an update used to re-scan all lines of the joined message
+for reviewers and the changelog link, and co-authors were found by running
+a regex over the final message. The trailer parser handles each commit message
+once and caches the result.
+"""
+
+from typing import Callable, Optional
+import argparse
+import re
+import sys
+import timeit
+
+from nonemast.cache_manager import caches
+from nonemast.trailers import CHANGELOG_REVIEWED_BY, CO_AUTHORED_BY, parse_message
+
+CO_AUTHORED_BY_REGEX = re.compile(
+    r"^Co-authored-by: *(.+) *$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def get_changelog_reviewer(line: str) -> Optional[str]:
+    if (match := re.match(r"^Changelog-Reviewed-By: (.+)$", line)) is not None:
+        return match.group(1).strip()
+    return None
+
+
+def find_changelog_link(lines: list[str]) -> Optional[str]:
+    for line in lines:
+        line = line.strip()
+        if line.startswith("https://"):
+            return line
+    return None
+
+
+def create_messages(n_updates: int, n_commits: int) -> list[list[str]]:
+    """Return messages of commits of each update, with a long changelog excerpt."""
+    body = "\n".join(f"- Fixed issue #{line}" for line in range(40))
+    updates = []
+    for index in range(n_updates):
+        messages = [
+            f"pkg{index}: 1.0 → 1.2\n\n{body}\n\n"
+            f"https://gitlab.gnome.org/GNOME/pkg{index}/-/compare/1.0...1.2\n\n"
+            f"Co-authored-by: Author {index} <author{index}@example.com>\n"
+        ]
+        for commit in range(1, n_commits):
+            messages.append(
+                f"squash! pkg{index}: 1.0 → 1.2\n\n"
+                f"Changelog-Reviewed-By: Reviewer {commit} <reviewer{commit}@example.com>\n"
+            )
+        updates.append(messages)
+    return updates
+
+
+def multi_pass(updates: list[list[str]]) -> None:
+    for messages in updates:
+        lines: list[str] = []
+        for message in messages:
+            lines += message.splitlines()
+            list(
+                dict.fromkeys(
+                    reviewer
+                    for line in lines
+                    if (reviewer := get_changelog_reviewer(line)) is not None
+                )
+            )
+            find_changelog_link(lines)
+        CO_AUTHORED_BY_REGEX.findall("\n".join(lines))
+
+
+def single_pass(updates: list[list[str]]) -> None:
+    for messages in updates:
+        parsed = []
+        for message in messages:
+            parsed.append(parse_message(message))
+            list(
+                dict.fromkeys(
+                    reviewer
+                    for message in parsed
+                    for reviewer in message.trailers.get_all(CHANGELOG_REVIEWED_BY)
+                )
+            )
+            next(
+                (
+                    message.changelog_link
+                    for message in parsed
+                    if message.changelog_link is not None
+                ),
+                None,
+            )
+        [
+            coauthor
+            for message in parsed
+            for coauthor in message.trailers.get_all(CO_AUTHORED_BY)
+        ]
+
+
+def measure(
+    function: Callable[[list[list[str]]], None], updates: list[list[str]], repeat: int
+) -> float:
+    return min(timeit.repeat(lambda: function(updates), number=1, repeat=repeat))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=400)
+    parser.add_argument("--commits", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    updates = create_messages(args.updates, args.commits)
+
+    multi_pass_s = measure(multi_pass, updates, args.repeat)
+    # The first run fills the cache, like loading the history.
+    cold_s = min(
+        timeit.repeat(
+            lambda: (caches.clear(), single_pass(updates)),
+            number=1,
+            repeat=args.repeat,
+        )
+    )
+    # Reloading the history finds the messages in the cache.
+    warm_s = measure(single_pass, updates, args.repeat)
+
+    print(f"{'approach':<22} {'time ms':>9}")
+    print(f"{'multi-pass':<22} {multi_pass_s * 1000:>9.1f}")
+    print(f"{'single-pass (cold)':<22} {cold_s * 1000:>9.1f}")
+    print(f"{'single-pass (cached)':<22} {warm_s * 1000:>9.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
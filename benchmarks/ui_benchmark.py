@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+"""Measure responsiveness of the main window on a synthetic repository.
+
+Starts the application on a headless GDK backend (Broadway by default),
+scripts scrolling through the update list, changing the selection and
+typing a search query, and records frame times and main loop stalls for
+each scenario. Results are compared with stored baselines, which have to
+be recorded on the measuring machine first.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic_repo import BASE_TAG, create_synthetic_repo
+
+# The history loader stops after 500 commits.
+DEFAULT_UPDATES = 400
+DEFAULT_REVIEWED = 100
+
+BROADWAY_DISPLAY = ":42"
+
+# Interval of the main loop heartbeat, a late heartbeat means the loop was blocked.
+HEARTBEAT_MS = 5
+# Blocking the main loop for longer than this drops frames.
+STALL_THRESHOLD_MS = 50
+# How long to wait for the window to load the commits.
+LOAD_TIMEOUT_S = 120
+
+# Metrics compared with baselines, lower is better for all of them.
+COMPARED_METRICS = ["frame_ms_p95", "frame_ms_max", "stall_ms_max"]
+# Differences smaller than this are considered noise regardless of tolerance.
+ABSOLUTE_SLACK_MS = 2.0
+
+# Generator performing one step of user interaction with the window each time it is resumed.
+Scenario = Callable[[Any], Iterator[None]]
+
+
+def start_headless_display() -> Optional[subprocess.Popen]:
+    """Start a Broadway server unless a GDK backend was chosen explicitly."""
+    if "GDK_BACKEND" in os.environ:
+        return None
+
+    broadwayd = shutil.which("gtk4-broadwayd")
+    if broadwayd is None:
+        sys.exit(
+            "error: gtk4-broadwayd not found, install it or set GDK_BACKEND to use another headless display."
+        )
+
+    server = subprocess.Popen(
+        [broadwayd, BROADWAY_DISPLAY],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    os.environ["GDK_BACKEND"] = "broadway"
+    os.environ["BROADWAY_DISPLAY"] = BROADWAY_DISPLAY
+    # Give the server time to open its socket.
+    time.sleep(0.5)
+    return server
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def summarize(frame_times_ms: list[float], stalls_ms: list[float]) -> dict[str, float]:
+    if len(frame_times_ms) == 0:
+        frame_times_ms = [0.0]
+    return {
+        "frames": len(frame_times_ms),
+        "frame_ms_p50": statistics.median(frame_times_ms),
+        "frame_ms_p95": percentile(frame_times_ms, 0.95),
+        "frame_ms_max": max(frame_times_ms),
+        "stalls": len(stalls_ms),
+        "stall_ms_max": max(stalls_ms, default=0.0),
+    }
+
+
+def find_regressions(
+    results: dict[str, dict[str, float]],
+    baselines: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    regressions = []
+    for scenario, metrics in results.items():
+        baseline = baselines.get(scenario, {})
+        for metric in COMPARED_METRICS:
+            if metric not in baseline:
+                regressions.append(f"{scenario}: {metric} has no baseline")
+                continue
+            limit = max(
+                baseline[metric] * (1 + tolerance),
+                baseline[metric] + ABSOLUTE_SLACK_MS,
+            )
+            if metrics[metric] > limit:
+                regressions.append(
+                    f"{scenario}: {metric} {metrics[metric]:.1f} ms exceeds baseline {baseline[metric]:.1f} ms"
+                )
+    return regressions
+
+
+def format_results(results: dict[str, dict[str, float]]) -> str:
+    lines = [
+        f"{'scenario':<12} {'frames':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'stalls':>7} {'stall max':>10}"
+    ]
+    for scenario, metrics in results.items():
+        lines.append(
+            f"{scenario:<12} {metrics['frames']:>7} {metrics['frame_ms_p50']:>8.1f} {metrics['frame_ms_p95']:>8.1f} {metrics['frame_ms_max']:>8.1f} {metrics['stalls']:>7} {metrics['stall_ms_max']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+def run_benchmark(
+    resource_path: Path,
+    repo_path: Path,
+    cache_path: Path,
+) -> dict[str, dict[str, float]]:
+    # The application stores caches on disk, keep the user’s ones out of the measurements.
+    # GLib reads the variable once, so it needs to be set before anything asks for the directory.
+    os.environ["XDG_CACHE_HOME"] = str(cache_path)
+
+    # Only import GTK once the display is set up.
+    import gi
+
+    gi.require_version("Gdk", "4.0")
+    gi.require_version("Gtk", "4.0")
+    gi.require_version("Adw", "1")
+    gi.require_version("Ggit", "1.0")
+
+    from gi.repository import Gdk
+    from gi.repository import Gio
+    from gi.repository import GLib
+    from gi.repository import Gtk
+
+    Gio.Resource.load(str(resource_path))._register()
+
+    from nonemast.main import NonemastApplication
+    from nonemast.window import NonemastWindow
+
+    class Recorder:
+        """Collects frame times of a widget and main loop stalls."""
+
+        def __init__(self, widget: Gtk.Widget):
+            self._frame_clock = widget.get_frame_clock()
+            self._last_paint: Optional[float] = None
+            self.frame_times_ms: list[float] = []
+            self.stalls_ms: list[float] = []
+            self._paint_handler = self._frame_clock.connect(
+                "after-paint", self._on_after_paint
+            )
+            self._expected_heartbeat = time.perf_counter() + HEARTBEAT_MS / 1000
+            self._heartbeat_id = GLib.timeout_add(HEARTBEAT_MS, self._on_heartbeat)
+
+        def _on_after_paint(self, _frame_clock: Gdk.FrameClock) -> None:
+            now = time.perf_counter()
+            if self._last_paint is not None:
+                self.frame_times_ms.append((now - self._last_paint) * 1000)
+            self._last_paint = now
+
+        def _on_heartbeat(self) -> bool:
+            now = time.perf_counter()
+            lateness_ms = (now - self._expected_heartbeat) * 1000
+            if lateness_ms > STALL_THRESHOLD_MS:
+                self.stalls_ms.append(lateness_ms)
+            self._expected_heartbeat = now + HEARTBEAT_MS / 1000
+            return GLib.SOURCE_CONTINUE
+
+        def stop(self) -> dict[str, float]:
+            self._frame_clock.disconnect(self._paint_handler)
+            GLib.source_remove(self._heartbeat_id)
+            return summarize(self.frame_times_ms, self.stalls_ms)
+
+    def find_descendant(widget: Gtk.Widget, widget_type: type) -> Optional[Gtk.Widget]:
+        child = widget.get_first_child()
+        while child is not None:
+            if isinstance(child, widget_type):
+                return child
+            if (found := find_descendant(child, widget_type)) is not None:
+                return found
+            child = child.get_next_sibling()
+        return None
+
+    def scroll(window: NonemastWindow) -> Iterator[None]:
+        scrolled_window = window.updates_list_view.get_parent()
+        adjustment = scrolled_window.get_vadjustment()
+        adjustment.set_value(0)
+        while (
+            adjustment.get_value() + adjustment.get_page_size() < adjustment.get_upper()
+        ):
+            adjustment.set_value(
+                adjustment.get_value() + adjustment.get_page_size() / 2
+            )
+            yield
+
+    def select(window: NonemastWindow) -> Iterator[None]:
+        # Each selection rebinds the details view.
+        for position in range(0, window.props.updates.get_n_items(), 2):
+            window.select_position(position)
+            yield
+
+    def search(window: NonemastWindow) -> Iterator[None]:
+        search_entry = find_descendant(window, Gtk.SearchEntry)
+        # Filter on every key press rather than after a typing pause.
+        search_entry.props.search_delay = 0
+        query = "pkg1: 1.0 → 1.2"
+        for length in range(1, len(query) + 1):
+            search_entry.set_text(query[:length])
+            yield
+        for length in reversed(range(len(query))):
+            search_entry.set_text(query[:length])
+            yield
+
+    scenarios: dict[str, Scenario] = {
+        "scroll": scroll,
+        "select": select,
+        "search": search,
+    }
+    results: dict[str, dict[str, float]] = {}
+
+    app = NonemastApplication(version="benchmark")
+    # Do not hand the benchmark over to an instance that is already running.
+    app.set_flags(app.get_flags() | Gio.ApplicationFlags.NON_UNIQUE)
+
+    class ScenarioRunner:
+        """Runs one step of the current scenario per frame, like a user scrolling or pressing keys."""
+
+        def __init__(self, window: NonemastWindow):
+            self._window = window
+            self._pending = list(scenarios.items())
+            self._start_next()
+            window.add_tick_callback(self._on_tick)
+
+        def _start_next(self) -> bool:
+            if len(self._pending) == 0:
+                app.quit()
+                return False
+            self._name, scenario = self._pending.pop(0)
+            self._steps = scenario(self._window)
+            self._recorder = Recorder(self._window)
+            return True
+
+        def _on_tick(self, _widget: Gtk.Widget, _frame_clock: Gdk.FrameClock) -> bool:
+            try:
+                next(self._steps)
+            except StopIteration:
+                results[self._name] = self._recorder.stop()
+                if not self._start_next():
+                    return GLib.SOURCE_REMOVE
+            return GLib.SOURCE_CONTINUE
+
+    def on_window_added(_app: NonemastApplication, window: NonemastWindow) -> None:
+        deadline = time.monotonic() + LOAD_TIMEOUT_S
+
+        def wait_for_updates() -> bool:
+            match window.updates_list_stack.get_visible_child_name():
+                case "list":
+                    ScenarioRunner(window)
+                    return GLib.SOURCE_REMOVE
+                case "error" | "empty":
+                    print(
+                        "error: the synthetic repository did not load.", file=sys.stderr
+                    )
+                    app.quit()
+                    return GLib.SOURCE_REMOVE
+            if time.monotonic() > deadline:
+                print(
+                    "error: timed out loading the synthetic repository.",
+                    file=sys.stderr,
+                )
+                app.quit()
+                return GLib.SOURCE_REMOVE
+            return GLib.SOURCE_CONTINUE
+
+        GLib.timeout_add(100, wait_for_updates)
+
+    app.connect("window-added", on_window_added)
+    app.run(["nonemast", "--base-commit", BASE_TAG, str(repo_path)])
+
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--resource",
+        type=Path,
+        required=True,
+        help="Path to the compiled nonemast.gresource",
+    )
+    parser.add_argument(
+        "--baselines",
+        type=Path,
+        default=Path(__file__).parent / "ui-baselines.json",
+        help="JSON file with baseline metrics of each scenario",
+    )
+    parser.add_argument(
+        "--update-baselines",
+        action="store_true",
+        help="Store the results as new baselines instead of comparing with them",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Relative slowdown to tolerate before reporting a regression",
+    )
+    parser.add_argument("--updates", type=int, default=DEFAULT_UPDATES)
+    parser.add_argument("--reviewed", type=int, default=DEFAULT_REVIEWED)
+    args = parser.parse_args()
+
+    display_server = start_headless_display()
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_path = Path(temp_dir) / "repo"
+            create_synthetic_repo(repo_path, args.updates, args.reviewed)
+            results = run_benchmark(args.resource, repo_path, Path(temp_dir) / "cache")
+    finally:
+        if display_server is not None:
+            display_server.terminate()
+
+    if len(results) == 0:
+        return 1
+
+    print(format_results(results))
+
+    if args.update_baselines:
+        with open(args.baselines, "w", encoding="utf-8") as baselines_file:
+            json.dump(results, baselines_file, indent=2)
+            baselines_file.write("\n")
+        print(f"Baselines stored in {args.baselines}.")
+        return 0
+
+    try:
+        with open(args.baselines, encoding="utf-8") as baselines_file:
+            baselines = json.load(baselines_file)
+    except FileNotFoundError:
+        print(
+            f"error: no baselines in {args.baselines}, run with --update-baselines to store them.",
+            file=sys.stderr,
+        )
+        return 1
+
+    regressions = find_regressions(results, baselines, args.tolerance)
+    for regression in regressions:
+        print(f"regression: {regression}", file=sys.stderr)
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
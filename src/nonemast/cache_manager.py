@@ -0,0 +1,435 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import GLib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Default returned by LruCache.get for keys that are not cached, None is a valid cached value.
+MISSING: Any = object()
+
+# Size of files the disk tier keeps, the oldest ones are deleted beyond it.
+DEFAULT_DISK_BUDGET = 64 * 1024 * 1024
+
+# Suffix of entries being written, left behind only when the writer was interrupted.
+TEMPORARY_SUFFIX = ".tmp"
+
+
+def get_default_cache_directory() -> Path:
+    # Separate from other cached files, since everything in it is subject to pruning.
+    return Path(GLib.get_user_cache_dir()) / "nonemast" / "caches"
+
+
+def estimate_size(key: Any, value: Any) -> int:
+    """Approximate memory used by an entry, only the objects themselves and not what they refer to."""
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+def format_bytes(size: int) -> str:
+    for unit in ["B", "KiB", "MiB"]:
+        if size < 1024:
+            return f"{size} {unit}"
+        size //= 1024
+    return f"{size} GiB"
+
+
+@dataclass
+class CacheStatistics:
+    name: str
+    entries: int
+    # Estimated, only tracked for caches with a byte budget.
+    size: int
+    max_entries: Optional[int] = None
+    max_bytes: Optional[int] = None
+    # Entries found in memory.
+    hits: int = 0
+    # Entries found in the disk tier after they were evicted from memory, or in a previous session.
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        lookups = self.hits + self.disk_hits + self.misses
+        if lookups == 0:
+            return None
+        return (self.hits + self.disk_hits) / lookups
+
+    def format(self) -> str:
+        budgets = []
+        if self.max_entries is not None:
+            budgets.append(f"{self.entries}/{self.max_entries} entries")
+        else:
+            budgets.append(f"{self.entries} entries")
+        if self.max_bytes is not None:
+            budgets.append(f"{format_bytes(self.size)}/{format_bytes(self.max_bytes)}")
+        hit_ratio = (
+            f"{self.hit_ratio:.0%} hit ratio"
+            if self.hit_ratio is not None
+            else "unused"
+        )
+        return (
+            f"{self.name}: {', '.join(budgets)}, {hit_ratio}"
+            f" ({self.hits} hits, {self.disk_hits} disk hits, {self.misses} misses, {self.evictions} evictions)"
+        )
+
+
+class DiskTier:
+    """Directory of cache entries stored as JSON files, written and pruned by a background thread.
+
+    Files present on disk are indexed when the thread starts, so that misses
+    do not need to touch the disk, and until then, nothing is found. When the
+    files exceed the budget, the oldest ones are deleted.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_DISK_BUDGET):
+        self.directory = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Sizes of files, from the oldest.
+        self._files: OrderedDict[Path, int] = OrderedDict()
+        self._size = 0
+        self._scanned = threading.Event()
+        # Entries to write, with the function encoding them into JSON-serializable values.
+        self._queue: queue.Queue[tuple[Path, Any, Callable[[Any], Any]]] = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="nonemast-disk-cache",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def read(self, path: Path) -> Any:
+        """Return decoded JSON stored in the file, or MISSING when there is none."""
+        if not self._scanned.is_set():
+            return MISSING
+        with self._lock:
+            if path not in self._files:
+                return MISSING
+        try:
+            with open(path, encoding="utf-8") as entry_file:
+                return json.load(entry_file)
+        except (OSError, ValueError) as error:
+            # Pruned in the meantime, or corrupted.
+            return MISSING
+
+    def write(
+        self,
+        path: Path,
+        value: Any,
+        encode: Callable[[Any], Any] = lambda value: value,
+    ) -> None:
+        """Store value into the file in the background, encode needs to make it JSON-serializable.
+
+        Entries that cannot be encoded or written are skipped.
+        """
+        self._queue.put((path, value, encode))
+
+    def flush(self) -> None:
+        """Wait until the files are indexed and the queued entries are written."""
+        self._scanned.wait()
+        self._queue.join()
+
+    def get_size(self) -> int:
+        with self._lock:
+            return self._size
+
+    def _scan(self) -> None:
+        files: list[tuple[float, Path, int]] = []
+        for root, _directories, names in os.walk(self.directory):
+            for name in names:
+                path = Path(root) / name
+                try:
+                    if name.endswith(TEMPORARY_SUFFIX):
+                        path.unlink()
+                        continue
+                    status = path.stat()
+                except OSError as error:
+                    continue
+                files.append((status.st_mtime, path, status.st_size))
+        files.sort()
+        with self._lock:
+            for _mtime, path, size in files:
+                self._files[path] = size
+                self._size += size
+
+    def _write(self, path: Path, value: Any) -> None:
+        # Written under a temporary name and renamed, so that readers never see a partial entry.
+        temporary_path = path.with_name(path.name + TEMPORARY_SUFFIX)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temporary_path, "w", encoding="utf-8") as entry_file:
+                json.dump(value, entry_file)
+            size = temporary_path.stat().st_size
+            os.replace(temporary_path, path)
+        except Exception as error:
+            # E.g. a full disk or a value json cannot serialize, the entry is still cached in memory.
+            try:
+                temporary_path.unlink(missing_ok=True)
+            except OSError as error:
+                pass
+            return
+        with self._lock:
+            if (old_size := self._files.pop(path, None)) is not None:
+                self._size -= old_size
+            self._files[path] = size
+            self._size += size
+
+    def _prune(self) -> None:
+        while True:
+            with self._lock:
+                if self._size <= self._max_bytes or len(self._files) == 0:
+                    return
+                path, size = self._files.popitem(last=False)
+                self._size -= size
+            try:
+                path.unlink()
+            except OSError as error:
+                # Already deleted, e.g. by another instance of the application.
+                pass
+
+    def _run(self) -> None:
+        self._scan()
+        self._prune()
+        self._scanned.set()
+        while True:
+            # Everything queued in the meantime is written at once and pruned once.
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                for path, value, encode in batch:
+                    try:
+                        value = encode(value)
+                    except Exception as error:
+                        # Skipped like entries that cannot be written, so that the thread keeps running.
+                        continue
+                    self._write(path, value)
+                self._prune()
+            finally:
+                # Otherwise flush would wait forever.
+                for _entry in batch:
+                    self._queue.task_done()
+
+
+class LruCache(Generic[K, V]):
+    """Thread-safe cache evicting the least recently used entries when it exceeds its budget.
+
+    A persistent cache also writes entries to the disk tier, if the manager
+    has one, and looks there for entries that are not in memory. Values are
+    stored as JSON, so the disk tier is only suitable for results that never
+    need to be invalidated, such as those keyed by commit or blob IDs.
+    The disk tier is only read from worker threads, so that the main loop
+    never waits for the disk, and it is written in the background.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        size_of: Callable[[K, V], int] = estimate_size,
+        persistent: bool = False,
+        encode: Callable[[V], Any] = lambda value: value,
+        decode: Callable[[Any], V] = lambda value: value,
+    ):
+        self.name = name
+        self.persistent = persistent
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._size_of = size_of
+        self._encode = encode
+        self._decode = decode
+        self._disk_tier: Optional[DiskTier] = None
+
+        self._lock = threading.Lock()
+        # Values with their sizes, from the least recently used.
+        self._entries: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def set_disk_tier(self, disk_tier: Optional[DiskTier]) -> None:
+        self._disk_tier = disk_tier
+
+    def _get_disk_path(self, disk_tier: DiskTier, key: K) -> Path:
+        digest = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+        # Sharded like Git objects, so that directories do not grow too large.
+        return disk_tier.directory / self.name / digest[:2] / digest[2:]
+
+    def _read_from_disk(self, key: K) -> Any:
+        disk_tier = self._disk_tier
+        if (
+            disk_tier is None
+            or not self.persistent
+            or threading.current_thread() is threading.main_thread()
+        ):
+            return MISSING
+        if (value := disk_tier.read(self._get_disk_path(disk_tier, key))) is MISSING:
+            return MISSING
+        try:
+            return self._decode(value)
+        except (TypeError, ValueError) as error:
+            # Stored by an incompatible version.
+            return MISSING
+
+    def _is_over_budget(self) -> bool:
+        return (
+            self._max_entries is not None and len(self._entries) > self._max_entries
+        ) or (self._max_bytes is not None and self._size > self._max_bytes)
+
+    def _insert(self, key: K, value: V) -> None:
+        """Store the entry and evict the least recently used ones over the budget, expects the lock to be held."""
+        size = self._size_of(key, value) if self._max_bytes is not None else 0
+        if (old_entry := self._entries.pop(key, None)) is not None:
+            self._size -= old_entry[1]
+        self._entries[key] = (value, size)
+        self._size += size
+        while len(self._entries) > 0 and self._is_over_budget():
+            _key, (_value, evicted_size) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+            self._evictions += 1
+
+    def get(self, key: K, default: Any = None) -> Any:
+        """Return the cached value, or default when there is none.
+
+        Use MISSING as the default to distinguish cached None values.
+        """
+        with self._lock:
+            if (entry := self._entries.get(key)) is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+
+        if (value := self._read_from_disk(key)) is not MISSING:
+            with self._lock:
+                self._disk_hits += 1
+                self._insert(key, value)
+            return value
+
+        with self._lock:
+            self._misses += 1
+        return default
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._insert(key, value)
+        if (disk_tier := self._disk_tier) is not None and self.persistent:
+            disk_tier.write(self._get_disk_path(disk_tier, key), value, self._encode)
+
+    def clear(self) -> None:
+        """Drop entries in memory, the disk tier is kept."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_statistics(self) -> CacheStatistics:
+        with self._lock:
+            return CacheStatistics(
+                name=self.name,
+                entries=len(self._entries),
+                size=self._size,
+                max_entries=self._max_entries,
+                max_bytes=self._max_bytes,
+                hits=self._hits,
+                disk_hits=self._disk_hits,
+                misses=self._misses,
+                evictions=self._evictions,
+            )
+
+
+class CacheManager:
+    """Registry of caches, so that their budgets and counters can be inspected in one place.
+
+    The disk tier is disabled until enable_disk_tier is called, so that e.g.
+    tests do not write into the cache directory of the user.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._caches: dict[str, LruCache] = {}
+        self._disk_tier: Optional[DiskTier] = None
+
+    def create(
+        self,
+        name: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        size_of: Callable[[Any, Any], int] = estimate_size,
+        persistent: bool = False,
+        encode: Callable[[Any], Any] = lambda value: value,
+        decode: Callable[[Any], Any] = lambda value: value,
+    ) -> LruCache:
+        """Create a cache with a budget of entries and/or estimated bytes, unbounded without either."""
+        cache: LruCache = LruCache(
+            name,
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            size_of=size_of,
+            persistent=persistent,
+            encode=encode,
+            decode=decode,
+        )
+        with self._lock:
+            assert name not in self._caches, f"Cache “{name}” already exists"
+            self._caches[name] = cache
+            cache.set_disk_tier(self._disk_tier)
+        return cache
+
+    def enable_disk_tier(
+        self,
+        directory: Optional[Path] = None,
+        max_bytes: int = DEFAULT_DISK_BUDGET,
+    ) -> None:
+        """Store entries of persistent caches in directory, $XDG_CACHE_HOME/nonemast/caches by default.
+
+        The files are kept under max_bytes, and the directory should not contain anything else.
+        """
+        if directory is None:
+            directory = get_default_cache_directory()
+        disk_tier = DiskTier(directory, max_bytes)
+        with self._lock:
+            assert self._disk_tier is None, "Disk tier is already enabled"
+            self._disk_tier = disk_tier
+            for cache in self._caches.values():
+                cache.set_disk_tier(disk_tier)
+
+    def flush(self) -> None:
+        """Wait until entries of persistent caches are written, e.g. before exiting."""
+        if self._disk_tier is not None:
+            self._disk_tier.flush()
+
+    def clear(self) -> None:
+        with self._lock:
+            caches = list(self._caches.values())
+        for cache in caches:
+            cache.clear()
+
+    def get_statistics(self) -> list[CacheStatistics]:
+        with self._lock:
+            caches = list(self._caches.values())
+        return [cache.get_statistics() for cache in caches]
+
+    def format_report(self) -> str:
+        return "\n".join(statistics.format() for statistics in self.get_statistics())
+
+
+# Shared by all modules of the application.
+caches = CacheManager()
@@ -0,0 +1,257 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from dataclasses import dataclass
+from gi.repository import Gio
+from gi.repository import GLib
+from gi.repository import GObject
+from typing import Optional
+from .package_update import PackageUpdate
+
+INTERFACE_NAME = "cz.ogion.Nonemast.Review"
+
+INTERFACE_XML = f"""
+<node>
+  <interface name="{INTERFACE_NAME}">
+    <method name="ListUpdates">
+      <arg direction="out" type="a(sb)" name="updates"/>
+    </method>
+    <method name="GetUpdate">
+      <arg direction="in" type="s" name="subject"/>
+      <arg direction="out" type="a{{sv}}" name="update"/>
+    </method>
+    <method name="GetStatistics">
+      <arg direction="out" type="u" name="n_updates"/>
+      <arg direction="out" type="u" name="n_reviewed"/>
+      <arg direction="out" type="a(su)" name="reviewers"/>
+    </method>
+    <method name="MarkAsReviewed">
+      <arg direction="in" type="s" name="subject"/>
+    </method>
+    <method name="AddCoauthors">
+      <arg direction="in" type="s" name="subject"/>
+      <arg direction="in" type="as" name="coauthors"/>
+    </method>
+    <signal name="UpdatesChanged">
+      <arg type="u" name="n_updates"/>
+    </signal>
+    <signal name="UpdateChanged">
+      <arg type="s" name="subject"/>
+      <arg type="b" name="reviewed"/>
+    </signal>
+  </interface>
+</node>
+"""
+
+ERROR_NOT_LOADED = "cz.ogion.Nonemast.Error.NotLoaded"
+ERROR_UNKNOWN_UPDATE = "cz.ogion.Nonemast.Error.UnknownUpdate"
+ERROR_FAILED = "cz.ogion.Nonemast.Error.Failed"
+ERROR_INVALID_ARGS = "org.freedesktop.DBus.Error.InvalidArgs"
+
+
+def update_to_variant(update: PackageUpdate) -> GLib.Variant:
+    return GLib.Variant(
+        "a{sv}",
+        {
+            "subject": GLib.Variant("s", update.props.subject),
+            "reviewed": GLib.Variant("b", update.props.changes_reviewed),
+            "final-commit-message": GLib.Variant(
+                "s", update.props.final_commit_message
+            ),
+            "commits": GLib.Variant(
+                "as", [commit_info.props.id for commit_info in update.props.commits]
+            ),
+        },
+    )
+
+
+@dataclass
+class ExportedUpdate:
+    update: PackageUpdate
+    handler_ids: list[int]
+    # Last value announced to clients.
+    value: GLib.Variant
+
+
+class ReviewService:
+    """Exposes the review model of the running instance on the application’s D-Bus object.
+
+    Other programs can then query the already loaded updates instead of walking the history again.
+    """
+
+    # Should be NonemastWindow but importing it here would create a cycle.
+    _window: Optional[GObject.Object] = None
+    _items_changed_handler_id: Optional[int] = None
+
+    def __init__(self, connection: Gio.DBusConnection, object_path: str):
+        self._connection = connection
+        self._object_path = object_path
+        # Mirrors the window’s updates model, so that removed updates can be disconnected.
+        self._exported: list[ExportedUpdate] = []
+        self._exported_by_update: dict[PackageUpdate, ExportedUpdate] = {}
+        node_info = Gio.DBusNodeInfo.new_for_xml(INTERFACE_XML)
+        self._registration_id = connection.register_object(
+            object_path,
+            node_info.lookup_interface(INTERFACE_NAME),
+            self._on_method_call,
+            None,
+            None,
+        )
+
+    def unregister(self) -> None:
+        self._connection.unregister_object(self._registration_id)
+        self._unset_window()
+
+    def set_window(self, window: GObject.Object) -> None:
+        self._unset_window()
+        self._window = window
+        updates = window.props.updates
+        self._items_changed_handler_id = updates.connect(
+            "items-changed", self._on_updates_changed
+        )
+        self._exported = [self._export(update) for update in updates]
+
+    def _unset_window(self) -> None:
+        if self._window is None:
+            return
+        self._window.props.updates.disconnect(self._items_changed_handler_id)
+        self._items_changed_handler_id = None
+        for exported in self._exported:
+            self._unexport(exported)
+        self._exported = []
+        self._exported_by_update = {}
+        self._window = None
+
+    def _export(self, update: PackageUpdate) -> ExportedUpdate:
+        self._exported_by_update[update] = exported = ExportedUpdate(
+            update=update,
+            handler_ids=[
+                update.connect("notify::changes-reviewed", self._on_update_changed),
+                update.connect("notify::final-commit-message", self._on_update_changed),
+            ],
+            value=update_to_variant(update),
+        )
+        return exported
+
+    def _unexport(self, exported: ExportedUpdate) -> None:
+        for handler_id in exported.handler_ids:
+            exported.update.disconnect(handler_id)
+        del self._exported_by_update[exported.update]
+
+    def _emit(self, signal_name: str, parameters: GLib.Variant) -> None:
+        self._connection.emit_signal(
+            None,
+            self._object_path,
+            INTERFACE_NAME,
+            signal_name,
+            parameters,
+        )
+
+    def _on_updates_changed(
+        self,
+        updates: Gio.ListStore,
+        position: int,
+        removed: int,
+        added: int,
+    ) -> None:
+        for exported in self._exported[position : position + removed]:
+            self._unexport(exported)
+        self._exported[position : position + removed] = [
+            self._export(updates.get_item(index))
+            for index in range(position, position + added)
+        ]
+
+        self._emit("UpdatesChanged", GLib.Variant("(u)", (updates.get_n_items(),)))
+
+    def _on_update_changed(
+        self,
+        update: PackageUpdate,
+        _pspec: GObject.ParamSpec,
+    ) -> None:
+        if (exported := self._exported_by_update.get(update)) is None:
+            # Update is no longer part of the model.
+            return
+
+        value = update_to_variant(update)
+        if value.equal(exported.value):
+            # E.g. the message was recomputed without changing.
+            return
+        exported.value = value
+
+        self._emit(
+            "UpdateChanged",
+            GLib.Variant("(sb)", (update.props.subject, update.props.changes_reviewed)),
+        )
+
+    def _on_method_call(
+        self,
+        connection: Gio.DBusConnection,
+        sender: str,
+        object_path: str,
+        interface_name: str,
+        method_name: str,
+        parameters: GLib.Variant,
+        invocation: Gio.DBusMethodInvocation,
+    ) -> None:
+        if self._window is None:
+            invocation.return_dbus_error(ERROR_NOT_LOADED, "No review is open.")
+            return
+
+        match method_name:
+            case "ListUpdates":
+                updates = [
+                    (update.props.subject, update.props.changes_reviewed)
+                    for update in self._window.props.updates
+                ]
+                invocation.return_value(GLib.Variant("(a(sb))", (updates,)))
+            case "GetUpdate":
+                (subject,) = parameters.unpack()
+                if (update := self._window.get_update(subject)) is None:
+                    invocation.return_dbus_error(
+                        ERROR_UNKNOWN_UPDATE, f"No update with subject “{subject}”."
+                    )
+                    return
+                invocation.return_value(
+                    GLib.Variant.new_tuple(update_to_variant(update))
+                )
+            case "GetStatistics":
+                statistics = self._window.props.statistics
+                invocation.return_value(
+                    GLib.Variant(
+                        "(uua(su))",
+                        (
+                            statistics.props.n_updates,
+                            statistics.props.n_reviewed,
+                            statistics.get_reviewer_counts(),
+                        ),
+                    )
+                )
+            case "MarkAsReviewed":
+                (subject,) = parameters.unpack()
+                if self._window.get_update(subject) is None:
+                    invocation.return_dbus_error(
+                        ERROR_UNKNOWN_UPDATE, f"No update with subject “{subject}”."
+                    )
+                elif self._window.mark_update_as_reviewed(subject):
+                    invocation.return_value(None)
+                else:
+                    invocation.return_dbus_error(
+                        ERROR_FAILED, "Unable to create a commit."
+                    )
+            case "AddCoauthors":
+                subject, coauthors = parameters.unpack()
+                if self._window.get_update(subject) is None:
+                    invocation.return_dbus_error(
+                        ERROR_UNKNOWN_UPDATE, f"No update with subject “{subject}”."
+                    )
+                elif len(coauthors) == 0:
+                    # Would only create an empty squash commit.
+                    invocation.return_dbus_error(
+                        ERROR_INVALID_ARGS, "No co-authors were given."
+                    )
+                elif self._window.add_coauthors(subject, coauthors):
+                    invocation.return_value(None)
+                else:
+                    invocation.return_dbus_error(
+                        ERROR_FAILED, "Unable to create a commit."
+                    )
@@ -0,0 +1,271 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import Ggit
+from gi.repository import GLib
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Iterable, Optional, TYPE_CHECKING
+import re
+from .cache_manager import MISSING, caches
+from .git_utils import (
+    ThreadRepositories,
+    get_commit_diff,
+    get_diff_deltas,
+    read_blob_text,
+)
+from .patch_ids import PatchIdIndex
+
+if TYPE_CHECKING:
+    # Package updates use the shape labels.
+    from .package_update import PackageUpdate
+
+# Shapes ordered from the least to the most interesting for review.
+SHAPE_VERSION_AND_HASH = "version-and-hash"
+SHAPE_DEPENDENCIES = "dependencies"
+SHAPE_PATCHES = "patches"
+SHAPE_OTHER = "other"
+SHAPE_LARGE = "large"
+
+SHAPE_PRIORITIES = [
+    SHAPE_VERSION_AND_HASH,
+    SHAPE_DEPENDENCIES,
+    SHAPE_PATCHES,
+    SHAPE_OTHER,
+    SHAPE_LARGE,
+]
+
+SHAPE_LABELS = {
+    SHAPE_VERSION_AND_HASH: "Version and hash only",
+    SHAPE_DEPENDENCIES: "Dependency change",
+    SHAPE_PATCHES: "Patches added or removed",
+    SHAPE_OTHER: "Other change",
+    SHAPE_LARGE: "Large change",
+}
+
+# Commits changing more lines than this are not worth looking at line by line.
+LARGE_CHANGE_LINES = 40
+
+PATCH_FILE_REGEX = re.compile(r"\.(patch|diff)$")
+
+TRIVIAL_LINE_REGEX = re.compile(
+    r"""^(
+        # Closing brackets, separators and empty lines.
+        [\s\[\]{}();,]*
+        # Version and source hash attributes.
+        | \s*(version|rev|hash|sha256|sha512|outputHash|\w+Hash)\s*=\s*"[^"]*"\s*;\s*
+        # Hash on its own line.
+        | \s*"(sha256|sha512)-[^"]*"\s*;?\s*
+    )$""",
+    re.VERBOSE,
+)
+
+DEPENDENCY_LINE_REGEX = re.compile(
+    r"""^(
+        # Input lists.
+        \s*\w*Inputs\s*=.*
+        # Function arguments.
+        | \s*[\w-]+\s*,\s*
+        | \s*,\s*[\w-]+\s*
+    )$""",
+    re.VERBOSE,
+)
+
+# Items of input lists, only considered inside them, see get_input_list_lines.
+INPUT_LIST_ITEMS_REGEX = re.compile(r"^\s*[\w.-]+(\s+[\w.-]+)*\s*$")
+
+INPUT_LIST_START_REGEX = re.compile(r"^\s*\w*Inputs\s*=")
+
+PATCH_LINE_REGEX = re.compile(r"\.(patch|diff)\b|fetchpatch|\bpatches\s*=")
+
+
+@dataclass(frozen=True)
+class ChangedLine:
+    text: str
+    # Whether the line is inside a list assigned to an *Inputs attribute.
+    in_input_list: bool = False
+
+
+def get_input_list_lines(lines: list[str]) -> list[bool]:
+    """Return whether each line is inside a list assigned to an *Inputs attribute, e.g. buildInputs."""
+    in_input_list = []
+    # Brackets opened since the start of the assignment.
+    depth = 0
+    for line in lines:
+        if depth == 0:
+            if INPUT_LIST_START_REGEX.match(line):
+                depth = max(0, line.count("[") - line.count("]"))
+            in_input_list.append(False)
+        else:
+            in_input_list.append(True)
+            depth = max(0, depth + line.count("[") - line.count("]"))
+    return in_input_list
+
+
+def get_changed_lines(old_text: str, new_text: str) -> list[ChangedLine]:
+    """Return lines removed from old text and lines added in the new one."""
+    old_lines = old_text.splitlines()
+    new_lines = new_text.splitlines()
+    old_in_input_list = get_input_list_lines(old_lines)
+    new_in_input_list = get_input_list_lines(new_lines)
+    changed: list[ChangedLine] = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag != "equal":
+            changed += [
+                ChangedLine(old_lines[index], old_in_input_list[index])
+                for index in range(old_start, old_end)
+            ]
+            changed += [
+                ChangedLine(new_lines[index], new_in_input_list[index])
+                for index in range(new_start, new_end)
+            ]
+    return changed
+
+
+def classify_line(line: ChangedLine) -> str:
+    if TRIVIAL_LINE_REGEX.match(line.text):
+        return SHAPE_VERSION_AND_HASH
+    if PATCH_LINE_REGEX.search(line.text):
+        return SHAPE_PATCHES
+    if DEPENDENCY_LINE_REGEX.match(line.text) or (
+        line.in_input_list and INPUT_LIST_ITEMS_REGEX.match(line.text)
+    ):
+        return SHAPE_DEPENDENCIES
+    return SHAPE_OTHER
+
+
+def most_interesting_shape(shapes: Iterable[Optional[str]]) -> Optional[str]:
+    """Return the shape reviewers should pay the most attention to."""
+    return max(
+        (shape for shape in shapes if shape is not None),
+        key=SHAPE_PRIORITIES.index,
+        default=None,
+    )
+
+
+def classify_changed_lines(path: str, changed_lines: list[ChangedLine]) -> str:
+    if not path.endswith(".nix"):
+        return SHAPE_OTHER
+    if len(changed_lines) > LARGE_CHANGE_LINES:
+        return SHAPE_LARGE
+    shape = most_interesting_shape(classify_line(line) for line in changed_lines)
+    return shape or SHAPE_VERSION_AND_HASH
+
+
+class _CommitShapeUnavailable(Exception):
+    """Objects needed for classification are missing, e.g. in partial clones."""
+
+
+def _classify_delta(repo: Ggit.Repository, delta: Ggit.DiffDelta) -> tuple[str, int]:
+    status = delta.get_status()
+    old_file = delta.get_old_file()
+    new_file = delta.get_new_file()
+
+    if status in (Ggit.DeltaType.ADDED, Ggit.DeltaType.DELETED):
+        path = (new_file if status == Ggit.DeltaType.ADDED else old_file).get_path()
+        if PATCH_FILE_REGEX.search(path):
+            return (SHAPE_PATCHES, 0)
+        # New or removed expressions are never trivial.
+        return (SHAPE_OTHER, 0)
+
+    if status != Ggit.DeltaType.MODIFIED:
+        return (SHAPE_OTHER, 0)
+
+    path = new_file.get_path()
+    if PATCH_FILE_REGEX.search(path):
+        # Patch being refreshed.
+        return (SHAPE_PATCHES, 0)
+    if not path.endswith(".nix"):
+        return (SHAPE_OTHER, 0)
+
+    old_text = read_blob_text(repo, old_file.get_oid())
+    new_text = read_blob_text(repo, new_file.get_oid())
+    if old_text is None or new_text is None:
+        raise _CommitShapeUnavailable()
+    changed_lines = get_changed_lines(old_text, new_text)
+    return (classify_changed_lines(path, changed_lines), len(changed_lines))
+
+
+# Shapes keyed by commit ID or patch-id, neither ever needs to be invalidated.
+# The number needs to be increased when the classification changes, so that shapes stored on disk are not reused.
+_commit_shapes = caches.create("commit-shapes-2", max_entries=100_000, persistent=True)
+
+
+def classify_commit(
+    repo: Ggit.Repository,
+    commit: Ggit.Commit,
+    cache_key: Optional[str] = None,
+) -> Optional[str]:
+    """Return shape of the changes in the commit, or None for empty commits.
+
+    Results are cached under cache_key, commit ID by default.
+    """
+    if cache_key is None:
+        cache_key = commit.get_id().to_string()
+    if (cached_shape := _commit_shapes.get(cache_key, MISSING)) is not MISSING:
+        return cached_shape
+
+    diff = get_commit_diff(repo, commit)
+    if diff is None:
+        return None
+
+    shapes: list[str] = []
+    total_changed_lines = 0
+    try:
+        for delta in get_diff_deltas(diff):
+            shape, changed_lines = _classify_delta(repo, delta)
+            shapes.append(shape)
+            total_changed_lines += changed_lines
+    except _CommitShapeUnavailable:
+        # Do not cache so that it can be retried after fetching the objects.
+        return None
+
+    if total_changed_lines > LARGE_CHANGE_LINES:
+        shape = SHAPE_LARGE
+    else:
+        shape = most_interesting_shape(shapes)
+
+    _commit_shapes.put(cache_key, shape)
+    return shape
+
+
+class DiffShapeClassifier:
+    """Labels updates with the shape of their diffs in background threads."""
+
+    def __init__(
+        self,
+        repositories: ThreadRepositories,
+        executor: Executor,
+        patch_ids: PatchIdIndex,
+    ):
+        self._repositories = repositories
+        self._executor = executor
+        self._patch_ids = patch_ids
+
+    def submit(self, update: "PackageUpdate") -> None:
+        commit_ids = [commit.props.id for commit in update.props.commits]
+        self._executor.submit(self._classify, update, commit_ids)
+
+    def _classify(self, update: "PackageUpdate", commit_ids: list[str]) -> None:
+        # Objects from the main thread’s repository cannot be used here.
+        try:
+            repo = self._repositories.get()
+            shape = most_interesting_shape(
+                classify_commit(
+                    repo,
+                    repo.lookup_commit(Ggit.OId.new_from_string(commit_id)),
+                    # Rebased commits with the same changes are not classified again.
+                    self._patch_ids.get_cache_key(commit_id),
+                )
+                for commit_id in commit_ids
+            )
+        except GLib.Error as error:
+            return
+
+        def apply_result() -> bool:
+            update.props.diff_shape = shape
+            return GLib.SOURCE_REMOVE
+
+        GLib.idle_add(apply_result)
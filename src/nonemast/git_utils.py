@@ -2,26 +2,149 @@
 # SPDX-License-Identifier: MIT
 
 from gi.repository import Ggit
+from gi.repository import Gio
+from gi.repository import GLib
+from typing import Optional, Union
+import threading
 
 
 def signature_to_string(signature: Ggit.Signature) -> str:
     return f"{signature.get_name()} <{signature.get_email()}>"
 
 
-def is_commit_empty(commit: Ggit.Commit) -> bool:
-    repo: Ggit.Repository = commit.get_owner()
-    commit_tree: Ggit.Tree = commit.get_tree()
-    commit_parents: Ggit.CommitParents = commit.get_parents()
+def get_config_signature(repo: Ggit.Repository) -> Optional[Ggit.Signature]:
+    """Return signature of the user from user.name and user.email config, None when they are not set."""
+    try:
+        config: Ggit.Config = repo.get_config().snapshot()
+        return Ggit.Signature.new_now(
+            name=config.get_string("user.name"),
+            email=config.get_string("user.email"),
+        )
+    except GLib.Error as error:
+        return None
+
+
+def get_commit_diff(
+    repo: Ggit.Repository,
+    commit: Ggit.Commit,
+) -> Optional[Ggit.Diff]:
+    """Return diff between the commit and its first parent.
 
+    Returns None when the trees are not available, e.g. in shallow or partial clones.
+    """
+    commit_tree: Optional[Ggit.Tree] = commit.get_tree()
+    if commit_tree is None:
+        return None
+
+    commit_parents: Ggit.CommitParents = commit.get_parents()
+    parent_tree: Optional[Ggit.Tree] = None
     if commit_parents.get_size() > 0:
-        parent_commit: Ggit.Commit = commit_parents.get(0)
-        parent_tree: Ggit.Tree = parent_commit.get_tree()
+        parent_commit: Optional[Ggit.Commit] = commit_parents.get(0)
+        if parent_commit is None:
+            return None
+        parent_tree = parent_commit.get_tree()
+        if parent_tree is None:
+            return None
+    # Otherwise, root commit is compared against an empty tree.
 
-        diff: Ggit.Diff = Ggit.Diff.new_tree_to_tree(
-            repo, parent_tree, commit_tree, None
-        )
+    try:
+        return Ggit.Diff.new_tree_to_tree(repo, parent_tree, commit_tree, None)
+    except GLib.Error as error:
+        return None
+
+
+def get_diff_deltas(diff: Ggit.Diff) -> list[Ggit.DiffDelta]:
+    deltas: list[Ggit.DiffDelta] = []
+
+    def on_file(delta: Ggit.DiffDelta, progress: float) -> int:
+        deltas.append(delta)
+        return 0
+
+    diff.foreach(on_file, None, None, None)
+
+    return deltas
+
+
+def read_blob_text(repo: Ggit.Repository, oid: Ggit.OId) -> Optional[str]:
+    """Return contents of a blob, or None when it is missing, e.g. in partial clones."""
+    try:
+        blob: Optional[Ggit.Blob] = repo.lookup_blob(oid)
+    except GLib.Error as error:
+        return None
+    if blob is None:
+        return None
+    return bytes(blob.get_raw_content()).decode("utf-8", errors="replace")
+
+
+def is_commit_empty(commit: Ggit.Commit) -> bool:
+    diff = get_commit_diff(commit.get_owner(), commit)
+    if diff is None:
+        # Err on the side of treating the commit as a contribution.
+        return False
+
+    return diff.get_num_deltas() == 0
+
+
+class LazyCommit:
+    """Commit known by its ID, subject and message, looked up in the repository only when more is needed.
+
+    Updates are built from messages, which workers read with their own
+    repository handles, so the commit objects of the main thread’s
+    repository are only looked up for e.g. diffs or authors.
+    """
+
+    def __init__(
+        self,
+        repo: Ggit.Repository,
+        commit_id: str,
+        subject: str,
+        message: str,
+    ):
+        self._repo = repo
+        self._commit_id = commit_id
+        self._subject = subject
+        self._message = message
+        self._commit: Optional[Ggit.Commit] = None
+
+    def get_id(self) -> Ggit.OId:
+        return Ggit.OId.new_from_string(self._commit_id)
+
+    def get_subject(self) -> str:
+        return self._subject
+
+    def get_message(self) -> str:
+        return self._message
+
+    def resolve(self) -> Ggit.Commit:
+        """Return the commit object, raising GLib.Error when it cannot be read."""
+        if self._commit is None:
+            self._commit = self._repo.lookup_commit(self.get_id())
+        return self._commit
+
+
+# Commit object, or a commit looked up on demand.
+AnyCommit = Union[Ggit.Commit, LazyCommit]
+
+
+def resolve_commit(commit: AnyCommit) -> Ggit.Commit:
+    if isinstance(commit, LazyCommit):
+        return commit.resolve()
+    return commit
+
+
+class ThreadRepositories:
+    """Repository handles for worker threads.
+
+    libgit2 objects must not be shared between threads so each thread opens its own handle.
+    """
+
+    def __init__(self, repo_path: Gio.File):
+        self._repo_path = repo_path
+        self._local = threading.local()
 
-        return diff.get_num_deltas() == 0
-    else:
-        # Root commit has no parent so we do not need to compare it.
-        return commit_tree.size() == 0
+    def get(self) -> Ggit.Repository:
+        repo: Optional[Ggit.Repository] = getattr(self._local, "repo", None)
+        if repo is None:
+            repo = Ggit.Repository.open(self._repo_path)
+            self._local.repo = repo
+        return repo
@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import Ggit
+from gi.repository import Gio
+from gi.repository import GLib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import os
+import sys
+from .cache_manager import caches
+from .git_utils import ThreadRepositories, get_config_signature
+from .history import ReviewRange, load_commit_history
+from .identities import IdentityResolver
+from .operations.split_branch import (
+    BranchSplitter,
+    SplitGroup,
+    create_branch,
+    get_parent_id,
+)
+from .package_update import PackageUpdate
+from .review_stats import ReviewStatistics
+
+
+def print_statistics(repo_path: Gio.File, review_range: ReviewRange) -> None:
+    """Load the review without opening a window and print its progress."""
+    try:
+        repo = Ggit.Repository.open(repo_path)
+        updates = load_commit_history(repo, review_range)
+    except GLib.Error as error:
+        sys.exit(f"error: {error.message}")
+
+    statistics = ReviewStatistics(IdentityResolver.new_from_repository(repo))
+    for subject, commits in updates.items():
+        statistics.track(
+            PackageUpdate(
+                repo=repo,
+                subject=subject,
+                commits=commits,
+            )
+        )
+
+    print(statistics.format_report())
+
+
+def print_cache_statistics() -> None:
+    """Print counters of caches, e.g. to tune their budgets on large branches."""
+    print("", "Caches:", caches.format_report(), sep="\n")
+
+
+def split_branch(
+    repo_path: Gio.File,
+    review_range: ReviewRange,
+    branch_name: str,
+    path_patterns: list[str],
+    base_revspec: Optional[str],
+) -> None:
+    """Create a branch with the updates changing the given paths, autosquashed on top of base."""
+    try:
+        repo = Ggit.Repository.open(repo_path)
+        updates = load_commit_history(repo, review_range)
+        groups = [
+            SplitGroup(
+                subject=subject,
+                commit_ids=[commit.get_id().to_string() for commit in commits],
+                message=PackageUpdate(
+                    repo=repo,
+                    subject=subject,
+                    commits=commits,
+                ).props.final_commit_message,
+            )
+            for subject, commits in updates.items()
+        ]
+        if len(groups) == 0:
+            sys.exit("error: there are no updates to split.")
+
+        if base_revspec is not None:
+            base_id = repo.revparse(base_revspec).get_id().to_string()
+        else:
+            base_id = get_parent_id(repo, groups[0].commit_ids[0])
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            splitter = BranchSplitter(ThreadRepositories(repo_path), executor)
+            if len(path_patterns) > 0:
+                groups = splitter.select_by_paths(groups, path_patterns)
+            result = splitter.split(repo, groups, base_id, get_config_signature(repo))
+        create_branch(repo, branch_name, result.head_id)
+    except GLib.Error as error:
+        sys.exit(f"error: {error.message}")
+
+    print(f"Added {len(result.applied)} updates to “{branch_name}”.")
+    for conflict in result.conflicts:
+        print(
+            f"error: “{conflict.subject}” conflicts in {', '.join(conflict.paths)}",
+            file=sys.stderr,
+        )
+    if len(result.conflicts) > 0:
+        sys.exit(1)
@@ -0,0 +1,517 @@
+# SPDX-FileCopyrightText: 2022 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import Ggit
+from gi.repository import Gio
+from gi.repository import GLib
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Executor, Future
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Optional
+from .git_utils import AnyCommit, LazyCommit, ThreadRepositories
+from .subject_index import SubjectIndex
+from .trailers import parse_message
+
+NIXPKGS_REMOTE_URL = "git@github.com:NixOS/nixpkgs.git"
+
+# Other URLs commonly used for the upstream remote, e.g. by CI runners.
+NIXPKGS_REMOTE_URLS = {
+    NIXPKGS_REMOTE_URL,
+    "https://github.com/NixOS/nixpkgs.git",
+    "https://github.com/NixOS/nixpkgs",
+}
+
+
+@dataclass
+class ReviewRange:
+    """Description of which commits should be included in the review.
+
+    When none of the limits are given, commits not yet on upstream master
+    or staging branches are reviewed.
+    """
+
+    # Revspec of the first commit to exclude from the review.
+    base_revspec: Optional[str] = None
+    # Unix time before which commits are excluded.
+    since: Optional[int] = None
+    # Maximum number of most recent commits to include.
+    depth: Optional[int] = None
+
+    def needs_upstream(self) -> bool:
+        return self.base_revspec is None and self.since is None and self.depth is None
+
+
+def find_nixpkgs_remote_name(repo: Ggit.Repository) -> Optional[str]:
+    for remote_name in repo.list_remotes():
+        remote = repo.lookup_remote(remote_name)
+        if remote is not None:
+            if remote.get_url() in NIXPKGS_REMOTE_URLS:
+                return remote_name
+    return None
+
+
+def get_merge_base(
+    repo: Ggit.Repository,
+    oid_one: Ggit.OId,
+    oid_two: Optional[Ggit.OId],
+) -> Optional[Ggit.OId]:
+    if oid_two is None:
+        return None
+    try:
+        return repo.merge_base(oid_one, oid_two)
+    except GLib.Error as e:
+        # Also happens when the history is cut short by a shallow clone.
+        return None
+
+
+def get_remote_branch_target(
+    repo: Ggit.Repository,
+    branch_name: str,
+) -> Optional[Ggit.OId]:
+    try:
+        return repo.lookup_branch(branch_name, Ggit.BranchType.REMOTE).get_target()
+    except GLib.Error as e:
+        # Single-branch clones do not need to contain the branch.
+        return None
+
+
+def check_cancelled(cancellable: Optional[Gio.Cancellable]) -> None:
+    """Raise GLib.Error with Gio.IOErrorEnum.CANCELLED code when loading was cancelled."""
+    if cancellable is not None:
+        cancellable.set_error_if_cancelled()
+
+
+def find_recent_history_boundary(
+    repo: Ggit.Repository,
+    head: Ggit.OId,
+    since: Optional[int],
+    depth: Optional[int],
+    cancellable: Optional[Gio.Cancellable] = None,
+) -> list[Ggit.OId]:
+    """Find parents of commits that are newer than since and among depth most recent ones.
+
+    Only the recent part of the history is visited, which is also all that is available in shallow clones.
+    """
+    revwalker: Ggit.RevisionWalker = Ggit.RevisionWalker.new(repo)
+    revwalker.set_sort_mode(Ggit.SortMode.TIME)
+    revwalker.push(head)
+
+    included: list[Ggit.Commit] = []
+    included_ids: set[str] = set()
+    while (oid := revwalker.next()) is not None:
+        check_cancelled(cancellable)
+        if depth is not None and len(included) >= depth:
+            break
+        commit: Ggit.Commit = repo.lookup_commit(oid)
+        if since is not None and commit.get_committer().get_time().to_unix() < since:
+            break
+        included.append(commit)
+        included_ids.add(oid.to_string())
+
+    boundary: dict[str, Ggit.OId] = {}
+    for commit in included:
+        parents: Ggit.CommitParents = commit.get_parents()
+        for i in range(parents.get_size()):
+            # Only look at the ID, the parent object might not be present.
+            parent_id = parents.get_id(i)
+            if (parent_id_str := parent_id.to_string()) not in included_ids:
+                boundary[parent_id_str] = parent_id
+
+    return list(boundary.values())
+
+
+class MergeBaseCache:
+    """Merge bases keyed by the pair of commits.
+
+    When the history is reloaded, only merge bases with branches that moved need to be computed again.
+    """
+
+    def __init__(self):
+        self._merge_bases: dict[tuple[str, str], Optional[str]] = {}
+
+    def get(
+        self,
+        repo: Ggit.Repository,
+        oid_one: Ggit.OId,
+        oid_two: Optional[Ggit.OId],
+    ) -> Optional[Ggit.OId]:
+        if oid_two is None:
+            return None
+        key = (oid_one.to_string(), oid_two.to_string())
+        if key not in self._merge_bases:
+            merge_base = get_merge_base(repo, oid_one, oid_two)
+            self._merge_bases[key] = (
+                merge_base.to_string() if merge_base is not None else None
+            )
+        if (merge_base_id := self._merge_bases[key]) is None:
+            return None
+        return Ggit.OId.new_from_string(merge_base_id)
+
+
+# Number of commits read by a worker at once, large enough to amortize scheduling.
+HYDRATION_BATCH_SIZE = 32
+
+
+# Subject and message of a commit.
+CommitText = tuple[str, str]
+
+
+class CommitHydrator:
+    """Reads commits in batches on a pool of workers.
+
+    Each worker has its own repository handle, so that libgit2 can read objects concurrently.
+    Only strings are returned, since the objects cannot leave the worker’s repository.
+    """
+
+    def __init__(
+        self,
+        repositories: ThreadRepositories,
+        executor: Executor,
+        batch_size: int = HYDRATION_BATCH_SIZE,
+    ):
+        self._repositories = repositories
+        self._executor = executor
+        self._batch_size = batch_size
+
+    def _read_batch(
+        self,
+        commit_ids: list[str],
+        cancellable: Optional[Gio.Cancellable],
+    ) -> list[CommitText]:
+        repo = self._repositories.get()
+        texts = []
+        for commit_id in commit_ids:
+            check_cancelled(cancellable)
+            commit: Ggit.Commit = repo.lookup_commit(
+                Ggit.OId.new_from_string(commit_id)
+            )
+            message = commit.get_message()
+            # Parsed messages are cached, so updates created on the main thread find them ready.
+            parse_message(message)
+            texts.append((commit.get_subject(), message))
+        return texts
+
+    def read_texts(
+        self,
+        commit_ids: list[str],
+        cancellable: Optional[Gio.Cancellable] = None,
+    ) -> list[CommitText]:
+        """Return subjects and messages of commits in the same order as commit_ids.
+
+        Raises GLib.Error when a commit cannot be read or cancellable is cancelled.
+        """
+        futures: list[Future[list[CommitText]]] = []
+        try:
+            for start in range(0, len(commit_ids), self._batch_size):
+                futures.append(
+                    self._executor.submit(
+                        self._read_batch,
+                        commit_ids[start : start + self._batch_size],
+                        cancellable,
+                    )
+                )
+            # Collected in submission order, which keeps the order of the walk.
+            return [text for future in futures for text in future.result()]
+        except (CancelledError, RuntimeError):
+            # The pool was shut down, e.g. because the window was closed.
+            raise GLib.Error.new_literal(
+                Gio.io_error_quark(),
+                "Loading was cancelled",
+                Gio.IOErrorEnum.CANCELLED,
+            )
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+class CommitSubjectCache:
+    """Subjects of commits keyed by commit ID.
+
+    Commits are immutable, so when the history is reloaded, e.g. with a different base,
+    only commits that were not seen before need to be read.
+    """
+
+    def __init__(self):
+        self._subjects: dict[str, str] = {}
+
+    def get_many(
+        self,
+        repo: Ggit.Repository,
+        commit_ids: list[str],
+        hydrator: Optional[CommitHydrator] = None,
+        cancellable: Optional[Gio.Cancellable] = None,
+        read_texts: Optional[dict[str, CommitText]] = None,
+    ) -> list[str]:
+        """Return subjects of commits, reading the missing ones with hydrator when given.
+
+        Subjects and messages of the commits that had to be read are also stored into read_texts,
+        so that the commits do not need to be looked up again, see lookup_update_commits.
+        """
+        missing = [
+            commit_id for commit_id in commit_ids if commit_id not in self._subjects
+        ]
+        if hydrator is not None:
+            texts = hydrator.read_texts(missing, cancellable)
+        else:
+            texts = []
+            for commit_id in missing:
+                check_cancelled(cancellable)
+                commit: Ggit.Commit = repo.lookup_commit(
+                    Ggit.OId.new_from_string(commit_id)
+                )
+                texts.append((commit.get_subject(), commit.get_message()))
+        for commit_id, (subject, message) in zip(missing, texts):
+            self._subjects[commit_id] = subject
+            if read_texts is not None:
+                read_texts[commit_id] = (subject, message)
+        return [self._subjects[commit_id] for commit_id in commit_ids]
+
+
+def find_review_bases(
+    repo: Ggit.Repository,
+    head: Ggit.OId,
+    review_range: ReviewRange,
+    merge_bases: Optional[MergeBaseCache] = None,
+    cancellable: Optional[Gio.Cancellable] = None,
+) -> list[Ggit.OId]:
+    """Find commits whose ancestors are excluded from the review.
+
+    Raises GLib.Error when the upstream remote is needed but missing.
+    """
+    if merge_bases is None:
+        merge_bases = MergeBaseCache()
+
+    bases = []
+    if review_range.needs_upstream():
+        # Find the remote corresponding to upstream Nixpkgs
+        nixpkgs_remote_name = find_nixpkgs_remote_name(repo)
+        if nixpkgs_remote_name is None:
+            raise GLib.Error(
+                f"Could not find a Git remote with URL “{NIXPKGS_REMOTE_URL}”. Use --base-commit, --since or --depth option to choose the commits to review.",
+                "nonemast",
+                1,
+            )
+
+        # Determine merge bases between the current branch and master and staging branches.
+        merge_base_staging = merge_bases.get(
+            repo,
+            head,
+            get_remote_branch_target(repo, f"{nixpkgs_remote_name}/staging"),
+        )
+        if merge_base_staging is not None:
+            bases.append(merge_base_staging)
+        merge_base_master = merge_bases.get(
+            repo,
+            head,
+            get_remote_branch_target(repo, f"{nixpkgs_remote_name}/master"),
+        )
+        if merge_base_master is not None:
+            bases.append(merge_base_master)
+
+    if review_range.base_revspec is not None:
+        base = repo.revparse(review_range.base_revspec).get_id()
+        bases.append(base)
+
+    if review_range.since is not None or review_range.depth is not None:
+        bases += find_recent_history_boundary(
+            repo,
+            head,
+            since=review_range.since,
+            depth=review_range.depth,
+            cancellable=cancellable,
+        )
+
+    return bases
+
+
+# Subject of an update and IDs of its commits.
+UpdateGroup = tuple[str, list[str]]
+
+
+def group_commit_ids_by_update(
+    repo: Ggit.Repository,
+    head: Ggit.OId,
+    bases: list[Ggit.OId],
+    subjects: Optional[CommitSubjectCache] = None,
+    hydrator: Optional[CommitHydrator] = None,
+    cancellable: Optional[Gio.Cancellable] = None,
+    read_texts: Optional[dict[str, CommitText]] = None,
+) -> list[UpdateGroup]:
+    """Group IDs of commits between bases and head by the subject of the commit they are fixing up.
+
+    The walk only produces commit IDs, the commits are read afterwards, in parallel when hydrator is given.
+    Texts of the commits that were read are stored into read_texts, see CommitSubjectCache.get_many.
+    Raises GLib.Error with Gio.IOErrorEnum.CANCELLED code as soon as cancellable is cancelled.
+    """
+    if subjects is None:
+        subjects = CommitSubjectCache()
+    updates: dict[str, list[str]] = {}
+    subject_index = SubjectIndex()
+
+    # Traverse the commit list until one of the merge bases or a limit is reached.
+    n_revisions = 500
+    revwalker: Ggit.RevisionWalker = Ggit.RevisionWalker.new(repo)
+    revwalker.set_sort_mode(
+        Ggit.SortMode.TIME | Ggit.SortMode.TOPOLOGICAL | Ggit.SortMode.REVERSE
+    )
+    for base in bases:
+        try:
+            revwalker.hide(base)
+        except GLib.Error as e:
+            # Commits beyond a shallow boundary are not available,
+            # libgit2 will not walk to them either.
+            pass
+    revwalker.push(head)
+
+    commit_ids: list[str] = []
+    while (oid := revwalker.next()) is not None:
+        check_cancelled(cancellable)
+        commit_ids.append(oid.to_string())
+
+        if (n_revisions := n_revisions - 1) == 0:
+            break
+
+    commit_subjects = subjects.get_many(
+        repo, commit_ids, hydrator, cancellable, read_texts
+    )
+
+    # Fixups can only refer to earlier commits, so they need to be grouped in the order of the walk.
+    for commit_id, subject in zip(commit_ids, commit_subjects):
+        update_subject = subject_index.add_commit(commit_id, subject)
+
+        # Add commit to the group.
+        updates.setdefault(update_subject, []).append(commit_id)
+
+    return list(updates.items())
+
+
+def group_commits_by_update(
+    repo: Ggit.Repository,
+    head: Ggit.OId,
+    bases: list[Ggit.OId],
+) -> OrderedDict[str, list[AnyCommit]]:
+    """Group commits between bases and head by the subject of the commit they are fixing up."""
+    read_texts: dict[str, CommitText] = {}
+    return lookup_update_commits(
+        repo,
+        group_commit_ids_by_update(repo, head, bases, read_texts=read_texts),
+        read_texts,
+    )
+
+
+def lookup_update_commits(
+    repo: Ggit.Repository,
+    groups: list[UpdateGroup],
+    read_texts: Optional[dict[str, CommitText]] = None,
+) -> OrderedDict[str, list[AnyCommit]]:
+    """Return commits of the groups.
+
+    Commits whose texts were already read, e.g. by workers, are only looked up
+    in repo when their objects are needed, see LazyCommit.
+    """
+    if read_texts is None:
+        read_texts = {}
+    return OrderedDict(
+        (
+            subject,
+            [
+                (
+                    LazyCommit(repo, commit_id, *text)
+                    if (text := read_texts.get(commit_id)) is not None
+                    else repo.lookup_commit(Ggit.OId.new_from_string(commit_id))
+                )
+                for commit_id in commit_ids
+            ],
+        )
+        for subject, commit_ids in groups
+    )
+
+
+def load_update_groups(
+    repo: Ggit.Repository,
+    review_range: ReviewRange,
+    merge_bases: Optional[MergeBaseCache] = None,
+    subjects: Optional[CommitSubjectCache] = None,
+    hydrator: Optional[CommitHydrator] = None,
+    cancellable: Optional[Gio.Cancellable] = None,
+    read_texts: Optional[dict[str, CommitText]] = None,
+) -> list[UpdateGroup]:
+    """Group IDs of commits on the current branch by the subject of the commit they are fixing up.
+
+    Raises GLib.Error when the history cannot be read, or when cancellable is cancelled.
+    """
+    head = repo.get_head().get_target()
+
+    bases = find_review_bases(repo, head, review_range, merge_bases, cancellable)
+
+    return group_commit_ids_by_update(
+        repo,
+        head,
+        bases,
+        subjects,
+        hydrator,
+        cancellable,
+        read_texts,
+    )
+
+
+def load_commit_history(
+    repo: Ggit.Repository,
+    review_range: ReviewRange,
+    merge_bases: Optional[MergeBaseCache] = None,
+) -> OrderedDict[str, list[AnyCommit]]:
+    """Group commits on the current branch by the subject of the commit they are fixing up.
+
+    Works with bare repositories, as well as shallow and partial clones, as long as
+    the review range does not reach beyond the available history.
+
+    Raises GLib.Error when the history cannot be read.
+    """
+    read_texts: dict[str, CommitText] = {}
+    return lookup_update_commits(
+        repo,
+        load_update_groups(repo, review_range, merge_bases, read_texts=read_texts),
+        read_texts,
+    )
+
+
+def plan_update_splices(
+    old_groups: list[UpdateGroup],
+    new_groups: list[UpdateGroup],
+) -> list[tuple[int, int, int, int]]:
+    """Find ranges of groups that need to be replaced to turn old groups into the new ones.
+
+    Groups are pairs of the update subject and IDs of its commits. Returns
+    (old_start, old_end, new_start, new_end) tuples from the last one, so that
+    they can be applied to the old list without shifting the following positions.
+    """
+    matcher = SequenceMatcher(
+        None,
+        [(subject, tuple(commit_ids)) for subject, commit_ids in old_groups],
+        [(subject, tuple(commit_ids)) for subject, commit_ids in new_groups],
+        autojunk=False,
+    )
+    return [
+        (old_start, old_end, new_start, new_end)
+        for tag, old_start, old_end, new_start, new_end in reversed(
+            matcher.get_opcodes()
+        )
+        if tag != "equal"
+    ]
+
+
+def get_branch_remote_name(repo: Ggit.Repository) -> Optional[str]:
+    """Return name of the remote the current branch tracks, if any."""
+    try:
+        head = repo.get_head()
+        if not head.is_branch():
+            return None
+        config: Ggit.Config = repo.get_config().snapshot()
+        remote_name = config.get_string(f"branch.{head.get_shorthand()}.remote")
+    except GLib.Error as e:
+        # Detached HEAD or no upstream configured.
+        return None
+
+    # “.” means the branch tracks another local branch.
+    return remote_name if remote_name != "." else None
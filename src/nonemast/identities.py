@@ -0,0 +1,89 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import Ggit
+from gi.repository import GLib
+from typing import Optional
+import re
+import threading
+
+IDENTITY_REGEX = re.compile(r"^(.*?)\s*<([^<>]*)>$")
+
+
+def parse_identity(identity: str) -> Optional[tuple[str, str]]:
+    """Split “Name <email>” into name and e-mail address."""
+    if (match := IDENTITY_REGEX.match(identity.strip())) is None:
+        return None
+    return match.group(1), match.group(2)
+
+
+class IdentityResolver:
+    """Canonical “Name <email>” identities of people according to the mailmap.
+
+    People who committed under several names or addresses are mapped to
+    a single identity. Results are cached for each distinct name and e-mail
+    pair, so the cost depends on the number of people rather than commits.
+    """
+
+    def __init__(self, mailmap: Optional[Ggit.Mailmap] = None):
+        self._mailmap = mailmap
+        self._lock = threading.Lock()
+        self._identities: dict[tuple[str, str], str] = {}
+        self._parsed_identities: dict[str, str] = {}
+
+    @staticmethod
+    def new_from_repository(repo: Ggit.Repository) -> "IdentityResolver":
+        resolver = IdentityResolver()
+        resolver.load_mailmap(repo)
+        return resolver
+
+    def load_mailmap(self, repo: Ggit.Repository) -> None:
+        """Use .mailmap of the repository and mailmap.file config, forgetting resolved identities."""
+        try:
+            mailmap: Ggit.Mailmap = Ggit.Mailmap.new_from_repository(repo)
+        except GLib.Error as e:
+            # The .mailmap blob might be missing in partial clones.
+            mailmap = Ggit.Mailmap.new()
+        with self._lock:
+            self._mailmap = mailmap
+            self._identities.clear()
+            self._parsed_identities.clear()
+
+    def resolve(self, name: str, email: str) -> str:
+        key = (name, email)
+        with self._lock:
+            if (identity := self._identities.get(key)) is not None:
+                return identity
+
+        if self._mailmap is not None:
+            try:
+                name, email = self._mailmap.resolve(name, email)
+            except GLib.Error as e:
+                # Keep the identity as is.
+                pass
+        identity = f"{name} <{email}>"
+
+        with self._lock:
+            self._identities[key] = identity
+        return identity
+
+    def resolve_signature(self, signature: Ggit.Signature) -> str:
+        return self.resolve(signature.get_name(), signature.get_email())
+
+    def resolve_identity(self, identity: str) -> str:
+        """Resolve identity written as “Name <email>”, e.g. in a trailer.
+
+        Text that does not look like an identity is returned unchanged.
+        """
+        with self._lock:
+            if (resolved := self._parsed_identities.get(identity)) is not None:
+                return resolved
+
+        if (parsed := parse_identity(identity)) is not None:
+            resolved = self.resolve(*parsed)
+        else:
+            resolved = identity
+
+        with self._lock:
+            self._parsed_identities[identity] = resolved
+        return resolved
@@ -8,14 +8,37 @@ from gi.repository import Ggit
 from gi.repository import Gio
 from gi.repository import GLib
 from gi.repository import Gtk
+from .cache_manager import caches
+from .dbus_service import ReviewService
+from .headless import print_cache_statistics, print_statistics, split_branch
+from .history import ReviewRange
 from .window import NonemastWindow
 from typing import Callable, Optional, Sequence, TypeVar
 
 
+def parse_date(text: str) -> Optional[GLib.DateTime]:
+    """Parse ISO 8601 date, with optional time, in local time zone."""
+    if "T" not in text:
+        text += "T00:00:00"
+    try:
+        return GLib.DateTime.new_from_iso8601(text, GLib.TimeZone.new_local())
+    except TypeError:
+        # PyGObject raises when the constructor returns NULL on invalid input.
+        return None
+
+
 class NonemastApplication(Adw.Application):
     """The main application singleton class."""
 
-    _base_revspec: Optional[str] = None
+    _review_range: ReviewRange
+    _print_statistics: bool = False
+    _print_cache_statistics: bool = False
+    # Name of the branch to create instead of opening a window.
+    _split_branch_name: Optional[str] = None
+    _split_path_patterns: list[str] = []
+    _split_base_revspec: Optional[str] = None
+    _fetch_interval: Optional[int] = None
+    _review_service: Optional[ReviewService] = None
 
     def __init__(self, version: str):
         super().__init__(
@@ -23,10 +46,19 @@ class NonemastApplication(Adw.Application):
             flags=Gio.ApplicationFlags.HANDLES_OPEN,
         )
         Ggit.init()
+        # Results keyed by commit and blob IDs are reused across sessions.
+        caches.enable_disk_tier()
         self.version = version
+        self._review_range = ReviewRange()
         self._setup_commandline()
         self.create_action("quit", self.on_quit_action, ["<primary>q"])
         self.create_action("about", self.on_about_action)
+        self.set_accels_for_action("win.next-unreviewed", ["<alt>Down"])
+        self.set_accels_for_action("win.previous-unreviewed", ["<alt>Up"])
+        self.set_accels_for_action(
+            "win.mark-as-reviewed-and-advance", ["<primary>Return"]
+        )
+        self.set_accels_for_action("win.fetch", ["F5"])
 
     def _setup_commandline(self):
         self.add_main_option(
@@ -37,8 +69,90 @@ class NonemastApplication(Adw.Application):
             description="Revspec describing the first commit to include in the review (default: merge base between master and staging branches)",
             arg_description="<rev>",
         )
+        self.add_main_option(
+            long_name="since",
+            short_name=0,
+            flags=GLib.OptionFlags.NONE,
+            arg=GLib.OptionArg.STRING,
+            description="Only review commits committed after the given ISO 8601 date (useful for shallow clones)",
+            arg_description="<date>",
+        )
+        self.add_main_option(
+            long_name="depth",
+            short_name=0,
+            flags=GLib.OptionFlags.NONE,
+            arg=GLib.OptionArg.INT,
+            description="Only review the given number of most recent commits (useful for shallow clones)",
+            arg_description="<n>",
+        )
+        self.add_main_option(
+            long_name="fetch-interval",
+            short_name=0,
+            flags=GLib.OptionFlags.NONE,
+            arg=GLib.OptionArg.INT,
+            description="Fetch the upstream remote and the remote of the current branch in the background every given number of minutes, and refresh updates that changed",
+            arg_description="<minutes>",
+        )
+        self.add_main_option(
+            long_name="statistics",
+            short_name=0,
+            flags=GLib.OptionFlags.NONE,
+            arg=GLib.OptionArg.NONE,
+            description="Print review progress and reviewer statistics instead of opening a window",
+            arg_description=None,
+        )
+        self.add_main_option(
+            long_name="cache-statistics",
+            short_name=0,
+            flags=GLib.OptionFlags.NONE,
+            arg=GLib.OptionArg.NONE,
+            description="Print hit, miss and eviction counters of caches before exiting",
+            arg_description=None,
+        )
+        self.add_main_option(
+            long_name="split-branch",
+            short_name=0,
+            flags=GLib.OptionFlags.NONE,
+            arg=GLib.OptionArg.STRING,
+            description="Create a branch with all updates, or those selected with --split-path, autosquashed on top of the base instead of opening a window, without touching the working tree",
+            arg_description="<name>",
+        )
+        self.add_main_option(
+            long_name="split-path",
+            short_name=0,
+            flags=GLib.OptionFlags.NONE,
+            arg=GLib.OptionArg.STRING_ARRAY,
+            description="Only include updates changing files matching the glob pattern in the split branch (can be repeated)",
+            arg_description="<pattern>",
+        )
+        self.add_main_option(
+            long_name="split-base",
+            short_name=0,
+            flags=GLib.OptionFlags.NONE,
+            arg=GLib.OptionArg.STRING,
+            description="Revspec of the commit to create the split branch on (default: parent of the first reviewed commit)",
+            arg_description="<rev>",
+        )
 
     def do_activate(self, repo_path: Optional[Gio.File] = None) -> None:
+        if self._print_statistics:
+            if repo_path is None:
+                repo_path = Gio.File.new_for_path(GLib.get_current_dir())
+            print_statistics(repo_path, self._review_range)
+            return
+
+        if self._split_branch_name is not None:
+            if repo_path is None:
+                repo_path = Gio.File.new_for_path(GLib.get_current_dir())
+            split_branch(
+                repo_path,
+                self._review_range,
+                self._split_branch_name,
+                self._split_path_patterns,
+                self._split_base_revspec,
+            )
+            return
+
         win = self.props.active_window
         if not win:
             if repo_path is None:
@@ -46,16 +160,92 @@ class NonemastApplication(Adw.Application):
             win = NonemastWindow(
                 application=self,
                 repo_path=repo_path,
-                base_revspec=self._base_revspec,
+                review_range=self._review_range,
+                fetch_interval=self._fetch_interval,
             )
+            if self._review_service is not None:
+                self._review_service.set_window(win)
         win.present()
 
+    def do_dbus_register(
+        self,
+        connection: Gio.DBusConnection,
+        object_path: str,
+    ) -> bool:
+        self._review_service = ReviewService(connection, object_path)
+
+        return Adw.Application.do_dbus_register(self, connection, object_path)
+
+    def do_dbus_unregister(
+        self,
+        connection: Gio.DBusConnection,
+        object_path: str,
+    ) -> None:
+        if self._review_service is not None:
+            self._review_service.unregister()
+            self._review_service = None
+
+        Adw.Application.do_dbus_unregister(self, connection, object_path)
+
     def do_handle_local_options(self, options: GLib.VariantDict) -> int:
         if (base_revspec := options.lookup_value("base-commit")) is not None:
-            self._base_revspec = base_revspec.get_string()
+            self._review_range.base_revspec = base_revspec.get_string()
+
+        if (since := options.lookup_value("since")) is not None:
+            since_date = parse_date(since.get_string())
+            if since_date is None:
+                print(
+                    f"error: “{since.get_string()}” is not a valid ISO 8601 date.",
+                    file=sys.stderr,
+                )
+                return 1
+            self._review_range.since = since_date.to_unix()
+
+        if (depth := options.lookup_value("depth")) is not None:
+            if depth.get_int32() <= 0:
+                print("error: depth needs to be a positive number.", file=sys.stderr)
+                return 1
+            self._review_range.depth = depth.get_int32()
+
+        if (fetch_interval := options.lookup_value("fetch-interval")) is not None:
+            if fetch_interval.get_int32() <= 0:
+                print(
+                    "error: fetch interval needs to be a positive number.",
+                    file=sys.stderr,
+                )
+                return 1
+            self._fetch_interval = fetch_interval.get_int32()
+
+        if options.contains("statistics"):
+            self._print_statistics = True
+            # Run in this process even when another instance is already running.
+            self.set_flags(self.get_flags() | Gio.ApplicationFlags.NON_UNIQUE)
+
+        if options.contains("cache-statistics"):
+            self._print_cache_statistics = True
+
+        if (split_branch_name := options.lookup_value("split-branch")) is not None:
+            self._split_branch_name = split_branch_name.get_string()
+            self.set_flags(self.get_flags() | Gio.ApplicationFlags.NON_UNIQUE)
+        if (split_paths := options.lookup_value("split-path")) is not None:
+            self._split_path_patterns = split_paths.get_strv()
+        if (split_base := options.lookup_value("split-base")) is not None:
+            self._split_base_revspec = split_base.get_string()
+        if self._split_branch_name is None and (
+            split_paths is not None or split_base is not None
+        ):
+            print(
+                "error: --split-path and --split-base require --split-branch.",
+                file=sys.stderr,
+            )
+            return 1
 
         return -1
 
+    def report_caches(self) -> None:
+        if self._print_cache_statistics:
+            print_cache_statistics()
+
     def do_open(self, files: Sequence[Gio.File], n_files: int, hint: str) -> None:
         if n_files != 1:
             sys.exit("error: nonemast expects exactly one path as an argument.")
@@ -113,4 +303,9 @@ def main(version: str) -> int:
     app = NonemastApplication(
         version=version,
     )
-    return app.run(sys.argv)
+    try:
+        return app.run(sys.argv)
+    finally:
+        # Also when the headless modes exit with an error.
+        app.report_caches()
+        caches.flush()
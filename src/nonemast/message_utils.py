@@ -3,24 +3,10 @@
 
 from linkify_it import LinkifyIt
 from linkify_it.tlds import TLDS
-from typing import Optional
 import html
 import re
 
 
-def has_changelog_reviewed_tag(line: str) -> bool:
-    return re.match(r"^Changelog-Reviewed-By: ", line) is not None
-
-
-def find_changelog_link(lines: list[str]) -> Optional[str]:
-    # Heuristics: First line starting with a URL is likely a changelog.
-    for line in lines:
-        line = line.strip()
-        if line.startswith("https://"):
-            return line
-    return None
-
-
 def linkify_html(text: str) -> str:
     linkify = LinkifyIt().tlds(TLDS)
 
@@ -0,0 +1,310 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import Ggit
+from gi.repository import Gio
+from gi.repository import GLib
+from concurrent.futures import CancelledError, Executor, Future
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from typing import Callable, Optional, TypeVar
+import sys
+from ..cache_manager import caches
+from ..git_utils import ThreadRepositories, get_commit_diff, get_diff_deltas
+from ..history import check_cancelled
+
+# Stage bits of index entry flags, only non-zero for the sides of a conflict.
+INDEX_ENTRY_STAGE_MASK = 0x3000
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Paths changed by each commit, keyed by commit ID.
+_changed_paths = caches.create(
+    "changed-paths",
+    max_bytes=32 * 1024 * 1024,
+    size_of=lambda commit_id, paths: sys.getsizeof(commit_id)
+    + sum(sys.getsizeof(path) for path in paths),
+    persistent=True,
+)
+
+
+@dataclass
+class SplitGroup:
+    """Update to include in a split branch."""
+
+    subject: str
+    # Commits of the update, from the oldest.
+    commit_ids: list[str]
+    # Message of the autosquashed commit.
+    message: str
+
+
+@dataclass
+class SplitConflict:
+    subject: str
+    # Files that could not be merged.
+    paths: list[str]
+
+
+@dataclass
+class SplitResult:
+    # Last commit of the split branch, the base when no update could be applied.
+    head_id: str
+    # Subjects of the updates included in the branch.
+    applied: list[str] = field(default_factory=list)
+    conflicts: list[SplitConflict] = field(default_factory=list)
+
+
+class ConflictError(Exception):
+    """Changes could not be merged without conflicts."""
+
+    def __init__(self, paths: list[str]):
+        super().__init__(f"Conflicts in {', '.join(paths)}")
+        self.paths = paths
+
+
+def get_conflicting_paths(index: Ggit.Index) -> list[str]:
+    entries: Ggit.IndexEntries = index.get_entries()
+    paths: dict[str, None] = {}
+    for i in range(entries.size()):
+        entry: Ggit.IndexEntry = entries.get_by_index(i)
+        if entry.get_flags() & INDEX_ENTRY_STAGE_MASK != 0:
+            paths[entry.get_path()] = None
+    return list(paths)
+
+
+def is_same_tree(one: Optional[Ggit.Tree], two: Optional[Ggit.Tree]) -> bool:
+    if one is None or two is None:
+        return one is two
+    return one.get_id().equal(two.get_id())
+
+
+def merge_trees(
+    repo: Ggit.Repository,
+    ancestor: Optional[Ggit.Tree],
+    ours: Ggit.Tree,
+    theirs: Ggit.Tree,
+) -> Ggit.Tree:
+    """Merge changes between ancestor and theirs into ours, without touching the index or the working tree.
+
+    Raises ConflictError when the changes overlap.
+    """
+    if is_same_tree(ancestor, ours):
+        return theirs
+    if is_same_tree(ancestor, theirs):
+        # E.g. empty review commits.
+        return ours
+
+    index: Ggit.Index = repo.merge_trees(
+        ancestor,
+        ours,
+        theirs,
+        Ggit.MergeOptions.new(),
+    )
+    if index.has_conflicts():
+        raise ConflictError(get_conflicting_paths(index))
+    return repo.lookup_tree(index.write_tree_to(repo))
+
+
+def apply_commits(
+    repo: Ggit.Repository,
+    tree: Ggit.Tree,
+    commit_ids: list[str],
+    cancellable: Optional[Gio.Cancellable] = None,
+) -> Ggit.Tree:
+    """Cherry-pick changes of the commits onto tree one after another.
+
+    Raises ConflictError when a commit does not apply.
+    """
+    for commit_id in commit_ids:
+        check_cancelled(cancellable)
+        commit: Ggit.Commit = repo.lookup_commit(Ggit.OId.new_from_string(commit_id))
+        parents: Ggit.CommitParents = commit.get_parents()
+        parent_tree = parents.get(0).get_tree() if parents.get_size() > 0 else None
+        tree = merge_trees(repo, parent_tree, tree, commit.get_tree())
+    return tree
+
+
+def get_changed_paths(repo: Ggit.Repository, commit_ids: list[str]) -> set[str]:
+    """Return paths of files changed by any of the commits, both before and after renames."""
+    paths: set[str] = set()
+    for commit_id in commit_ids:
+        if (commit_paths := _changed_paths.get(commit_id)) is None:
+            commit: Ggit.Commit = repo.lookup_commit(
+                Ggit.OId.new_from_string(commit_id)
+            )
+            diff = get_commit_diff(repo, commit)
+            if diff is None:
+                # Not cached, the objects might be fetched later.
+                continue
+            commit_paths = sorted(
+                {
+                    path
+                    for delta in get_diff_deltas(diff)
+                    for path in [
+                        delta.get_old_file().get_path(),
+                        delta.get_new_file().get_path(),
+                    ]
+                }
+            )
+            _changed_paths.put(commit_id, commit_paths)
+        paths.update(commit_paths)
+    return paths
+
+
+def get_parent_id(repo: Ggit.Repository, commit_id: str) -> str:
+    """Return ID of the first parent, e.g. to use the base of the review for the split branch."""
+    commit: Ggit.Commit = repo.lookup_commit(Ggit.OId.new_from_string(commit_id))
+    return commit.get_parents().get_id(0).to_string()
+
+
+def create_squashed_commit(
+    repo: Ggit.Repository,
+    group: SplitGroup,
+    parent: Ggit.Commit,
+    tree: Ggit.Tree,
+    committer: Optional[Ggit.Signature] = None,
+) -> Ggit.Commit:
+    """Create commit of the whole update, authored like the first commit of the update."""
+    first_commit: Ggit.Commit = repo.lookup_commit(
+        Ggit.OId.new_from_string(group.commit_ids[0])
+    )
+    message = group.message if group.message.endswith("\n") else group.message + "\n"
+    commit_id: Ggit.OId = repo.create_commit(
+        update_ref=None,
+        author=first_commit.get_author(),
+        committer=committer or first_commit.get_committer(),
+        message_encoding="UTF-8",
+        message=message,
+        tree=tree,
+        parents=[parent],
+    )
+    return repo.lookup_commit(commit_id)
+
+
+def create_branch(repo: Ggit.Repository, name: str, head_id: str) -> None:
+    """Point a new branch at the commit, raising GLib.Error when it already exists."""
+    head: Ggit.Commit = repo.lookup_commit(Ggit.OId.new_from_string(head_id))
+    repo.create_branch(name, head, Ggit.CreateFlags.NONE)
+
+
+class BranchSplitter:
+    """Builds branches with a subset of updates, autosquashed on top of a chosen base.
+
+    Everything happens in the object database, so neither the index nor
+    the working tree are touched. Each update is first applied on the base
+    by a pool of workers, and the results are then combined with cheap
+    three-way merges of trees. Only updates that depend on the preceding
+    ones have their commits replayed one by one.
+    """
+
+    def __init__(self, repositories: ThreadRepositories, executor: Executor):
+        self._repositories = repositories
+        self._executor = executor
+
+    def _map(
+        self,
+        function: Callable[[T], R],
+        items: list[T],
+    ) -> list[R]:
+        """Run function on items in the pool and return the results in the same order."""
+        futures: list[Future[R]] = []
+        try:
+            for item in items:
+                futures.append(self._executor.submit(function, item))
+            return [future.result() for future in futures]
+        except (CancelledError, RuntimeError):
+            # The pool was shut down, e.g. because the window was closed.
+            raise GLib.Error.new_literal(
+                Gio.io_error_quark(),
+                "Splitting was cancelled",
+                Gio.IOErrorEnum.CANCELLED,
+            )
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def select_by_paths(
+        self,
+        groups: list[SplitGroup],
+        patterns: list[str],
+        cancellable: Optional[Gio.Cancellable] = None,
+    ) -> list[SplitGroup]:
+        """Return updates changing a file whose path matches any of the glob patterns."""
+
+        def matches(group: SplitGroup) -> bool:
+            check_cancelled(cancellable)
+            paths = get_changed_paths(self._repositories.get(), group.commit_ids)
+            return any(
+                fnmatchcase(path, pattern) for path in paths for pattern in patterns
+            )
+
+        return [
+            group
+            for group, selected in zip(groups, self._map(matches, groups))
+            if selected
+        ]
+
+    def split(
+        self,
+        repo: Ggit.Repository,
+        groups: list[SplitGroup],
+        base_id: str,
+        committer: Optional[Ggit.Signature] = None,
+        cancellable: Optional[Gio.Cancellable] = None,
+    ) -> SplitResult:
+        """Create a commit for each update on top of base, skipping updates that conflict.
+
+        The commits are not referenced by any branch yet, see create_branch.
+        Raises GLib.Error when objects cannot be read or written, or when cancellable is cancelled.
+        """
+
+        def apply_on_base(group: SplitGroup) -> Optional[str]:
+            worker_repo = self._repositories.get()
+            base: Ggit.Commit = worker_repo.lookup_commit(
+                Ggit.OId.new_from_string(base_id)
+            )
+            try:
+                tree = apply_commits(
+                    worker_repo, base.get_tree(), group.commit_ids, cancellable
+                )
+            except ConflictError:
+                # Might still apply on top of the updates preceding it.
+                return None
+            # Trees cannot be passed between repositories, only their IDs.
+            return tree.get_id().to_string()
+
+        group_tree_ids = self._map(apply_on_base, groups)
+
+        head: Ggit.Commit = repo.lookup_commit(Ggit.OId.new_from_string(base_id))
+        base_tree: Ggit.Tree = head.get_tree()
+        tree = base_tree
+        result = SplitResult(head_id=base_id)
+        for group, group_tree_id in zip(groups, group_tree_ids):
+            check_cancelled(cancellable)
+            try:
+                if group_tree_id is None:
+                    raise ConflictError([])
+                new_tree = merge_trees(
+                    repo,
+                    base_tree,
+                    tree,
+                    repo.lookup_tree(Ggit.OId.new_from_string(group_tree_id)),
+                )
+            except ConflictError:
+                # The update builds on or overlaps with the preceding ones, so replay it on top of them.
+                try:
+                    new_tree = apply_commits(repo, tree, group.commit_ids, cancellable)
+                except ConflictError as conflict:
+                    result.conflicts.append(
+                        SplitConflict(group.subject, conflict.paths)
+                    )
+                    continue
+
+            head = create_squashed_commit(repo, group, head, new_tree, committer)
+            tree = new_tree
+            result.applied.append(group.subject)
+
+        result.head_id = head.get_id().to_string()
+        return result
@@ -5,13 +5,46 @@ from gi.repository import Ggit
 from gi.repository import Gio
 from gi.repository import GLib
 from gi.repository import GObject
-from .message_utils import (
-    has_changelog_reviewed_tag,
-    find_changelog_link,
-    linkify_html,
+from .cache_manager import caches
+from .diff_shapes import SHAPE_LABELS
+from .git_utils import AnyCommit, get_commit_diff, resolve_commit
+from .message_utils import linkify_html
+from .session_snapshot import SESSION_CHANGE_LABELS
+from .trailers import (
+    CHANGELOG_REVIEWED_BY,
+    CO_AUTHORED_BY,
+    ParsedMessage,
+    parse_message,
 )
+from typing import Optional
 import html
 
+# Number of deltas in the diff of each commit, keyed by commit ID.
+_diff_stats = caches.create("diff-stats", max_entries=100_000, persistent=True)
+
+# Markup of final commit messages keyed by the message, rendered when the details of an update are shown.
+_rendered_messages = caches.create("rendered-markup", max_bytes=16 * 1024 * 1024)
+
+
+def render_message_markup(message: str) -> str:
+    if (markup := _rendered_messages.get(message)) is None:
+        markup = linkify_html(message)
+        _rendered_messages.put(message, markup)
+    return markup
+
+
+def get_diff_delta_count(repo: Ggit.Repository, commit: AnyCommit) -> Optional[int]:
+    """Return number of deltas in the diff of the commit, or None when the diff is not available."""
+    commit_id = commit.get_id().to_string()
+    if (num_deltas := _diff_stats.get(commit_id)) is None:
+        diff = get_commit_diff(repo, resolve_commit(commit))
+        if diff is None:
+            # Not cached, the objects might be fetched later.
+            return None
+        num_deltas = diff.get_num_deltas()
+        _diff_stats.put(commit_id, num_deltas)
+    return num_deltas
+
 
 def try_getting_corresponding_github_link(url: str) -> str:
     url = url.replace(
@@ -24,13 +57,16 @@ def try_getting_corresponding_github_link(url: str) -> str:
 
 
 class CommitInfo(GObject.Object):
-    """Wrapper around Ggit.Commit exposing properties as GObject properties."""
+    """Wrapper around Ggit.Commit exposing properties as GObject properties.
+
+    Lazy commits are only looked up when the commit object is needed.
+    """
 
     __gtype_name__ = "CommitInfo"
 
     id_gvariant = GObject.Property(type=GObject.TYPE_VARIANT)
 
-    def __init__(self, repo: Ggit.Repository, commit: Ggit.Commit, **kwargs):
+    def __init__(self, repo: Ggit.Repository, commit: AnyCommit, **kwargs):
         super().__init__(**kwargs)
         self._repo = repo
         self._commit = commit
@@ -66,28 +102,18 @@ class CommitInfo(GObject.Object):
 
     @GObject.Property(type=str)
     def description(self):
-        commit_parents = self._commit.get_parents()
-
-        if commit_parents.get_size() > 0:
-            parent_commit = commit_parents.get(0)
-            commit_tree = self._commit.get_tree()
-            parent_tree = parent_commit.get_tree()
-
-            diff = Ggit.Diff.new_tree_to_tree(
-                self._repo, parent_tree, commit_tree, None
-            )
-
-            num_deltas = diff.get_num_deltas()
-            return (
-                f"{num_deltas} delta in diff"
-                if num_deltas == 1
-                else f"{num_deltas} deltas in diff"
-            )
-
-        return ""
+        num_deltas = get_diff_delta_count(self._repo, self._commit)
+        if num_deltas is None:
+            return "Diff not available"
+
+        return (
+            f"{num_deltas} delta in diff"
+            if num_deltas == 1
+            else f"{num_deltas} deltas in diff"
+        )
 
     def get_commit(self) -> Ggit.Commit:
-        return self._commit
+        return resolve_commit(self._commit)
 
 
 class PackageUpdate(GObject.Object):
@@ -96,13 +122,27 @@ class PackageUpdate(GObject.Object):
     subject_gvariant = GObject.Property(type=GObject.TYPE_VARIANT)
     commit_message_is_edited = GObject.Property(type=bool, default=False)
     editing_stack_page = GObject.Property(type=str, default="not-editing")
-    final_commit_message_rich = GObject.Property(type=str)
+    # Whether the message is being edited in the details view rather than in an external editor.
+    commit_message_is_edited_inline = GObject.Property(type=bool, default=False)
+    message_stack_page = GObject.Property(type=str, default="message")
+    # Contents of the inline editor, kept with the update so that changing the selection does not lose it.
+    commit_message_draft = GObject.Property(type=str, default="")
+    # Description of disagreement between version change in subject and in the diff.
+    version_bump_mismatch = GObject.Property(type=str)
+    has_version_bump_mismatch = GObject.Property(type=bool, default=False)
+    # One of SHAPE_* constants from diff_shapes, None until classified.
+    diff_shape = GObject.Property(type=str)
+    diff_shape_label = GObject.Property(type=str)
+    # One of SESSION_CHANGE_* constants from session_snapshot, None when unchanged since last session.
+    session_change = GObject.Property(type=str)
+    session_change_label = GObject.Property(type=str)
+    has_session_change = GObject.Property(type=bool, default=False)
 
     def __init__(
         self,
         repo: Ggit.Repository,
         subject: str,
-        commits: list[Ggit.Commit],
+        commits: list[AnyCommit],
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -110,6 +150,10 @@ class PackageUpdate(GObject.Object):
         self._subject = subject
         self._commits = Gio.ListStore.new(CommitInfo)
         self._message_lines: list[str] = []
+        # Messages of commits contributing to the final commit message.
+        self._parsed_messages: list[ParsedMessage] = []
+        self._reviewers: list[str] = []
+        self._coauthors: list[str] = []
 
         self.bind_property(
             "subject",
@@ -122,12 +166,41 @@ class PackageUpdate(GObject.Object):
         for commit in commits:
             self.add_commit(commit)
 
+        self.connect(
+            "notify::final-commit-message",
+            lambda update, _pspec: update.notify("final-commit-message-rich"),
+        )
+
         self.bind_property(
-            "final-commit-message",
+            "version-bump-mismatch",
             self,
-            "final-commit-message-rich",
+            "has-version-bump-mismatch",
             GObject.BindingFlags.SYNC_CREATE,
-            lambda _binding, message: linkify_html(message),
+            lambda _binding, mismatch: mismatch is not None,
+        )
+
+        self.bind_property(
+            "diff-shape",
+            self,
+            "diff-shape-label",
+            GObject.BindingFlags.SYNC_CREATE,
+            lambda _binding, shape: SHAPE_LABELS.get(shape),
+        )
+
+        self.bind_property(
+            "session-change",
+            self,
+            "session-change-label",
+            GObject.BindingFlags.SYNC_CREATE,
+            lambda _binding, change: SESSION_CHANGE_LABELS.get(change),
+        )
+
+        self.bind_property(
+            "session-change",
+            self,
+            "has-session-change",
+            GObject.BindingFlags.SYNC_CREATE,
+            lambda _binding, change: change is not None,
         )
 
         self.bind_property(
@@ -138,10 +211,19 @@ class PackageUpdate(GObject.Object):
             lambda _binding, editing: "editing" if editing else "not-editing",
         )
 
-    def add_commit(self, commit: Ggit.Commit) -> None:
+        self.bind_property(
+            "commit-message-is-edited-inline",
+            self,
+            "message-stack-page",
+            GObject.BindingFlags.SYNC_CREATE,
+            lambda _binding, editing: "editor" if editing else "message",
+        )
+
+    def add_commit(self, commit: AnyCommit) -> None:
         self._commits.append(CommitInfo(repo=self._repo, commit=commit))
 
-        subject, *msg_lines = commit.get_message().splitlines()
+        message = commit.get_message()
+        subject, *msg_lines = message.splitlines()
         # Clone list so we can detect changes.
         old_message_lines = list(self._message_lines)
         if subject.startswith("fixup! "):
@@ -153,18 +235,51 @@ class PackageUpdate(GObject.Object):
             match msg_lines:
                 case ["", *rest]:
                     msg_lines = rest
-        elif not subject.startswith("squash! "):
-            # The subject from non-squash commits remains.
-            self._message_lines += [subject]
+            # The rest is the new message, including its own title.
+            self._parsed_messages = [parse_message("\n".join(msg_lines))]
+        else:
+            if not subject.startswith("squash! "):
+                # The subject from non-squash commits remains.
+                self._message_lines += [subject]
+            self._parsed_messages.append(parse_message(message))
 
         self._message_lines += msg_lines
         if old_message_lines != self._message_lines:
             self.notify("final-commit-message")
 
-        self.props.changes_reviewed = any(
-            has_changelog_reviewed_tag(line) for line in self._message_lines
+        self._update_trailer_properties()
+
+    def _get_trailer_values(self, key: str) -> list[str]:
+        """Return distinct non-empty values of trailer across all contributing messages."""
+        return list(
+            dict.fromkeys(
+                value
+                for parsed in self._parsed_messages
+                for value in parsed.trailers.get_all(key)
+                if value != ""
+            )
+        )
+
+    def _update_trailer_properties(self) -> None:
+        reviewers = self._get_trailer_values(CHANGELOG_REVIEWED_BY)
+        if reviewers != self._reviewers:
+            self._reviewers = reviewers
+            self.notify("reviewers")
+        self.props.changes_reviewed = len(reviewers) > 0
+
+        coauthors = self._get_trailer_values(CO_AUTHORED_BY)
+        if coauthors != self._coauthors:
+            self._coauthors = coauthors
+            self.notify("coauthors")
+
+        url = next(
+            (
+                parsed.changelog_link
+                for parsed in self._parsed_messages
+                if parsed.changelog_link is not None
+            ),
+            None,
         )
-        url = find_changelog_link(self._message_lines)
         if url is None:
             self.props.changelog_link = "No changelog detected."
         else:
@@ -184,6 +299,13 @@ class PackageUpdate(GObject.Object):
     @final_commit_message.setter
     def final_commit_message(self, message):
         self._message_lines = message.splitlines()
+        self._parsed_messages = [parse_message(message)]
+        self._update_trailer_properties()
+
+    @GObject.Property(type=str)
+    def final_commit_message_rich(self) -> str:
+        """Final commit message with links, only rendered when the details are shown."""
+        return render_message_markup(self.props.final_commit_message)
 
     @GObject.Property(type=str)
     def changelog_link(self):
@@ -201,6 +323,16 @@ class PackageUpdate(GObject.Object):
     def changes_reviewed(self, changes_reviewed):
         self._changes_reviewed = changes_reviewed
 
+    @GObject.Property(type=GObject.TYPE_STRV)
+    def reviewers(self) -> list[str]:
+        """Identities from Changelog-Reviewed-By tags, in order of appearance."""
+        return self._reviewers
+
+    @GObject.Property(type=GObject.TYPE_STRV)
+    def coauthors(self) -> list[str]:
+        """Identities from Co-authored-by trailers, in order of appearance."""
+        return self._coauthors
+
     @GObject.Property(type=Gio.ListStore)
     def commits(self):
         return self._commits
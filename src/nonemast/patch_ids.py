@@ -0,0 +1,232 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import GLib
+from pathlib import Path
+from typing import Iterable, Optional
+import os
+import subprocess
+import threading
+
+# Stored for commits without a patch-id, e.g. empty or merge commits, so that they are not computed again.
+NO_PATCH_ID = "-"
+
+# Number of commits the index remembers, about 8 MiB of lines.
+MAX_PATCH_IDS = 100_000
+
+
+def get_default_index_path() -> Path:
+    return Path(GLib.get_user_cache_dir()) / "nonemast" / "patch-ids"
+
+
+def compute_patch_ids(repo_path: Path, commit_ids: list[str]) -> dict[str, str]:
+    """Compute stable patch-ids of commits using git.
+
+    All commits are diffed by a single git process piped into git patch-id,
+    so thousands of commits take seconds. Commits that do not introduce
+    any change have no patch-id and are omitted from the result.
+
+    Raises subprocess.CalledProcessError when git fails, e.g. when objects are missing.
+    """
+    if len(commit_ids) == 0:
+        return {}
+
+    env = {
+        **os.environ,
+        # Do not download missing blobs of partial clones one by one.
+        "GIT_NO_LAZY_FETCH": "1",
+    }
+    diff_tree = subprocess.Popen(
+        ["git", "diff-tree", "--stdin", "-p", "--root", "--no-color", "--no-ext-diff"],
+        cwd=repo_path,
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        encoding="utf-8",
+    )
+    patch_id = subprocess.Popen(
+        ["git", "patch-id", "--stable"],
+        cwd=repo_path,
+        env=env,
+        stdin=diff_tree.stdout,
+        stdout=subprocess.PIPE,
+        encoding="utf-8",
+    )
+    # Only patch-id should hold the read end of the pipe.
+    assert diff_tree.stdout is not None and diff_tree.stdin is not None
+    diff_tree.stdout.close()
+
+    def write_commit_ids() -> None:
+        # Written from another thread, so that full pipes cannot deadlock with reading the output.
+        assert diff_tree.stdin is not None
+        try:
+            for commit_id in commit_ids:
+                diff_tree.stdin.write(commit_id + "\n")
+            diff_tree.stdin.close()
+        except BrokenPipeError:
+            # diff-tree failed, reported below.
+            pass
+
+    writer = threading.Thread(target=write_commit_ids, daemon=True)
+    writer.start()
+    output, _errors = patch_id.communicate()
+    writer.join()
+
+    if (returncode := diff_tree.wait()) != 0:
+        raise subprocess.CalledProcessError(returncode, diff_tree.args)
+    if patch_id.returncode != 0:
+        raise subprocess.CalledProcessError(patch_id.returncode, patch_id.args)
+
+    patch_ids: dict[str, str] = {}
+    for line in output.splitlines():
+        patch_id_value, commit_id = line.split()
+        patch_ids[commit_id] = patch_id_value
+    return patch_ids
+
+
+class PatchIdIndex:
+    """Patch-ids of commits, persisted by commit ID.
+
+    Commits are immutable so the stored patch-ids never need to be invalidated.
+    Commits rewritten by a rebase keep their patch-id as long as their changes
+    stay the same, which allows finding the old version of a commit.
+
+    New entries are appended to the file. When it contains more than
+    max_entries commits, or lines that are duplicated or broken, it is
+    rewritten with only the most recently added commits.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_entries: int = MAX_PATCH_IDS,
+    ):
+        self._path = path if path is not None else get_default_index_path()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        # From the least recently added.
+        self._patch_ids: dict[str, str] = {}
+        self._loaded = False
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        n_lines = 0
+        try:
+            with open(self._path, encoding="utf-8") as index_file:
+                for line in index_file:
+                    n_lines += 1
+                    match line.split():
+                        case [commit_id, patch_id]:
+                            # Duplicates, e.g. from instances running at the same time, count as recent.
+                            self._patch_ids.pop(commit_id, None)
+                            self._patch_ids[commit_id] = patch_id
+                        case other:
+                            # Truncated by an interrupted write.
+                            pass
+        except FileNotFoundError:
+            pass
+
+        if n_lines > len(self._patch_ids) or len(self._patch_ids) > self._max_entries:
+            self._compact()
+
+    def _compact(self) -> None:
+        """Keep only the most recent entries and rewrite the file with them, expects the lock to be held."""
+        n_kept = len(self._patch_ids)
+        if n_kept > self._max_entries:
+            # Leaves room, so that the file is not rewritten by every update.
+            n_kept = self._max_entries * 3 // 4
+        self._patch_ids = dict(
+            list(self._patch_ids.items())[-n_kept:] if n_kept > 0 else []
+        )
+        # Written under a temporary name and renamed, so that readers never see a partial index.
+        temporary_path = self._path.with_name(f"{self._path.name}.{os.getpid()}")
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temporary_path, "w", encoding="utf-8") as index_file:
+                index_file.writelines(
+                    f"{commit_id} {patch_id}\n"
+                    for commit_id, patch_id in self._patch_ids.items()
+                )
+            os.replace(temporary_path, self._path)
+        except OSError as error:
+            # The index still works for this session.
+            pass
+
+    def get(self, commit_id: str) -> Optional[str]:
+        """Return patch-id of the commit, or None when it is unknown or the commit has no changes."""
+        with self._lock:
+            self._load()
+            patch_id = self._patch_ids.get(commit_id)
+        return patch_id if patch_id != NO_PATCH_ID else None
+
+    def __contains__(self, commit_id: str) -> bool:
+        """Return whether the patch-id of the commit was computed, even if the commit has none."""
+        with self._lock:
+            self._load()
+            return commit_id in self._patch_ids
+
+    def update(self, repo_path: Path, commit_ids: Iterable[str]) -> None:
+        """Compute patch-ids of commits not yet in the index.
+
+        Blocks while git is running, so it should be called from a worker thread.
+        Raises subprocess.CalledProcessError when git fails.
+        """
+        with self._lock:
+            self._load()
+            missing = [
+                commit_id
+                for commit_id in dict.fromkeys(commit_ids)
+                if commit_id not in self._patch_ids
+            ]
+        if len(missing) == 0:
+            return
+
+        patch_ids = compute_patch_ids(repo_path, missing)
+        new_entries = {
+            commit_id: patch_ids.get(commit_id, NO_PATCH_ID) for commit_id in missing
+        }
+
+        with self._lock:
+            self._patch_ids.update(new_entries)
+            if len(self._patch_ids) > self._max_entries:
+                self._compact()
+                return
+            try:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self._path, "a", encoding="utf-8") as index_file:
+                    index_file.writelines(
+                        f"{commit_id} {patch_id}\n"
+                        for commit_id, patch_id in new_entries.items()
+                    )
+            except OSError as error:
+                # The index still works for this session.
+                pass
+
+    def match_rewritten(
+        self,
+        old_commit_ids: Iterable[str],
+        new_commit_ids: Iterable[str],
+    ) -> dict[str, str]:
+        """Map new commits to the old commits with the same changes."""
+        old_by_patch_id: dict[str, str] = {}
+        for commit_id in old_commit_ids:
+            if (patch_id := self.get(commit_id)) is not None:
+                old_by_patch_id.setdefault(patch_id, commit_id)
+
+        return {
+            commit_id: old_by_patch_id[patch_id]
+            for commit_id in new_commit_ids
+            if (patch_id := self.get(commit_id)) is not None
+            and patch_id in old_by_patch_id
+        }
+
+    def get_cache_key(self, commit_id: str) -> str:
+        """Return key for caching results that only depend on the changes of a commit.
+
+        Rewritten commits with the same changes share the key, so the results carry over rebases.
+        """
+        if (patch_id := self.get(commit_id)) is not None:
+            return f"patch-id:{patch_id}"
+        return commit_id
@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import Ggit
+from gi.repository import Gio
+from gi.repository import GLib
+from concurrent.futures import Executor
+from typing import Optional
+from .git_utils import ThreadRepositories
+from .package_update import get_diff_delta_count, render_message_markup
+
+# Number of updates before and after the selected one whose details are prepared.
+PREFETCH_DISTANCE = 3
+
+
+def get_neighbour_positions(selected: int, n_items: int, distance: int) -> list[int]:
+    """Return positions around the selected one, nearest first.
+
+    The following update comes before the preceding one at the same distance,
+    since reviews usually move down the list.
+    """
+    positions = []
+    for offset in range(1, distance + 1):
+        for position in [selected + offset, selected - offset]:
+            if 0 <= position < n_items:
+                positions.append(position)
+    return positions
+
+
+class DetailsPrefetcher:
+    """Prepares details of updates around the selected one in the background.
+
+    Markup of the final commit messages and diff descriptions of commits are
+    computed into the shared caches, so that moving the selection to
+    a neighbouring update finds them ready. Prefetching starts when the main
+    loop is idle, and it is cancelled and retargeted whenever the selection
+    moves, so holding a key down only prefetches around where it stops.
+    """
+
+    def __init__(
+        self,
+        repositories: ThreadRepositories,
+        executor: Executor,
+        distance: int = PREFETCH_DISTANCE,
+    ):
+        self._repositories = repositories
+        self._executor = executor
+        self._distance = distance
+        self._idle_source_id: Optional[int] = None
+        self._cancellable: Optional[Gio.Cancellable] = None
+
+    def retarget(self, model: Gio.ListModel, selected: int) -> None:
+        """Prefetch around position selected of the model, e.g. the filtered list, instead of the previous target."""
+        self.cancel()
+        self._idle_source_id = GLib.idle_add(
+            self._submit,
+            model,
+            selected,
+            priority=GLib.PRIORITY_LOW,
+        )
+
+    def cancel(self) -> None:
+        if self._idle_source_id is not None:
+            GLib.source_remove(self._idle_source_id)
+            self._idle_source_id = None
+        if self._cancellable is not None:
+            self._cancellable.cancel()
+            self._cancellable = None
+
+    def _submit(self, model: Gio.ListModel, selected: int) -> bool:
+        self._idle_source_id = None
+        # Only strings can be passed to the worker, libgit2 objects belong to the main thread.
+        targets = [
+            (
+                update.props.final_commit_message,
+                [commit.props.id for commit in update.props.commits],
+            )
+            for update in (
+                model.get_item(position)
+                for position in get_neighbour_positions(
+                    selected, model.get_n_items(), self._distance
+                )
+            )
+        ]
+        cancellable = Gio.Cancellable()
+        self._cancellable = cancellable
+        try:
+            self._executor.submit(self._prefetch, targets, cancellable)
+        except RuntimeError:
+            # The pool was shut down, e.g. because the window was closed.
+            pass
+
+        return GLib.SOURCE_REMOVE
+
+    def _prefetch(
+        self,
+        targets: list[tuple[str, list[str]]],
+        cancellable: Gio.Cancellable,
+    ) -> None:
+        try:
+            repo = self._repositories.get()
+            for message, commit_ids in targets:
+                if cancellable.is_cancelled():
+                    return
+                render_message_markup(message)
+                for commit_id in commit_ids:
+                    if cancellable.is_cancelled():
+                        return
+                    get_diff_delta_count(
+                        repo,
+                        repo.lookup_commit(Ggit.OId.new_from_string(commit_id)),
+                    )
+        except GLib.Error as error:
+            # Only the responsiveness suffers, details are computed when shown.
+            pass
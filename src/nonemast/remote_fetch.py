@@ -0,0 +1,147 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import Gio
+from gi.repository import GLib
+from gi.repository import GObject
+from collections import deque
+from typing import Optional
+
+# Number of trailing lines of git output kept for error messages.
+ERROR_CONTEXT_LINES = 5
+
+
+class RemoteFetcher(GObject.Object):
+    """Fetches remotes using git in the background.
+
+    Runs “git fetch” as a subprocess so that the network transfer does not
+    block the main loop, and reports its progress lines. The finished signal
+    is emitted with whether the fetch succeeded and an error message otherwise.
+    """
+
+    __gsignals__ = {
+        "finished": (GObject.SignalFlags.RUN_FIRST, None, (bool, str)),
+    }
+
+    fetching = GObject.Property(type=bool, default=False)
+    progress = GObject.Property(type=str)
+
+    def __init__(self, repo_path: Gio.File, **kwargs):
+        super().__init__(**kwargs)
+        self._repo_path = repo_path
+        self._cancellable: Optional[Gio.Cancellable] = None
+        self._subprocess: Optional[Gio.Subprocess] = None
+        self._output_tail: deque[str] = deque(maxlen=ERROR_CONTEXT_LINES)
+        self._error: Optional[GLib.Error] = None
+        # Both the process exit and the end of its output need to be seen.
+        self._pending = 0
+        self._schedule_source_id: Optional[int] = None
+
+    def fetch(self, remote_names: list[str]) -> None:
+        if self.props.fetching or len(remote_names) == 0:
+            return
+
+        launcher = Gio.SubprocessLauncher.new(
+            Gio.SubprocessFlags.STDOUT_SILENCE | Gio.SubprocessFlags.STDERR_PIPE
+        )
+        launcher.set_cwd(self._repo_path.get_path())
+        # Nobody is there to type a password in the background.
+        launcher.setenv("GIT_TERMINAL_PROMPT", "0", True)
+        try:
+            self._subprocess = launcher.spawnv(
+                ["git", "fetch", "--progress", "--multiple", "--", *remote_names]
+            )
+        except GLib.Error as error:
+            self.emit("finished", False, error.message)
+            return
+
+        self._cancellable = Gio.Cancellable()
+        self._output_tail.clear()
+        self._error = None
+        self._pending = 2
+        self.props.fetching = True
+
+        output = Gio.DataInputStream.new(self._subprocess.get_stderr_pipe())
+        self._read_output_line(output)
+        self._subprocess.wait_check_async(self._cancellable, self._on_exited)
+
+    def cancel(self) -> None:
+        if self._cancellable is not None:
+            self._cancellable.cancel()
+        if self._subprocess is not None:
+            self._subprocess.force_exit()
+
+    def schedule(self, interval_seconds: int, remote_names: list[str]) -> None:
+        """Fetch the remotes periodically."""
+        self.unschedule()
+
+        def on_timeout() -> bool:
+            self.fetch(remote_names)
+            return GLib.SOURCE_CONTINUE
+
+        self._schedule_source_id = GLib.timeout_add_seconds(
+            interval_seconds,
+            on_timeout,
+        )
+
+    def unschedule(self) -> None:
+        if self._schedule_source_id is not None:
+            GLib.source_remove(self._schedule_source_id)
+            self._schedule_source_id = None
+
+    def _read_output_line(self, output: Gio.DataInputStream) -> None:
+        # Progress is reported on a single terminal line, rewritten after a carriage return.
+        output.read_upto_async(
+            "\r\n",
+            -1,
+            GLib.PRIORITY_DEFAULT,
+            self._cancellable,
+            self._on_output_line,
+        )
+
+    def _on_output_line(
+        self,
+        output: Gio.DataInputStream,
+        result: Gio.AsyncResult,
+    ) -> None:
+        try:
+            line, _length = output.read_upto_finish(result)
+            if line is not None:
+                # Skip the stop character, it is already buffered.
+                output.read_byte(None)
+        except GLib.Error as error:
+            line = None
+
+        if line is None:
+            self._finish_part()
+            return
+
+        if (line := line.strip()) != "":
+            self.props.progress = line
+            self._output_tail.append(line)
+        self._read_output_line(output)
+
+    def _on_exited(self, subprocess: Gio.Subprocess, result: Gio.AsyncResult) -> None:
+        try:
+            subprocess.wait_check_finish(result)
+        except GLib.Error as error:
+            self._error = error
+        self._finish_part()
+
+    def _finish_part(self) -> None:
+        self._pending -= 1
+        if self._pending > 0:
+            return
+
+        self._subprocess = None
+        self._cancellable = None
+        self.props.fetching = False
+        self.props.progress = None
+
+        if self._error is None:
+            self.emit("finished", True, "")
+        elif self._error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+            self.emit("finished", False, "Fetch was cancelled.")
+        else:
+            message = "\n".join(self._output_tail) or self._error.message
+            self.emit("finished", False, message)
@@ -0,0 +1,248 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import GObject
+from typing import Optional
+from weakref import WeakSet
+from .package_update import PackageUpdate
+
+WORD_BITS = 64
+
+
+def lowest_bit(word: int) -> int:
+    return (word & -word).bit_length() - 1
+
+
+def highest_bit(word: int) -> int:
+    return word.bit_length() - 1
+
+
+class PositionSet:
+    """Ordered set of list positions with constant-time neighbour queries.
+
+    Positions are stored in a bitmap of 64-bit words. Each level above it
+    marks which words of the level below are non-empty, so finding the next
+    or previous member only inspects one word per level. Three levels are
+    enough for over 260 thousand positions.
+    """
+
+    def __init__(self):
+        # Level 0 holds the positions themselves, the last level has a single word.
+        self._levels: list[list[int]] = [[0]]
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __contains__(self, position: int) -> bool:
+        word_index, bit = divmod(position, WORD_BITS)
+        words = self._levels[0]
+        return 0 <= word_index < len(words) and words[word_index] >> bit & 1 == 1
+
+    def _ensure_capacity(self, position: int) -> None:
+        needed_words = position // WORD_BITS + 1
+        level = 0
+        while True:
+            words = self._levels[level]
+            if len(words) < needed_words:
+                words.extend([0] * (needed_words - len(words)))
+            if len(words) == 1:
+                break
+
+            needed_words = (len(words) - 1) // WORD_BITS + 1
+            level += 1
+            if level == len(self._levels):
+                # New top level, mark non-empty words of the previous top.
+                top = [0] * needed_words
+                for word_index, word in enumerate(words):
+                    if word != 0:
+                        top[word_index // WORD_BITS] |= 1 << word_index % WORD_BITS
+                self._levels.append(top)
+
+    def add(self, position: int) -> None:
+        assert position >= 0, "positions cannot be negative"
+        if position in self:
+            return
+        self._ensure_capacity(position)
+        self._length += 1
+        for words in self._levels:
+            position, bit = divmod(position, WORD_BITS)
+            was_empty = words[position] == 0
+            words[position] |= 1 << bit
+            if not was_empty:
+                # Upper levels already know about this word.
+                break
+
+    def discard(self, position: int) -> None:
+        if position not in self:
+            return
+        self._length -= 1
+        for words in self._levels:
+            position, bit = divmod(position, WORD_BITS)
+            words[position] &= ~(1 << bit)
+            if words[position] != 0:
+                break
+
+    def next_after(self, position: int) -> Optional[int]:
+        """Return the smallest member greater than position."""
+        candidate = max(position + 1, 0)
+        for level, words in enumerate(self._levels):
+            word_index, bit = divmod(candidate, WORD_BITS)
+            if word_index >= len(words):
+                return None
+            word = words[word_index] >> bit << bit
+            if word != 0:
+                found = word_index * WORD_BITS + lowest_bit(word)
+                for lower_words in reversed(self._levels[:level]):
+                    found = found * WORD_BITS + lowest_bit(lower_words[found])
+                return found
+            candidate = word_index + 1
+        return None
+
+    def previous_before(self, position: int) -> Optional[int]:
+        """Return the largest member smaller than position."""
+        candidate = position - 1
+        for level, words in enumerate(self._levels):
+            if candidate < 0:
+                return None
+            candidate = min(candidate, len(words) * WORD_BITS - 1)
+            word_index, bit = divmod(candidate, WORD_BITS)
+            word = words[word_index] & ((2 << bit) - 1)
+            if word != 0:
+                found = word_index * WORD_BITS + highest_bit(word)
+                for lower_words in reversed(self._levels[:level]):
+                    found = found * WORD_BITS + highest_bit(lower_words[found])
+                return found
+            candidate = word_index - 1
+        return None
+
+
+class PositionCounts:
+    """Marks of list positions with logarithmic-time counting of marked positions before one.
+
+    Stored as a Fenwick tree, each node holds the number of marks in a range
+    of positions ending at it, whose length is the lowest set bit of its index.
+    """
+
+    def __init__(self):
+        # Nodes are indexed from 1.
+        self._tree: list[int] = [0]
+        self._marked: list[bool] = []
+
+    def __len__(self) -> int:
+        return len(self._marked)
+
+    def append(self, marked: bool) -> None:
+        """Add a position after the last one."""
+        self._marked.append(marked)
+        index = len(self._marked)
+        # Covers the new position and the ranges of the nodes below it.
+        self._tree.append(
+            int(marked)
+            + self.count_before(index - 1)
+            - self.count_before(index - (index & -index))
+        )
+
+    def set(self, position: int, marked: bool) -> None:
+        if self._marked[position] == marked:
+            return
+        self._marked[position] = marked
+        delta = 1 if marked else -1
+        index = position + 1
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    def is_marked(self, position: int) -> bool:
+        return self._marked[position]
+
+    def count_before(self, position: int) -> int:
+        """Return number of marked positions smaller than position."""
+        count = 0
+        index = position
+        while index > 0:
+            count += self._tree[index]
+            index -= index & -index
+        return count
+
+
+class ReviewQueue:
+    """Positions of unreviewed updates in the updates model.
+
+    The set is updated from property notifications so that jumping to
+    the next or previous unreviewed update does not need to scan the list.
+    Updates hidden by the filter of the list are skipped, and positions of
+    the visible ones are counted so that the position of an update in
+    the filtered list is found without scanning it either.
+    """
+
+    def __init__(self):
+        # Positions of updates that are both unreviewed and visible.
+        self._unreviewed = PositionSet()
+        self._visible = PositionCounts()
+        self._positions: dict[PackageUpdate, int] = {}
+        self._handlers: dict[PackageUpdate, int] = {}
+        # Kept when the positions are cleared, the filter only evaluates updates added to the list.
+        self._hidden: WeakSet[PackageUpdate] = WeakSet()
+
+    def __len__(self) -> int:
+        return len(self._unreviewed)
+
+    def track(self, update: PackageUpdate, position: int) -> None:
+        """Start following update at position, updates need to be tracked in the order of their positions."""
+        assert position == len(self._visible), "updates must be tracked in order"
+        self._positions[update] = position
+        self._visible.append(update not in self._hidden)
+        self._handlers[update] = update.connect(
+            "notify::changes-reviewed",
+            self._on_reviewed_changed,
+        )
+        self._update_position(update)
+
+    def clear(self) -> None:
+        for update, handler_id in self._handlers.items():
+            update.disconnect(handler_id)
+        self._handlers.clear()
+        self._positions.clear()
+        self._unreviewed = PositionSet()
+        self._visible = PositionCounts()
+
+    def set_visible(self, update: PackageUpdate, visible: bool) -> None:
+        """Record whether the filter of the list shows update, also for updates not tracked yet."""
+        if visible:
+            self._hidden.discard(update)
+        else:
+            self._hidden.add(update)
+        if update in self._positions:
+            self._visible.set(self._positions[update], visible)
+            self._update_position(update)
+
+    def get_filtered_position(self, position: int) -> Optional[int]:
+        """Return position of the update at position in the filtered list, or None when it is hidden."""
+        if not self._visible.is_marked(position):
+            return None
+        return self._visible.count_before(position)
+
+    def _update_position(self, update: PackageUpdate) -> None:
+        position = self._positions[update]
+        if update.props.changes_reviewed or not self._visible.is_marked(position):
+            self._unreviewed.discard(position)
+        else:
+            self._unreviewed.add(position)
+
+    def _on_reviewed_changed(
+        self,
+        update: PackageUpdate,
+        _pspec: GObject.ParamSpec,
+    ) -> None:
+        self._update_position(update)
+
+    def next_unreviewed(self, position: Optional[int]) -> Optional[int]:
+        """Return position of the first visible unreviewed update after position, or from the start when there is none."""
+        return self._unreviewed.next_after(-1 if position is None else position)
+
+    def previous_unreviewed(self, position: Optional[int]) -> Optional[int]:
+        """Return position of the last visible unreviewed update before position, or from the end when there is none."""
+        if position is None:
+            return self._unreviewed.previous_before(len(self._positions))
+        return self._unreviewed.previous_before(position)
@@ -0,0 +1,130 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import GObject
+from collections import Counter
+from typing import Optional
+from .identities import IdentityResolver
+from .package_update import PackageUpdate
+
+
+class ReviewStatistics(GObject.Object):
+    """Review progress and per-reviewer counts, kept up to date incrementally.
+
+    Tracked updates report changes through property notifications so changing
+    a single update only costs as much as the number of its reviewers.
+    Reviewers are counted by their identity after applying the mailmap.
+    """
+
+    __gtype_name__ = "ReviewStatistics"
+
+    def __init__(self, identities: Optional[IdentityResolver] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._identities = identities if identities is not None else IdentityResolver()
+        self._n_updates = 0
+        self._n_reviewed = 0
+        self._reviewer_counts: Counter[str] = Counter()
+        # Last seen state of each tracked update.
+        self._reviewed: dict[PackageUpdate, bool] = {}
+        self._reviewers: dict[PackageUpdate, list[str]] = {}
+        self._handlers: dict[PackageUpdate, list[int]] = {}
+
+    def _get_reviewers(self, update: PackageUpdate) -> list[str]:
+        # Distinct after resolving, a person reviewing under two addresses counts once.
+        return list(
+            dict.fromkeys(
+                self._identities.resolve_identity(reviewer)
+                for reviewer in update.props.reviewers
+            )
+        )
+
+    def track(self, update: PackageUpdate) -> None:
+        self._reviewed[update] = update.props.changes_reviewed
+        self._reviewers[update] = self._get_reviewers(update)
+        self._handlers[update] = [
+            update.connect("notify::changes-reviewed", self._on_reviewed_changed),
+            update.connect("notify::reviewers", self._on_reviewers_changed),
+        ]
+        self._reviewer_counts.update(self._reviewers[update])
+        self._n_updates += 1
+        if self._reviewed[update]:
+            self._n_reviewed += 1
+        self._notify_counts()
+
+    def untrack(self, update: PackageUpdate) -> None:
+        for handler_id in self._handlers.pop(update):
+            update.disconnect(handler_id)
+        self._reviewer_counts.subtract(self._reviewers.pop(update))
+        self._n_updates -= 1
+        if self._reviewed.pop(update):
+            self._n_reviewed -= 1
+        self._notify_counts()
+
+    def _on_reviewed_changed(
+        self,
+        update: PackageUpdate,
+        _pspec: GObject.ParamSpec,
+    ) -> None:
+        reviewed = update.props.changes_reviewed
+        if reviewed == self._reviewed[update]:
+            return
+        self._reviewed[update] = reviewed
+        self._n_reviewed += 1 if reviewed else -1
+        self._notify_counts()
+
+    def _on_reviewers_changed(
+        self,
+        update: PackageUpdate,
+        _pspec: GObject.ParamSpec,
+    ) -> None:
+        self._reviewer_counts.subtract(self._reviewers[update])
+        self._reviewers[update] = self._get_reviewers(update)
+        self._reviewer_counts.update(self._reviewers[update])
+        self.notify("reviewers-summary")
+
+    def _notify_counts(self) -> None:
+        self.notify("n-updates")
+        self.notify("n-reviewed")
+        self.notify("n-unreviewed")
+        self.notify("summary")
+
+    @GObject.Property(type=int)
+    def n_updates(self) -> int:
+        return self._n_updates
+
+    @GObject.Property(type=int)
+    def n_reviewed(self) -> int:
+        return self._n_reviewed
+
+    @GObject.Property(type=int)
+    def n_unreviewed(self) -> int:
+        return self._n_updates - self._n_reviewed
+
+    @GObject.Property(type=str)
+    def summary(self) -> str:
+        return f"{self._n_reviewed} of {self._n_updates} reviewed"
+
+    @GObject.Property(type=str)
+    def reviewers_summary(self) -> Optional[str]:
+        if not (reviewer_counts := self.get_reviewer_counts()):
+            return None
+        return "\n".join(f"{reviewer}: {count}" for reviewer, count in reviewer_counts)
+
+    def get_reviewer_counts(self) -> list[tuple[str, int]]:
+        """Return numbers of updates reviewed by each reviewer, most active first."""
+        return [
+            (reviewer, count)
+            for reviewer, count in self._reviewer_counts.most_common()
+            if count > 0
+        ]
+
+    def format_report(self) -> str:
+        lines = [
+            f"Updates: {self._n_updates}",
+            f"Reviewed: {self._n_reviewed}",
+            f"Unreviewed: {self._n_updates - self._n_reviewed}",
+        ]
+        if reviewer_counts := self.get_reviewer_counts():
+            lines += ["", "Reviewers:"]
+            lines += [f"  {reviewer}: {count}" for reviewer, count in reviewer_counts]
+        return "\n".join(lines)
@@ -0,0 +1,195 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import GLib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+import hashlib
+import json
+import os
+from .history import UpdateGroup
+from .patch_ids import PatchIdIndex
+
+SNAPSHOT_VERSION = 1
+
+# How an update differs from the state at the end of the last session.
+SESSION_CHANGE_CHANGED = "changed"
+SESSION_CHANGE_NEW = "new"
+
+SESSION_CHANGE_LABELS = {
+    SESSION_CHANGE_CHANGED: "Changed since last session",
+    SESSION_CHANGE_NEW: "New since last session",
+}
+
+
+@dataclass
+class UpdateSnapshot:
+    subject: str
+    commit_ids: list[str]
+    # Identifiers of changes introduced by the commits, see get_content_ids.
+    content_ids: list[str]
+
+
+@dataclass
+class SessionSnapshot:
+    """State of the reviewed branch when a review session ended."""
+
+    updates: list[UpdateSnapshot]
+
+    def to_json(self) -> dict:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "updates": [
+                {
+                    "subject": update.subject,
+                    "commits": update.commit_ids,
+                    "contents": update.content_ids,
+                }
+                for update in self.updates
+            ],
+        }
+
+    @staticmethod
+    def from_json(data: dict) -> Optional["SessionSnapshot"]:
+        if data.get("version") != SNAPSHOT_VERSION:
+            return None
+        return SessionSnapshot(
+            updates=[
+                UpdateSnapshot(
+                    subject=update["subject"],
+                    commit_ids=update["commits"],
+                    content_ids=update["contents"],
+                )
+                for update in data["updates"]
+            ]
+        )
+
+
+@dataclass
+class RangeDiff:
+    """Differences between updates in a snapshot and the current history."""
+
+    # Maps subjects of current updates to one of SESSION_CHANGE_* constants.
+    changes: dict[str, str] = field(default_factory=dict)
+    # Subjects of updates from the snapshot that no longer exist.
+    removed: list[str] = field(default_factory=list)
+
+
+def get_content_ids(patch_ids: PatchIdIndex, commit_ids: list[str]) -> list[str]:
+    """Return patch-ids of commits introducing changes.
+
+    Commits without changes, like the ones marking an update as reviewed, are skipped.
+    Commits missing from the index are identified by their ID instead,
+    so they only match themselves.
+    """
+    content_ids = []
+    for commit_id in commit_ids:
+        if commit_id not in patch_ids:
+            content_ids.append(commit_id)
+        elif (patch_id := patch_ids.get(commit_id)) is not None:
+            content_ids.append(patch_id)
+    return content_ids
+
+
+def create_snapshot(
+    groups: list[UpdateGroup], patch_ids: PatchIdIndex
+) -> SessionSnapshot:
+    return SessionSnapshot(
+        updates=[
+            UpdateSnapshot(
+                subject=subject,
+                commit_ids=commit_ids,
+                content_ids=get_content_ids(patch_ids, commit_ids),
+            )
+            for subject, commit_ids in groups
+        ]
+    )
+
+
+def compare_with_snapshot(
+    snapshot: SessionSnapshot,
+    groups: list[UpdateGroup],
+    patch_ids: PatchIdIndex,
+) -> RangeDiff:
+    """Find updates whose changes differ from the snapshot, like git range-diff.
+
+    Updates are paired by subject, updates with a changed subject are paired
+    by sharing a patch-id with an unpaired update from the snapshot.
+    Updates with the same commits are unchanged without looking at patch-ids,
+    rebased updates are unchanged as long as their commits introduce the same changes.
+    Only changes to the code are considered, new reviews or reworded messages are not.
+    """
+    unpaired = {update.subject: update for update in snapshot.updates}
+    old_subjects_by_content_id: dict[str, str] = {}
+    for update in snapshot.updates:
+        for content_id in update.content_ids:
+            old_subjects_by_content_id.setdefault(content_id, update.subject)
+
+    range_diff = RangeDiff()
+    renamed: list[tuple[str, list[str]]] = []
+    for subject, commit_ids in groups:
+        old_update = unpaired.pop(subject, None)
+        if old_update is None:
+            renamed.append((subject, commit_ids))
+        elif old_update.commit_ids == commit_ids:
+            continue
+        elif old_update.content_ids != get_content_ids(patch_ids, commit_ids):
+            range_diff.changes[subject] = SESSION_CHANGE_CHANGED
+
+    # Only pair updates that did not match by subject.
+    for subject, commit_ids in renamed:
+        old_subject = next(
+            (
+                old_subject
+                for content_id in get_content_ids(patch_ids, commit_ids)
+                if (old_subject := old_subjects_by_content_id.get(content_id))
+                in unpaired
+            ),
+            None,
+        )
+        if old_subject is None:
+            range_diff.changes[subject] = SESSION_CHANGE_NEW
+        else:
+            del unpaired[old_subject]
+            range_diff.changes[subject] = SESSION_CHANGE_CHANGED
+
+    range_diff.removed = list(unpaired.keys())
+    return range_diff
+
+
+def get_default_snapshot_dir() -> Path:
+    return Path(GLib.get_user_state_dir()) / "nonemast" / "sessions"
+
+
+class SessionSnapshotStore:
+    """Snapshots of review sessions, one per repository and branch."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        self._directory = (
+            directory if directory is not None else get_default_snapshot_dir()
+        )
+
+    def _get_path(self, repo_path: Path, branch: str) -> Path:
+        key = hashlib.sha256(f"{repo_path.resolve()}\0{branch}".encode("utf-8"))
+        return self._directory / f"{key.hexdigest()}.json"
+
+    def load(self, repo_path: Path, branch: str) -> Optional[SessionSnapshot]:
+        try:
+            with open(self._get_path(repo_path, branch), encoding="utf-8") as file:
+                return SessionSnapshot.from_json(json.load(file))
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing or damaged snapshot only means changes cannot be highlighted.
+            return None
+
+    def save(self, repo_path: Path, branch: str, snapshot: SessionSnapshot) -> None:
+        """Store the snapshot, replacing the previous one atomically.
+
+        Raises OSError when the snapshot cannot be written.
+        """
+        path = self._get_path(repo_path, branch)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(snapshot.to_json(), file)
+        os.replace(temp_path, path)
@@ -0,0 +1,163 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from bisect import bisect_left, insort
+from typing import Generic, Optional, TypeVar
+import re
+
+V = TypeVar("V")
+
+FIXUP_PREFIXES = ("fixup! ", "squash! ", "amend! ")
+
+# Git does not accept shorter abbreviations of object names.
+MIN_ABBREV_LENGTH = 4
+
+HEX_REGEX = re.compile(r"^[0-9a-fA-F]+$")
+
+
+def get_fixup_target(subject: str) -> Optional[str]:
+    """Return what a fixup!, squash! or amend! commit refers to, or None for other commits.
+
+    Like git, all the prefixes and whitespace following them are skipped.
+    """
+    if not subject.startswith(FIXUP_PREFIXES):
+        return None
+    target = subject
+    while True:
+        target = target.lstrip()
+        for prefix in FIXUP_PREFIXES:
+            if target.startswith(prefix):
+                target = target[len(prefix) :]
+                break
+        else:
+            return target
+
+
+class PrefixNode(Generic[V]):
+    __slots__ = ("label", "children", "first")
+
+    def __init__(self, label: str, first: Optional[V]):
+        # Part of the key between the parent and this node.
+        self.label = label
+        # Keyed by the first character of their label.
+        self.children: dict[str, "PrefixNode[V]"] = {}
+        # Value of the earliest added key passing through this node.
+        self.first = first
+
+
+class PrefixTree(Generic[V]):
+    """Radix tree finding the earliest added key that starts with a prefix.
+
+    Keys added later never replace the value stored on a node, so each node
+    remembers the first key below it and a lookup only walks the prefix,
+    regardless of how many keys share it. Single-child chains are
+    compressed into one node, so there are at most twice as many nodes as keys.
+    """
+
+    def __init__(self):
+        self._root: PrefixNode[V] = PrefixNode("", None)
+
+    def add(self, key: str, value: V) -> None:
+        """Add key that was not added before."""
+        node = self._root
+        if node.first is None:
+            node.first = value
+        rest = key
+        while rest != "":
+            child = node.children.get(rest[0])
+            if child is None:
+                node.children[rest[0]] = PrefixNode(rest, value)
+                return
+            common = 0
+            limit = min(len(child.label), len(rest))
+            while common < limit and child.label[common] == rest[common]:
+                common += 1
+            if common < len(child.label):
+                # Split the edge where the key branches off.
+                middle = PrefixNode(child.label[:common], child.first)
+                child.label = child.label[common:]
+                middle.children[child.label[0]] = child
+                node.children[rest[0]] = middle
+                child = middle
+            node = child
+            rest = rest[common:]
+
+    def find_first(self, prefix: str) -> Optional[V]:
+        """Return value of the earliest added key starting with prefix."""
+        node = self._root
+        rest = prefix
+        while rest != "":
+            child = node.children.get(rest[0])
+            if child is None:
+                return None
+            if len(rest) <= len(child.label):
+                return child.first if child.label.startswith(rest) else None
+            if not rest.startswith(child.label):
+                return None
+            node = child
+            rest = rest[len(child.label) :]
+        return node.first
+
+
+class SubjectIndex:
+    """Assigns commits to updates following the rules of git rebase --autosquash.
+
+    Commits need to be added from the oldest. A fixup!, squash! or amend! commit
+    joins the update of an earlier commit whose subject is the same as
+    the target, whose ID the target abbreviates, or failing that, the first one
+    whose subject starts with the target. Other commits start an update named
+    by their subject.
+
+    Subjects are kept in a prefix tree remembering the first commit below each
+    node, and commit IDs in a sorted array searched by bisection, so targets
+    are resolved quickly even on branches with thousands of updates. Unlike git,
+    which resolves any revision, only commit IDs are recognized, and an
+    abbreviation is considered ambiguous only among the added commits.
+    """
+
+    def __init__(self):
+        # Updates of commits that did not fix up another one, by their full subject.
+        self._updates_by_subject: dict[str, str] = {}
+        # Distinct subjects of all added commits, with the update of the first commit with each.
+        self._subjects: PrefixTree[str] = PrefixTree()
+        self._seen_subjects: set[str] = set()
+        # IDs of all added commits, sorted.
+        self._commit_ids: list[str] = []
+        self._updates_by_commit_id: dict[str, str] = {}
+
+    def _resolve_commit_id(self, target: str) -> Optional[str]:
+        if len(target) < MIN_ABBREV_LENGTH or HEX_REGEX.match(target) is None:
+            return None
+        target = target.lower()
+        start = bisect_left(self._commit_ids, target)
+        matches = self._commit_ids[start : start + 2]
+        matches = [commit_id for commit_id in matches if commit_id.startswith(target)]
+        if len(matches) != 1:
+            # Missing or ambiguous.
+            return None
+        return self._updates_by_commit_id[matches[0]]
+
+    def resolve(self, target: str) -> Optional[str]:
+        """Return update of the commit that target of a fixup refers to."""
+        if (update := self._updates_by_subject.get(target)) is not None:
+            return update
+        if " " not in target and (update := self._resolve_commit_id(target)):
+            return update
+        return self._subjects.find_first(target)
+
+    def add_commit(self, commit_id: str, subject: str) -> str:
+        """Add commit following the already added ones and return its update."""
+        target = get_fixup_target(subject)
+        update = self.resolve(target) if target is not None else None
+        if update is None:
+            # Fixups of commits outside of the range are grouped by their target.
+            update = target if target is not None else subject
+            self._updates_by_subject.setdefault(subject, update)
+
+        if subject not in self._seen_subjects:
+            self._seen_subjects.add(subject)
+            self._subjects.add(subject, update)
+        self._updates_by_commit_id[commit_id] = update
+        insort(self._commit_ids, commit_id)
+
+        return update
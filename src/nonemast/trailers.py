@@ -0,0 +1,171 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+import re
+from .cache_manager import caches
+
+CHANGELOG_REVIEWED_BY = "Changelog-Reviewed-By"
+CO_AUTHORED_BY = "Co-authored-by"
+
+# Same as default trailer.separators, whitespace is allowed before the separator.
+TRAILER_REGEX = re.compile(r"^([A-Za-z0-9-]+)\s*:\s*(.*)$")
+
+# Trailers added by git itself, which make a block with other lines count as trailers.
+GIT_GENERATED_PREFIXES = ("Signed-off-by: ", "(cherry picked from commit ")
+
+# Git requires whitespace after the dashes, so a final line without line break is not a divider.
+PATCH_DIVIDER_REGEX = re.compile(r"^---\s")
+
+COMMENT_PREFIX = "#"
+
+
+class TrailerMap:
+    """Trailers of a message in order of appearance, looked up by case-insensitive key."""
+
+    def __init__(self, trailers: Iterable[tuple[str, str]] = ()):
+        self._trailers = tuple(trailers)
+        values: dict[str, list[str]] = {}
+        for key, value in self._trailers:
+            values.setdefault(key.casefold(), []).append(value)
+        self._values = {key: tuple(key_values) for key, key_values in values.items()}
+
+    def __iter__(self) -> Iterator[tuple[str, str]]:
+        return iter(self._trailers)
+
+    def __len__(self) -> int:
+        return len(self._trailers)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TrailerMap) and self._trailers == other._trailers
+
+    def __repr__(self) -> str:
+        return f"TrailerMap({list(self._trailers)!r})"
+
+    def get_all(self, key: str) -> tuple[str, ...]:
+        return self._values.get(key.casefold(), ())
+
+
+@dataclass(frozen=True)
+class ParsedMessage:
+    trailers: TrailerMap
+    # Heuristics: First line starting with a URL is likely a changelog.
+    changelog_link: Optional[str]
+
+
+def _is_blank(line: str) -> bool:
+    return line.strip() == ""
+
+
+def _find_trailer_block_start(lines: list[str], title_end: int, end: int) -> int:
+    """Return index of the first line of the trailer block, or end when there is none.
+
+    Follows the rules of git interpret-trailers: the block is the last paragraph,
+    which must not be the title, and it needs to consist only of trailers, or
+    at least a quarter of it must be trailers including one generated by git.
+    """
+    trailer_lines = 0
+    non_trailer_lines = 0
+    # Lines starting with whitespace count as trailers only when they continue one.
+    possible_continuation_lines = 0
+    recognized_prefix = False
+
+    start = end
+    for index in range(end - 1, title_end - 1, -1):
+        line = lines[index]
+        if line.startswith(COMMENT_PREFIX):
+            # Indented lines cannot continue a trailer across a comment.
+            non_trailer_lines += possible_continuation_lines
+            possible_continuation_lines = 0
+            continue
+        if _is_blank(line):
+            # Indented lines at the start of the paragraph do not continue anything.
+            non_trailer_lines += possible_continuation_lines
+            start = index + 1
+            break
+        if line[0].isspace():
+            possible_continuation_lines += 1
+            continue
+
+        if line.startswith(GIT_GENERATED_PREFIXES):
+            trailer_lines += 1
+            recognized_prefix = True
+        elif TRAILER_REGEX.match(line) is not None:
+            trailer_lines += 1
+        else:
+            non_trailer_lines += 1 + possible_continuation_lines
+        possible_continuation_lines = 0
+    else:
+        # The paragraph directly follows the title.
+        start = title_end
+
+    if trailer_lines > 0 and (
+        non_trailer_lines == 0
+        or (recognized_prefix and trailer_lines * 3 >= non_trailer_lines)
+    ):
+        return start
+    return end
+
+
+# Parsed messages keyed by the message itself.
+_parsed_messages = caches.create("parsed-messages", max_entries=4096)
+
+
+def parse_message(message: str) -> ParsedMessage:
+    """Parse trailers and the changelog link of a commit message in a single pass.
+
+    Messages are immutable so the results are cached.
+    """
+    if (parsed := _parsed_messages.get(message)) is None:
+        parsed = _parse_message(message)
+        _parsed_messages.put(message, parsed)
+    return parsed
+
+
+def _parse_message(message: str) -> ParsedMessage:
+    lines = message.splitlines()
+    title_end: Optional[int] = None
+    # Ignore trailing blank lines, comments and anything after patch divider.
+    end = 0
+    changelog_link: Optional[str] = None
+    # Line breaks are kept for recognizing the divider.
+    for index, line_with_break in enumerate(message.splitlines(keepends=True)):
+        line = lines[index]
+        if PATCH_DIVIDER_REGEX.match(line_with_break):
+            break
+        if line.startswith(COMMENT_PREFIX):
+            continue
+        if _is_blank(line):
+            if title_end is None:
+                title_end = index
+            continue
+        end = index + 1
+        if changelog_link is None and (stripped := line.strip()).startswith("https://"):
+            changelog_link = stripped
+
+    if title_end is None:
+        # The whole message is the title.
+        return ParsedMessage(trailers=TrailerMap(), changelog_link=changelog_link)
+
+    trailers: list[tuple[str, str]] = []
+    # Continuation lines are only unfolded into trailers, not other lines in the block.
+    continues_trailer = False
+    for line in lines[_find_trailer_block_start(lines, title_end, end) : end]:
+        if line.startswith(COMMENT_PREFIX):
+            # Indented lines cannot continue a trailer across a comment.
+            continues_trailer = False
+            continue
+        if line[0].isspace():
+            if continues_trailer:
+                key, value = trailers[-1]
+                trailers[-1] = (key, f"{value} {line.strip()}".strip())
+            continue
+        if (match := TRAILER_REGEX.match(line)) is not None:
+            trailers.append((match.group(1), match.group(2).strip()))
+            continues_trailer = True
+        else:
+            # E.g. cherry-pick note, which has no key.
+            continues_trailer = False
+
+    return ParsedMessage(trailers=TrailerMap(trailers), changelog_link=changelog_link)
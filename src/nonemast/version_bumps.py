@@ -0,0 +1,148 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from gi.repository import Ggit
+from gi.repository import GLib
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Optional
+import re
+from .cache_manager import MISSING, caches
+from .git_utils import (
+    ThreadRepositories,
+    get_commit_diff,
+    get_diff_deltas,
+    read_blob_text,
+)
+from .package_update import PackageUpdate
+
+SUBJECT_VERSION_BUMP_REGEX = re.compile(
+    r"^(?P<attribute>[^:\s]+): (?P<old>\S+) (?:->|→) (?P<new>\S+)$"
+)
+
+NIX_VERSION_REGEX = re.compile(
+    r"""^\s*version\s*=\s*"(?P<version>[^"]*)"\s*;""",
+    re.MULTILINE,
+)
+
+
+@dataclass(frozen=True)
+class VersionBump:
+    old: str
+    new: str
+
+
+def parse_subject_version_bump(subject: str) -> Optional[VersionBump]:
+    """Parse subjects in “attribute: old -> new” format."""
+    if (match := SUBJECT_VERSION_BUMP_REGEX.match(subject)) is None:
+        return None
+    return VersionBump(old=match.group("old"), new=match.group("new"))
+
+
+def find_version_change(old_text: str, new_text: str) -> Optional[VersionBump]:
+    """Return the first version attribute changed between the two Nix files."""
+    old_versions = NIX_VERSION_REGEX.findall(old_text)
+    new_versions = NIX_VERSION_REGEX.findall(new_text)
+    for old_version, new_version in zip(old_versions, new_versions):
+        if old_version != new_version:
+            return VersionBump(old=old_version, new=new_version)
+    return None
+
+
+# Version changes keyed by old and new blob IDs, so that unchanged files are only parsed once.
+_blob_pair_version_changes = caches.create(
+    "version-changes",
+    max_entries=100_000,
+    persistent=True,
+    encode=lambda change: [change.old, change.new] if change is not None else None,
+    decode=lambda change: VersionBump(*change) if change is not None else None,
+)
+
+
+def get_blob_pair_version_change(
+    repo: Ggit.Repository,
+    old_oid: Ggit.OId,
+    new_oid: Ggit.OId,
+) -> Optional[VersionBump]:
+    key = (old_oid.to_string(), new_oid.to_string())
+    if (cached_change := _blob_pair_version_changes.get(key, MISSING)) is not MISSING:
+        return cached_change
+
+    old_text = read_blob_text(repo, old_oid)
+    new_text = read_blob_text(repo, new_oid)
+    if old_text is None or new_text is None:
+        # Blobs missing in partial clone, do not cache so they can be retried after fetching.
+        return None
+    change = find_version_change(old_text, new_text)
+
+    _blob_pair_version_changes.put(key, change)
+    return change
+
+
+def extract_version_bump(
+    repo: Ggit.Repository,
+    commit: Ggit.Commit,
+) -> Optional[VersionBump]:
+    """Find the version change in Nix files modified by the commit."""
+    diff = get_commit_diff(repo, commit)
+    if diff is None:
+        return None
+
+    for delta in get_diff_deltas(diff):
+        if delta.get_status() != Ggit.DeltaType.MODIFIED:
+            continue
+        if not delta.get_new_file().get_path().endswith(".nix"):
+            continue
+
+        change = get_blob_pair_version_change(
+            repo,
+            delta.get_old_file().get_oid(),
+            delta.get_new_file().get_oid(),
+        )
+        if change is not None:
+            return change
+
+    return None
+
+
+def describe_version_bump_mismatch(
+    subject: str,
+    change: Optional[VersionBump],
+) -> Optional[str]:
+    """Return description of the disagreement between subject and diff, if there is any."""
+    subject_bump = parse_subject_version_bump(subject)
+    if subject_bump is None or change is None:
+        # Not a version bump, or nothing to compare with.
+        return None
+    if subject_bump == change:
+        return None
+    return f"Subject says {subject_bump.old} → {subject_bump.new} but the diff changes version {change.old} → {change.new}."
+
+
+class VersionBumpExtractor:
+    """Checks version bumps of updates against their diffs in background threads."""
+
+    def __init__(self, repositories: ThreadRepositories, executor: Executor):
+        self._repositories = repositories
+        self._executor = executor
+
+    def submit(self, update: PackageUpdate) -> None:
+        first_commit_id = update.props.commits[0].props.id
+        subject = update.props.subject
+        self._executor.submit(self._check, update, subject, first_commit_id)
+
+    def _check(self, update: PackageUpdate, subject: str, commit_id: str) -> None:
+        # Objects from the main thread’s repository cannot be used here.
+        try:
+            repo = self._repositories.get()
+            commit = repo.lookup_commit(Ggit.OId.new_from_string(commit_id))
+            change = extract_version_bump(repo, commit)
+        except GLib.Error as error:
+            return
+        mismatch = describe_version_bump_mismatch(subject, change)
+
+        def apply_result() -> bool:
+            update.props.version_bump_mismatch = mismatch
+            return GLib.SOURCE_REMOVE
+
+        GLib.idle_add(apply_result)
@@ -8,18 +8,62 @@ from gi.repository import GLib
 from gi.repository import GObject
 from gi.repository import Gtk
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Literal, Optional
+from typing import Any, Iterable, Literal, Optional
+import dataclasses
+import os
 import re
 import shutil
 import subprocess
 import tempfile
 import threading
-from .git_utils import signature_to_string
+from .cache_manager import caches
+from .diff_shapes import DiffShapeClassifier
+from .git_utils import (
+    AnyCommit,
+    ThreadRepositories,
+    get_config_signature,
+    signature_to_string,
+)
+from .history import (
+    CommitHydrator,
+    CommitSubjectCache,
+    CommitText,
+    MergeBaseCache,
+    ReviewRange,
+    UpdateGroup,
+    find_nixpkgs_remote_name,
+    get_branch_remote_name,
+    load_update_groups,
+    lookup_update_commits,
+    plan_update_splices,
+)
+from .identities import IdentityResolver
 from .message_utils import get_base_commit_subject
 from .operations.ensure_coauthors import get_missing_coauthors
+from .operations.split_branch import (
+    BranchSplitter,
+    SplitGroup,
+    SplitResult,
+    create_branch,
+    get_parent_id,
+)
 from .package_update import PackageUpdate
-
+from .patch_ids import PatchIdIndex
+from .prefetch import DetailsPrefetcher
+from .remote_fetch import RemoteFetcher
+from .review_queue import ReviewQueue
+from .review_stats import ReviewStatistics
+from .session_snapshot import (
+    RangeDiff,
+    SessionSnapshot,
+    SessionSnapshotStore,
+    compare_with_snapshot,
+    create_snapshot,
+)
+from .trailers import CHANGELOG_REVIEWED_BY, CO_AUTHORED_BY
+from .version_bumps import VersionBumpExtractor
 
 SourceFuncResult = Literal[GLib.SOURCE_CONTINUE, GLib.SOURCE_REMOVE]
 
@@ -37,31 +81,31 @@ def make_error_dialog(parent: Gtk.Window, text: str, **kwargs) -> Gtk.MessageDia
     return dialog
 
 
-def open_commit_message_in_editor(parent: Gtk.Window, path: Path) -> None:
-    """Open path in a text editor and wait for it to quit."""
-    editor = None
+def find_commit_message_editor(path: Path) -> Optional[list]:
+    """Return command opening path in a text editor, which only exits once editing finishes."""
     if shutil.which("re.sonny.Commit") is not None:
-        editor = ["re.sonny.Commit", path]
+        return ["re.sonny.Commit", path]
     elif shutil.which("subl") is not None:
-        editor = ["subl", "--wait", path]
+        return ["subl", "--wait", path]
     elif shutil.which("gedit") is not None:
-        editor = ["gedit", "--wait", path]
+        return ["gedit", "--wait", path]
     elif shutil.which("gnome-text-editor") is not None:
-        editor = ["gnome-text-editor", "--standalone", path]
+        return ["gnome-text-editor", "--standalone", path]
+    return None
 
-    if editor is None:
 
-        def show_error():
-            make_error_dialog(
-                parent, "Unable to find a text editor for editing commit messages."
-            ).show()
+def edit_commit_message_in_editor(editor: list, path: Path, message: str) -> str:
+    """Let the user edit message in a text editor, blocking until it quits.
 
-        GLib.idle_add(show_error)
-    else:
-        subprocess.check_call(editor)
+    Raises subprocess.CalledProcessError or OSError when the editor fails.
+    """
+    with open(path, "w") as commit_file:
+        commit_file.write(message)
 
+    subprocess.check_call(editor)
 
-NIXPKGS_REMOTE_URL = "git@github.com:NixOS/nixpkgs.git"
+    with open(path) as commit_file:
+        return commit_file.read()
 
 
 def view_commit_in_vcs_tool(
@@ -82,28 +126,6 @@ def view_commit_in_vcs_tool(
         subprocess.run(viewer, cwd=repo_path.get_path())
 
 
-def find_nixpkgs_remote_name(repo: Ggit.Repository) -> Optional[str]:
-    for remote_name in repo.list_remotes():
-        remote = repo.lookup_remote(remote_name)
-        if remote is not None:
-            if remote.get_url() == NIXPKGS_REMOTE_URL:
-                return remote_name
-    return None
-
-
-def get_merge_base(
-    repo: Ggit.Repository,
-    oid_one: Ggit.OId,
-    oid_two: Optional[Ggit.OId],
-) -> Optional[Ggit.OId]:
-    if oid_two is None:
-        return None
-    try:
-        return repo.merge_base(oid_one, oid_two)
-    except GLib.Error as e:
-        return None
-
-
 @Gtk.Template(resource_path="/cz/ogion/Nonemast/update-details.ui")
 class UpdateDetails(Gtk.Box):
     __gtype_name__ = "UpdateDetails"
@@ -111,8 +133,12 @@ class UpdateDetails(Gtk.Box):
     _update: Optional[PackageUpdate] = None
 
     _binding: Optional[GObject.Binding] = None
+    _draft_binding: Optional[GObject.Binding] = None
     changes_not_reviewed = GObject.Property(type=bool, default=False)
 
+    commit_message_view = Gtk.Template.Child()
+    commit_message_buffer = Gtk.Template.Child()
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
@@ -133,6 +159,23 @@ class UpdateDetails(Gtk.Box):
                 GObject.BindingFlags.INVERT_BOOLEAN | GObject.BindingFlags.SYNC_CREATE,
             )
 
+        if self._draft_binding is not None:
+            self._draft_binding.unbind()
+            self._draft_binding = None
+        if self._update is not None:
+            self._draft_binding = self._update.bind_property(
+                "commit-message-draft",
+                self.commit_message_buffer,
+                "text",
+                GObject.BindingFlags.BIDIRECTIONAL | GObject.BindingFlags.SYNC_CREATE,
+            )
+
+    def focus_commit_message_editor(self) -> None:
+        self.commit_message_view.grab_focus()
+        self.commit_message_buffer.place_cursor(
+            self.commit_message_buffer.get_start_iter()
+        )
+
 
 @Gtk.Template(resource_path="/cz/ogion/Nonemast/window.ui")
 class NonemastWindow(Adw.ApplicationWindow):
@@ -146,29 +189,89 @@ class NonemastWindow(Adw.ApplicationWindow):
     _updates_subject_indices: dict[str, int] = {}
 
     updates = GObject.Property(type=Gio.ListStore)
+    statistics = GObject.Property(type=ReviewStatistics)
+    remote_fetcher = GObject.Property(type=RemoteFetcher)
+    # Whether the history is being loaded again, e.g. after fetching or changing the base.
+    reloading = GObject.Property(type=bool, default=False)
     updates_search_filter = Gtk.Template.Child()
 
     details_stack = Gtk.Template.Child()
     update_details = Gtk.Template.Child()
-
-    _repo: Ggit.Repository
-    _base_revspec: Optional[str]
+    session_changes_banner = Gtk.Template.Child()
+
+    _repo: Optional[Ggit.Repository] = None
+    _review_range: ReviewRange
+    # Remotes to fetch in the background, the upstream one and the one tracked by the current branch.
+    _fetch_remote_names: list[str] = []
+    _fetch_interval: Optional[int]
+    _fetch_requested_by_user = False
+    # Cancels the running reload when a newer one is started.
+    _reload_cancellable: Optional[Gio.Cancellable] = None
+    # Range loaded by the running reload, applied once it finishes.
+    _pending_review_range: Optional[ReviewRange] = None
+    # Name of the reviewed branch, identifying the session snapshot.
+    _branch_name: Optional[str] = None
+    # State of the branch at the end of the previous session.
+    _session_snapshot: Optional[SessionSnapshot] = None
 
     def __init__(
         self,
         repo_path: Gio.File,
-        base_revspec: Optional[str],
+        review_range: ReviewRange,
+        fetch_interval: Optional[int] = None,
         **kwargs,
     ):
         super().__init__(**kwargs)
 
         self._repo_path = repo_path
-        self._base_revspec = base_revspec
+        self._review_range = review_range
+        self._fetch_interval = fetch_interval
+        self._merge_base_cache = MergeBaseCache()
+        self._commit_subjects = CommitSubjectCache()
+        self._patch_ids = PatchIdIndex()
+        self._snapshot_store = SessionSnapshotStore()
 
         self._search_query = None
         self._filter_reviewed = None
+        self._filter_shape = None
+        self._filter_session_changed = False
+        # Pending re-evaluation of the filter after classification results arrived.
+        self._refilter_source_id: Optional[int] = None
 
         self.props.updates = Gio.ListStore.new(PackageUpdate)
+        # Shared by everything comparing people, so each identity is only resolved once.
+        self._identities = IdentityResolver()
+        self.props.statistics = ReviewStatistics(self._identities)
+        self._review_queue = ReviewQueue()
+
+        # Pool for analysing updates in the background, shared by the analysers.
+        self._analysis_executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        repositories = ThreadRepositories(self._repo_path)
+        self._version_bump_extractor = VersionBumpExtractor(
+            repositories,
+            self._analysis_executor,
+        )
+        self._diff_shape_classifier = DiffShapeClassifier(
+            repositories,
+            self._analysis_executor,
+            self._patch_ids,
+        )
+
+        # Separate pool for reading commits, so that loading does not wait for queued analyses.
+        self._load_executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        load_repositories = ThreadRepositories(self._repo_path)
+        self._hydrator = CommitHydrator(load_repositories, self._load_executor)
+        self._branch_splitter = BranchSplitter(load_repositories, self._load_executor)
+
+        # Single worker, prefetching for the previous selection is cancelled anyway.
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1)
+        self._details_prefetcher = DetailsPrefetcher(
+            ThreadRepositories(self._repo_path),
+            self._prefetch_executor,
+        )
+
+        self.props.remote_fetcher = RemoteFetcher(self._repo_path)
+        self.props.remote_fetcher.connect("finished", self.on_fetch_finished)
 
         action = Gio.SimpleAction.new("ensure-coauthors")
         action.connect("activate", self.ensure_coauthors)
@@ -182,10 +285,38 @@ class NonemastWindow(Adw.ApplicationWindow):
         action.connect("activate", self.edit_commit_message)
         self.add_action(action)
 
+        action = Gio.SimpleAction.new("save-commit-message", GLib.VariantType.new("s"))
+        action.connect("activate", self.save_commit_message)
+        self.add_action(action)
+
+        action = Gio.SimpleAction.new(
+            "cancel-commit-message-edit", GLib.VariantType.new("s")
+        )
+        action.connect("activate", self.cancel_commit_message_edit)
+        self.add_action(action)
+
+        action = Gio.SimpleAction.new(
+            "edit-commit-message-in-editor", GLib.VariantType.new("s")
+        )
+        action.connect("activate", self.edit_commit_message_in_editor)
+        self.add_action(action)
+
         action = Gio.SimpleAction.new("view-commit", GLib.VariantType.new("s"))
         action.connect("activate", self.view_commit)
         self.add_action(action)
 
+        action = Gio.SimpleAction.new("next-unreviewed")
+        action.connect("activate", self.select_next_unreviewed)
+        self.add_action(action)
+
+        action = Gio.SimpleAction.new("previous-unreviewed")
+        action.connect("activate", self.select_previous_unreviewed)
+        self.add_action(action)
+
+        action = Gio.SimpleAction.new("mark-as-reviewed-and-advance")
+        action.connect("activate", self.mark_as_reviewed_and_advance)
+        self.add_action(action)
+
         action = Gio.SimpleAction.new_stateful(
             name="filter",
             parameter_type=GLib.VariantType.new("s"),
@@ -194,37 +325,110 @@ class NonemastWindow(Adw.ApplicationWindow):
         action.connect("change-state", self.on_toggle_filter)
         self.add_action(action)
 
+        action = Gio.SimpleAction.new("fetch")
+        action.connect("activate", self.fetch_remotes)
+        # Enabled once the remotes are known.
+        action.set_enabled(False)
+        self.add_action(action)
+
+        action = Gio.SimpleAction.new("cancel-fetch")
+        action.connect("activate", self.cancel_fetch)
+        self.add_action(action)
+
+        action = Gio.SimpleAction.new("choose-base")
+        action.connect("activate", self.choose_base)
+        # Enabled once the history is loaded.
+        action.set_enabled(False)
+        self.add_action(action)
+
+        action = Gio.SimpleAction.new("set-base", GLib.VariantType.new("s"))
+        action.connect("activate", self.set_base)
+        action.set_enabled(False)
+        self.add_action(action)
+
+        action = Gio.SimpleAction.new("show-cache-statistics")
+        action.connect("activate", self.show_cache_statistics)
+        self.add_action(action)
+
+        action = Gio.SimpleAction.new("split-branch")
+        action.connect("activate", self.choose_split_branch)
+        # Enabled once the history is loaded.
+        action.set_enabled(False)
+        self.add_action(action)
+
         thread = threading.Thread(
             target=self.load_commit_history,
             daemon=True,
         )
         thread.start()
 
+    def do_close_request(self) -> bool:
+        self._analysis_executor.shutdown(wait=False, cancel_futures=True)
+        self._load_executor.shutdown(wait=False, cancel_futures=True)
+        self._details_prefetcher.cancel()
+        self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
+        if self._refilter_source_id is not None:
+            GLib.source_remove(self._refilter_source_id)
+            self._refilter_source_id = None
+        self.props.remote_fetcher.unschedule()
+        self.props.remote_fetcher.cancel()
+        if self._reload_cancellable is not None:
+            self._reload_cancellable.cancel()
+        self.save_session_snapshot()
+
+        return Adw.ApplicationWindow.do_close_request(self)
+
     def on_toggle_filter(
         self,
         action: Gio.SimpleAction,
         variant: GLib.Variant,
     ) -> None:
-        match variant.get_string():
-            case "reviewed":
+        self._filter_reviewed = None
+        self._filter_shape = None
+        self._filter_session_changed = False
+        match variant.get_string().split(":", 1):
+            case ["reviewed"]:
                 self._filter_reviewed = True
-            case "unreviewed":
+            case ["unreviewed"]:
                 self._filter_reviewed = False
-            case other:
-                self._filter_reviewed = None
+            case ["session-changed"]:
+                self._filter_session_changed = True
+            case ["shape", shape]:
+                self._filter_shape = shape
         action.set_state(variant)
-        self.updates_search_filter.set_filter_func(self.filter_func)
+        self.updates_search_filter.set_filter_func(self.filter_and_track)
+
+    def filter_and_track(self, update: PackageUpdate) -> bool:
+        """Filter the list, recording the result so that navigation does not need to evaluate the filter again."""
+        visible = self.filter_func(update)
+        self._review_queue.set_visible(update, visible)
+        return visible
 
     def filter_func(self, update: PackageUpdate) -> bool:
-        search_matches = (
-            self._search_query is None or self._search_query in update.props.subject
+        search_matches = self._search_query is None or self.search_matches(
+            update, self._search_query
         )
         filter_matches = (
             self._filter_reviewed is None
             or self._filter_reviewed == update.props.changes_reviewed
         )
+        shape_matches = (
+            self._filter_shape is None or self._filter_shape == update.props.diff_shape
+        )
+        session_matches = (
+            not self._filter_session_changed or update.props.has_session_change
+        )
 
-        return search_matches and filter_matches
+        return search_matches and filter_matches and shape_matches and session_matches
+
+    def search_matches(self, update: PackageUpdate, query: str) -> bool:
+        """Match the query against subject, and identities of reviewers and co-authors."""
+        if query in update.props.subject:
+            return True
+        return any(
+            query in self._identities.resolve_identity(identity)
+            for identity in [*update.props.reviewers, *update.props.coauthors]
+        )
 
     @Gtk.Template.Callback()
     def on_search_changed(self, entry: Gtk.SearchEntry) -> None:
@@ -234,33 +438,66 @@ class NonemastWindow(Adw.ApplicationWindow):
         else:
             self._search_query = text
 
-        self.updates_search_filter.set_filter_func(self.filter_func)
+        self.updates_search_filter.set_filter_func(self.filter_and_track)
 
     def ensure_coauthors(
         self,
         action: Gio.SimpleAction,
         parameter: None,
     ) -> None:
-        signature = self.make_git_signature()
-        for commit, authors in get_missing_coauthors(self.props.updates):
+        if self.make_git_signature() is None:
+            return
+
+        for commit, authors in get_missing_coauthors(
+            self.props.updates,
+            self._identities,
+        ):
             original_commit_subject = get_base_commit_subject(commit.get_subject())
-            trailers = "\n".join(f"Co-authored-by: {author}" for author in authors)
-            commit_message = f"squash! {original_commit_subject}\n\n" + trailers
-            self.create_empty_commit(
-                target_subject=original_commit_subject,
-                message=commit_message,
-                author=signature,
-            )
+            self.add_coauthors(original_commit_subject, authors)
 
     def mark_as_reviewed(
         self,
         action: Gio.SimpleAction,
         parameter: GLib.Variant,
     ) -> None:
-        original_commit_subject = parameter.get_string()
+        self.mark_update_as_reviewed(parameter.get_string())
+
+    def get_update(self, subject: str) -> Optional[PackageUpdate]:
+        index = self._updates_subject_indices.get(subject)
+        if index is None:
+            return None
+        return self.props.updates.get_item(index)
+
+    def mark_update_as_reviewed(self, original_commit_subject: str) -> bool:
+        """Create a squash commit adding Changelog-Reviewed-By tag to the update.
+
+        Return whether the commit was created.
+        """
+        signature = self.make_git_signature()
+        if signature is None:
+            return False
+        commit_message = f"squash! {original_commit_subject}\n\n{CHANGELOG_REVIEWED_BY}: {signature_to_string(signature)}"
+        return self.create_empty_commit(
+            target_subject=original_commit_subject,
+            message=commit_message,
+            author=signature,
+        )
+
+    def add_coauthors(
+        self,
+        original_commit_subject: str,
+        authors: Iterable[str],
+    ) -> bool:
+        """Create a squash commit adding Co-authored-by tags to the update.
+
+        Return whether the commit was created.
+        """
         signature = self.make_git_signature()
-        commit_message = f"squash! {original_commit_subject}\n\nChangelog-Reviewed-By: {signature_to_string(signature)}"
-        self.create_empty_commit(
+        if signature is None:
+            return False
+        trailers = "\n".join(f"{CO_AUTHORED_BY}: {author}" for author in authors)
+        commit_message = f"squash! {original_commit_subject}\n\n" + trailers
+        return self.create_empty_commit(
             target_subject=original_commit_subject,
             message=commit_message,
             author=signature,
@@ -270,50 +507,146 @@ class NonemastWindow(Adw.ApplicationWindow):
         self,
         action: Gio.SimpleAction,
         parameter: GLib.Variant,
+    ) -> None:
+        """Start editing the final commit message in the details view."""
+        update = self.get_update(parameter.get_string())
+        if update is None or update.props.commit_message_is_edited:
+            return
+
+        update.props.commit_message_draft = update.props.final_commit_message.strip()
+        update.props.commit_message_is_edited_inline = True
+        update.props.commit_message_is_edited = True
+        if self.update_details.props.update is update:
+            self.update_details.focus_commit_message_editor()
+
+    def save_commit_message(
+        self,
+        action: Gio.SimpleAction,
+        parameter: GLib.Variant,
     ) -> None:
         original_commit_subject = parameter.get_string()
+        update = self.get_update(original_commit_subject)
+        if update is None or not update.props.commit_message_is_edited_inline:
+            return
+
+        if self.amend_commit_message(
+            original_commit_subject,
+            update.props.commit_message_draft,
+        ):
+            update.props.commit_message_is_edited_inline = False
+            update.props.commit_message_is_edited = False
+
+    def cancel_commit_message_edit(
+        self,
+        action: Gio.SimpleAction,
+        parameter: GLib.Variant,
+    ) -> None:
+        update = self.get_update(parameter.get_string())
+        if update is None or not update.props.commit_message_is_edited_inline:
+            return
 
-        def editing_thread():
-            update = self.props.updates.get_item(
-                self._updates_subject_indices[original_commit_subject]
-            )
-            update.props.commit_message_is_edited = True
-            try:
-                old_commit_message = update.props.final_commit_message.strip()
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    commit_file_path = Path(temp_dir) / "COMMIT_EDITMSG"
-                    with open(commit_file_path, "w") as commit_file:
-                        commit_file.write(old_commit_message)
-
-                    # Blocks the thread until editing finishes.
-                    open_commit_message_in_editor(self, commit_file_path)
-
-                    with open(commit_file_path) as commit_file:
-                        new_commit_message = commit_file.read().strip()
+        update.props.commit_message_is_edited_inline = False
+        update.props.commit_message_is_edited = False
 
-                if new_commit_message == "":
-                    return
+    def edit_commit_message_in_editor(
+        self,
+        action: Gio.SimpleAction,
+        parameter: GLib.Variant,
+    ) -> None:
+        """Continue editing the commit message in an external text editor."""
+        original_commit_subject = parameter.get_string()
+        update = self.get_update(original_commit_subject)
+        if update is None:
+            return
+        if update.props.commit_message_is_edited_inline:
+            old_commit_message = update.props.commit_message_draft
+        elif not update.props.commit_message_is_edited:
+            old_commit_message = update.props.final_commit_message.strip()
+        else:
+            # Already open in an editor.
+            return
+
+        temp_dir = tempfile.TemporaryDirectory()
+        commit_file_path = Path(temp_dir.name) / "COMMIT_EDITMSG"
+        editor = find_commit_message_editor(commit_file_path)
+        if editor is None:
+            temp_dir.cleanup()
+            make_error_dialog(
+                self, "Unable to find a text editor for editing commit messages."
+            ).show()
+            return
 
-                if new_commit_message == old_commit_message:
-                    return
+        update.props.commit_message_is_edited_inline = False
+        update.props.commit_message_is_edited = True
 
-                commit_message = (
-                    f"amend! {original_commit_subject}\n\n{new_commit_message}"
-                )
-                signature = self.make_git_signature()
-                self.create_empty_commit(
-                    target_subject=original_commit_subject,
-                    message=commit_message,
-                    author=signature,
+        def editing_thread() -> None:
+            new_commit_message = None
+            try:
+                # Blocks the thread until editing finishes.
+                new_commit_message = edit_commit_message_in_editor(
+                    editor,
+                    commit_file_path,
+                    old_commit_message,
                 )
+            except (subprocess.CalledProcessError, OSError):
+                # Keep the message, like when the editor quits without saving.
+                pass
             finally:
-                update.props.commit_message_is_edited = False
+                temp_dir.cleanup()
+                GLib.idle_add(
+                    self.finish_editing_in_editor,
+                    original_commit_subject,
+                    new_commit_message,
+                )
 
         thread = threading.Thread(
             target=editing_thread,
+            daemon=True,
         )
         thread.start()
 
+    def finish_editing_in_editor(
+        self,
+        original_commit_subject: str,
+        new_commit_message: Optional[str],
+    ) -> SourceFuncResult:
+        update = self.get_update(original_commit_subject)
+        if update is not None:
+            update.props.commit_message_is_edited = False
+        if new_commit_message is not None:
+            self.amend_commit_message(original_commit_subject, new_commit_message)
+
+        return GLib.SOURCE_REMOVE
+
+    def amend_commit_message(
+        self,
+        original_commit_subject: str,
+        new_commit_message: str,
+    ) -> bool:
+        """Create an amend commit replacing the final message of the update.
+
+        Return whether editing is finished, i.e. the commit was created or nothing changed.
+        """
+        update = self.get_update(original_commit_subject)
+        if update is None:
+            return True
+
+        new_commit_message = new_commit_message.strip()
+        if new_commit_message == "":
+            return True
+
+        if new_commit_message == update.props.final_commit_message.strip():
+            return True
+
+        signature = self.make_git_signature()
+        if signature is None:
+            return False
+        return self.create_empty_commit(
+            target_subject=original_commit_subject,
+            message=f"amend! {original_commit_subject}\n\n{new_commit_message}",
+            author=signature,
+        )
+
     def view_commit(
         self,
         action: Gio.SimpleAction,
@@ -323,16 +656,8 @@ class NonemastWindow(Adw.ApplicationWindow):
         view_commit_in_vcs_tool(self, commit_id, self._repo_path)
 
     def make_git_signature(self) -> Optional[Ggit.Signature]:
-        try:
-            config: Ggit.Config = self._repo.get_config().snapshot()
-            author_name = config.get_string("user.name")
-            author_email = config.get_string("user.email")
-
-            return Ggit.Signature.new_now(
-                name=author_name,
-                email=author_email,
-            )
-        except:
+        signature = get_config_signature(self._repo)
+        if signature is None:
             make_error_dialog(
                 parent=self,
                 text="Missing Git Identity",
@@ -340,14 +665,14 @@ class NonemastWindow(Adw.ApplicationWindow):
                 secondary_use_markup=True,
             ).show()
 
-        return None
+        return signature
 
     def create_empty_commit(
         self,
         target_subject: str,
         message: str,
         author: Ggit.Signature,
-    ) -> None:
+    ) -> bool:
         head: Ggit.OId = self._repo.get_head().get_target()
         current_commit: Ggit.Commit = self._repo.lookup_commit(head)
         try:
@@ -367,12 +692,18 @@ class NonemastWindow(Adw.ApplicationWindow):
                 text="Error Creating a Commit",
                 secondary_text=error.message,
             ).show()
+            return False
 
         new_commit: Ggit.Commit = self._repo.lookup_commit(new_commit_oid)
         update = self.props.updates.get_item(
             self._updates_subject_indices[target_subject]
         )
         update.add_commit(new_commit)
+        # Indexed while the session runs, so that closing the window does not wait for git.
+        self._analysis_executor.submit(
+            self.update_patch_ids, [new_commit_oid.to_string()]
+        )
+        return True
 
     @Gtk.Template.Callback()
     def on_selected_item_changed(
@@ -381,105 +712,712 @@ class NonemastWindow(Adw.ApplicationWindow):
         _prop_name: Any,
     ) -> None:
         self.do_select_update(selection.get_selected_item())
+        if (selected := selection.get_selected()) != Gtk.INVALID_LIST_POSITION:
+            # Neighbours in the filtered list, where the keyboard navigation moves next.
+            self._details_prefetcher.retarget(selection, selected)
+        else:
+            self._details_prefetcher.cancel()
 
     def do_select_update(self, update: PackageUpdate) -> None:
         self.update_details.props.update = update
 
-    def populate_updates(
+    def get_selected_position(self) -> Optional[int]:
+        """Return position of the selected update in the updates store."""
+        update = self.updates_list_view.get_model().get_selected_item()
+        if update is None:
+            return None
+        return self._updates_subject_indices[update.props.subject]
+
+    def select_position(self, position: int) -> None:
+        """Select and reveal the update at position of the updates store."""
+        selection: Gtk.SingleSelection = self.updates_list_view.get_model()
+        visible_position = self._review_queue.get_filtered_position(position)
+        if visible_position is None:
+            return
+
+        selection.set_selected(visible_position)
+        self.updates_list_view.activate_action(
+            "list.scroll-to-item",
+            GLib.Variant.new_uint32(visible_position),
+        )
+
+    def _step_unreviewed(self, forward: bool) -> None:
+        position = self.get_selected_position()
+        # Updates hidden by search are skipped by the queue.
+        if forward:
+            position = self._review_queue.next_unreviewed(position)
+        else:
+            position = self._review_queue.previous_unreviewed(position)
+        if position is not None:
+            self.select_position(position)
+
+    def select_next_unreviewed(
         self,
-        updates: OrderedDict[str, list[Ggit.Commit]],
-    ) -> SourceFuncResult:
-        index = 0
-        for subject, commits in updates.items():
-            self._updates_subject_indices[subject] = index
-            update = PackageUpdate(
-                repo=self._repo,
-                subject=subject,
-                commits=commits,
-            )
-            self.props.updates.append(update)
-            index += 1
+        action: Gio.SimpleAction,
+        parameter: None,
+    ) -> None:
+        self._step_unreviewed(forward=True)
 
-        if index == 0:
+    def select_previous_unreviewed(
+        self,
+        action: Gio.SimpleAction,
+        parameter: None,
+    ) -> None:
+        self._step_unreviewed(forward=False)
+
+    def mark_as_reviewed_and_advance(
+        self,
+        action: Gio.SimpleAction,
+        parameter: None,
+    ) -> None:
+        position = self.get_selected_position()
+        if position is not None:
+            update = self.props.updates.get_item(position)
+            if not update.props.changes_reviewed:
+                if not self.mark_update_as_reviewed(update.props.subject):
+                    return
+        self._step_unreviewed(forward=True)
+
+    def create_update(
+        self,
+        subject: str,
+        commits: list[AnyCommit],
+        classify: bool = True,
+    ) -> PackageUpdate:
+        update = PackageUpdate(
+            repo=self._repo,
+            subject=subject,
+            commits=commits,
+        )
+        self.props.statistics.track(update)
+        update.connect("notify::diff-shape", self.on_update_diff_shape_changed)
+        self._version_bump_extractor.submit(update)
+        if classify:
+            self._diff_shape_classifier.submit(update)
+        return update
+
+    def classify_updates(self) -> SourceFuncResult:
+        for update in self.props.updates:
+            self._diff_shape_classifier.submit(update)
+
+        return GLib.SOURCE_REMOVE
+
+    def reindex_updates(self) -> None:
+        """Update structures referring to updates by their position."""
+        self._updates_subject_indices = {}
+        self._review_queue.clear()
+        for index, update in enumerate(self.props.updates):
+            self._updates_subject_indices[update.props.subject] = index
+            self._review_queue.track(update, index)
+
+        if len(self.props.updates) == 0:
             self.updates_list_stack.set_visible_child_name("empty")
         else:
             self.updates_list_stack.set_visible_child_name("list")
             self.details_stack.set_visible_child_name("details")
 
+    def populate_updates(
+        self,
+        updates: OrderedDict[str, list[AnyCommit]],
+        fetch_remote_names: list[str],
+    ) -> SourceFuncResult:
+        self.props.updates.splice(
+            0,
+            0,
+            [
+                # Classified once their patch-ids are known, see classify_updates.
+                self.create_update(subject, commits, classify=False)
+                for subject, commits in updates.items()
+            ],
+        )
+        self.reindex_updates()
+        self.lookup_action("choose-base").set_enabled(True)
+        self.lookup_action("set-base").set_enabled(True)
+        self.lookup_action("split-branch").set_enabled(True)
+
+        self._fetch_remote_names = fetch_remote_names
+        if len(fetch_remote_names) > 0:
+            self.lookup_action("fetch").set_enabled(True)
+            if self._fetch_interval is not None:
+                self.props.remote_fetcher.schedule(
+                    self._fetch_interval * 60,
+                    fetch_remote_names,
+                )
+
         return GLib.SOURCE_REMOVE
 
-    def show_error(self, error: GLib.Error) -> SourceFuncResult:
-        self.updates_list_stack.set_visible_child_name("error")
-        self.updates_list_error.set_description(error.message)
+    def fetch_remotes(
+        self,
+        action: Gio.SimpleAction,
+        _parameter: None,
+    ) -> None:
+        self._fetch_requested_by_user = True
+        self.props.remote_fetcher.fetch(self._fetch_remote_names)
 
-        return GLib.SOURCE_REMOVE
+    def cancel_fetch(
+        self,
+        action: Gio.SimpleAction,
+        _parameter: None,
+    ) -> None:
+        self.props.remote_fetcher.cancel()
 
-    def load_commit_history(self) -> None:
-        updates: OrderedDict[str, list[Ggit.Commit]] = OrderedDict()
-        try:
-            self._repo = Ggit.Repository.open(self._repo_path)
-            mailmap: Ggit.Mailmap = Ggit.Mailmap.new_from_repository(self._repo)
-            head = self._repo.get_head()
-
-            # Find the remote corresponding to upstream Nixpkgs
-            nixpkgs_remote_name = find_nixpkgs_remote_name(self._repo)
-            if nixpkgs_remote_name is None:
-                error = GLib.Error(
-                    f"Could not find a Git remote with URL “{NIXPKGS_REMOTE_URL}”.",
-                    "nonemast",
-                    1,
+    def on_fetch_finished(
+        self,
+        fetcher: RemoteFetcher,
+        success: bool,
+        message: str,
+    ) -> None:
+        requested_by_user = self._fetch_requested_by_user
+        self._fetch_requested_by_user = False
+        if success:
+            self.reload_updates()
+        elif requested_by_user:
+            # Scheduled fetches fail silently, e.g. when offline.
+            make_error_dialog(
+                self,
+                text="Unable to fetch remotes",
+                secondary_text=message,
+            ).present()
+
+    def choose_base(
+        self,
+        action: Gio.SimpleAction,
+        _parameter: None,
+    ) -> None:
+        entry = Gtk.Entry(
+            text=self.get_target_review_range().base_revspec or "",
+            placeholder_text="Merge bases with upstream branches",
+            activates_default=True,
+        )
+        dialog = Adw.MessageDialog(
+            transient_for=self,
+            modal=True,
+            heading="Review Base",
+            body="Commits reachable from this commit, branch or tag are excluded from the review.",
+            extra_child=entry,
+            default_response="apply",
+            close_response="cancel",
+        )
+        dialog.add_response("cancel", "_Cancel")
+        dialog.add_response("apply", "_Apply")
+        dialog.set_response_appearance("apply", Adw.ResponseAppearance.SUGGESTED)
+
+        def on_response(dialog: Adw.MessageDialog, response: str) -> None:
+            if response == "apply":
+                self.activate_action(
+                    "win.set-base",
+                    GLib.Variant.new_string(entry.get_text().strip()),
                 )
-                GLib.idle_add(self.show_error, error)
-                return
 
-            bases = []
-            if self._base_revspec is not None:
-                base = self._repo.revparse(self._base_revspec).get_id()
-                bases.append(base)
-            else:
-                # Determine merge bases between the current branch and master and staging branches.
-                merge_base_staging = get_merge_base(
-                    self._repo,
-                    head.get_target(),
-                    self._repo.lookup_branch(
-                        f"{nixpkgs_remote_name}/staging",
-                        Ggit.BranchType.REMOTE,
-                    ).get_target(),
+        dialog.connect("response", on_response)
+        dialog.present()
+
+    def set_base(
+        self,
+        action: Gio.SimpleAction,
+        parameter: GLib.Variant,
+    ) -> None:
+        """Reload the review with a different base, empty revspec stands for the default one."""
+        base_revspec = parameter.get_string() or None
+        review_range = self.get_target_review_range()
+        if base_revspec == review_range.base_revspec:
+            return
+        self.reload_updates(
+            dataclasses.replace(review_range, base_revspec=base_revspec)
+        )
+
+    def show_cache_statistics(
+        self,
+        action: Gio.SimpleAction,
+        _parameter: None,
+    ) -> None:
+        """Show counters of caches, to help tuning their budgets."""
+        report = Gtk.Label(
+            label=caches.format_report(),
+            selectable=True,
+            wrap=True,
+            xalign=0,
+            css_classes=["monospace"],
+        )
+        dialog = Adw.MessageDialog(
+            transient_for=self,
+            modal=True,
+            heading="Cache Statistics",
+            extra_child=report,
+            default_response="close",
+            close_response="close",
+        )
+        dialog.add_response("clear", "C_lear Memory")
+        dialog.add_response("close", "_Close")
+        dialog.set_response_appearance("clear", Adw.ResponseAppearance.DESTRUCTIVE)
+
+        def on_response(dialog: Adw.MessageDialog, response: str) -> None:
+            if response == "clear":
+                caches.clear()
+
+        dialog.connect("response", on_response)
+        dialog.present()
+
+    def choose_split_branch(
+        self,
+        action: Gio.SimpleAction,
+        _parameter: None,
+    ) -> None:
+        name_row = Adw.EntryRow(title="Branch Name")
+        base_row = Adw.EntryRow(title="Base (Base of the Review by Default)")
+        paths_row = Adw.EntryRow(title="Only Changing Paths, e.g. pkgs/desktops/*")
+        rows = Gtk.ListBox(
+            selection_mode=Gtk.SelectionMode.NONE,
+            css_classes=["boxed-list"],
+        )
+        for row in [name_row, base_row, paths_row]:
+            rows.append(row)
+
+        dialog = Adw.MessageDialog(
+            transient_for=self,
+            modal=True,
+            heading="Split Into Branch",
+            body="Updates shown in the list are autosquashed onto the base in a new branch. The working tree is left untouched.",
+            extra_child=rows,
+            default_response="split",
+            close_response="cancel",
+        )
+        dialog.add_response("cancel", "_Cancel")
+        dialog.add_response("split", "_Split")
+        dialog.set_response_appearance("split", Adw.ResponseAppearance.SUGGESTED)
+        dialog.set_response_enabled("split", False)
+
+        def on_name_changed(row: Adw.EntryRow) -> None:
+            dialog.set_response_enabled("split", row.get_text().strip() != "")
+
+        def on_response(dialog: Adw.MessageDialog, response: str) -> None:
+            if response == "split":
+                self.split_branch(
+                    name_row.get_text().strip(),
+                    base_row.get_text().strip() or None,
+                    paths_row.get_text().split(),
                 )
-                if merge_base_staging is not None:
-                    bases.append(merge_base_staging)
-                merge_base_master = get_merge_base(
-                    self._repo,
-                    head.get_target(),
-                    self._repo.lookup_branch(
-                        f"{nixpkgs_remote_name}/master",
-                        Ggit.BranchType.REMOTE,
-                    ).get_target(),
+
+        name_row.connect("changed", on_name_changed)
+        dialog.connect("response", on_response)
+        dialog.present()
+
+    def split_branch(
+        self,
+        name: str,
+        base_revspec: Optional[str],
+        path_patterns: list[str],
+    ) -> None:
+        """Create a branch with the shown updates in the background."""
+        selection: Gtk.SingleSelection = self.updates_list_view.get_model()
+        groups = [
+            SplitGroup(
+                subject=update.props.subject,
+                commit_ids=[commit.props.id for commit in update.props.commits],
+                message=update.props.final_commit_message,
+            )
+            for update in (
+                selection.get_item(i) for i in range(selection.get_n_items())
+            )
+        ]
+        if len(groups) == 0:
+            return
+        # The oldest commit of the review, its parent is the default base.
+        first_commit_id = self.props.updates.get_item(0).props.commits[0].props.id
+
+        self.lookup_action("split-branch").set_enabled(False)
+        thread = threading.Thread(
+            target=self.create_split_branch,
+            args=(name, base_revspec, path_patterns, groups, first_commit_id),
+            daemon=True,
+        )
+        thread.start()
+
+    def create_split_branch(
+        self,
+        name: str,
+        base_revspec: Optional[str],
+        path_patterns: list[str],
+        groups: list[SplitGroup],
+        first_commit_id: str,
+    ) -> None:
+        try:
+            # Objects from the main thread’s repository cannot be used here.
+            repo = Ggit.Repository.open(self._repo_path)
+            if base_revspec is not None:
+                base_id = repo.revparse(base_revspec).get_id().to_string()
+            else:
+                base_id = get_parent_id(repo, first_commit_id)
+            if len(path_patterns) > 0:
+                groups = self._branch_splitter.select_by_paths(groups, path_patterns)
+            result = self._branch_splitter.split(
+                repo,
+                groups,
+                base_id,
+                get_config_signature(repo),
+            )
+            create_branch(repo, name, result.head_id)
+            GLib.idle_add(self.finish_split_branch, name, result, None)
+        except GLib.Error as error:
+            # Cancelled when the window is closed while splitting.
+            if not error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                GLib.idle_add(self.finish_split_branch, name, None, error)
+
+    def finish_split_branch(
+        self,
+        name: str,
+        result: Optional[SplitResult],
+        error: Optional[GLib.Error],
+    ) -> SourceFuncResult:
+        self.lookup_action("split-branch").set_enabled(True)
+        if error is not None:
+            make_error_dialog(
+                self,
+                text="Unable to split branch",
+                secondary_text=error.message,
+            ).present()
+            return GLib.SOURCE_REMOVE
+
+        n_applied = len(result.applied)
+        body = (
+            f"{n_applied} update was added to “{name}”."
+            if n_applied == 1
+            else f"{n_applied} updates were added to “{name}”."
+        )
+        if len(result.conflicts) > 0:
+            body += (
+                "\n\nThe following updates conflict and were left out:\n"
+                + "\n".join(
+                    f"{conflict.subject} ({', '.join(conflict.paths)})"
+                    for conflict in result.conflicts
                 )
-                if merge_base_master is not None:
-                    bases.append(merge_base_master)
-
-            # Traverse the commit list until one of the merge bases or a limit is reached.
-            n_revisions = 500
-            revwalker: Ggit.RevisionWalker = Ggit.RevisionWalker.new(self._repo)
-            revwalker.set_sort_mode(
-                Ggit.SortMode.TIME | Ggit.SortMode.TOPOLOGICAL | Ggit.SortMode.REVERSE
             )
-            for base in bases:
-                revwalker.hide(base)
-            oid = head.get_target()
-            revwalker.push(oid)
+        dialog = Adw.MessageDialog(
+            transient_for=self,
+            modal=True,
+            heading="Branch Created",
+            body=body,
+        )
+        dialog.add_response("close", "_Close")
+        dialog.present()
+
+        return GLib.SOURCE_REMOVE
+
+    def reload_updates(self, review_range: Optional[ReviewRange] = None) -> None:
+        """Reload the history and replace only the updates that changed.
+
+        A reload that is already running is cancelled, since its result would be outdated.
+        """
+        if self._repo is None:
+            return
+        if review_range is None:
+            # E.g. after a fetch, which should not undo a base change that is still loading.
+            review_range = self.get_target_review_range()
+
+        if self._reload_cancellable is not None:
+            self._reload_cancellable.cancel()
+        cancellable = Gio.Cancellable()
+        self._reload_cancellable = cancellable
+        self._pending_review_range = review_range
+        self.props.reloading = True
+
+        thread = threading.Thread(
+            target=self.load_reloaded_updates,
+            args=(review_range, cancellable),
+            daemon=True,
+        )
+        thread.start()
+
+    def load_reloaded_updates(
+        self,
+        review_range: ReviewRange,
+        cancellable: Gio.Cancellable,
+    ) -> None:
+        try:
+            # Objects from the main thread’s repository cannot be used here.
+            repo = Ggit.Repository.open(self._repo_path)
+            # Commits shared with the current history are not read again.
+            groups = load_update_groups(
+                repo,
+                review_range,
+                self._merge_base_cache,
+                self._commit_subjects,
+                self._hydrator,
+                cancellable,
+            )
+            # Needed before the new updates are analysed, so that results for rewritten commits are reused.
+            self.update_patch_ids(
+                commit_id for _subject, commit_ids in groups for commit_id in commit_ids
+            )
+            GLib.idle_add(
+                self.apply_reloaded_updates,
+                review_range,
+                groups,
+                self.compare_with_session_snapshot(groups),
+                cancellable,
+            )
+        except GLib.Error as error:
+            if not error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                GLib.idle_add(self.show_reload_error, error, cancellable)
+
+    def finish_reload(self, cancellable: Gio.Cancellable) -> bool:
+        """Return whether the reload is the current one, and mark it as finished."""
+        if cancellable.is_cancelled():
+            # Superseded by a newer reload.
+            return False
+        self._reload_cancellable = None
+        self._pending_review_range = None
+        self.props.reloading = False
+        return True
+
+    def get_target_review_range(self) -> ReviewRange:
+        """Return range the review will show once the running reload, if any, finishes."""
+        if self._pending_review_range is not None:
+            return self._pending_review_range
+        return self._review_range
+
+    def apply_reloaded_updates(
+        self,
+        review_range: ReviewRange,
+        groups: list[UpdateGroup],
+        range_diff: Optional[RangeDiff],
+        cancellable: Gio.Cancellable,
+    ) -> SourceFuncResult:
+        if not self.finish_reload(cancellable):
+            return GLib.SOURCE_REMOVE
+        self._review_range = review_range
+
+        updates = self.props.updates
+        current_groups = self.get_update_groups()
+        splices = plan_update_splices(current_groups, groups)
+        if len(splices) == 0:
+            # The snapshot of the previous session can differ even when the history did not change.
+            if range_diff is not None:
+                self.apply_range_diff(range_diff)
+            return GLib.SOURCE_REMOVE
+
+        selected_position = self.get_selected_position()
+        selected_update = (
+            updates.get_item(selected_position)
+            if selected_position is not None
+            else None
+        )
+
+        try:
+            for old_start, old_end, new_start, new_end in splices:
+                for position in range(old_start, old_end):
+                    self.props.statistics.untrack(updates.get_item(position))
+                added = [
+                    self.create_update(
+                        subject,
+                        [
+                            self._repo.lookup_commit(
+                                Ggit.OId.new_from_string(commit_id)
+                            )
+                            for commit_id in commit_ids
+                        ],
+                    )
+                    for subject, commit_ids in groups[new_start:new_end]
+                ]
+                updates.splice(old_start, old_end - old_start, added)
+        except GLib.Error as error:
+            make_error_dialog(
+                self,
+                text="Unable to reload commits",
+                secondary_text=error.message,
+            ).present()
+        self.reindex_updates()
+        if range_diff is not None:
+            self.apply_range_diff(range_diff)
+
+        if selected_update is not None and not updates.find(selected_update)[0]:
+            # Keep the place of the reviewer when the selected update was rewritten.
+            rewritten = self._patch_ids.match_rewritten(
+                current_groups[selected_position][1],
+                (
+                    commit_id
+                    for _subject, commit_ids in groups
+                    for commit_id in commit_ids
+                ),
+            )
+            position = next(
+                (
+                    position
+                    for position, (_subject, commit_ids) in enumerate(groups)
+                    if any(commit_id in rewritten for commit_id in commit_ids)
+                ),
+                None,
+            )
+            if position is not None:
+                self.select_position(position)
+
+        return GLib.SOURCE_REMOVE
+
+    def get_update_groups(self) -> list[UpdateGroup]:
+        return [
+            (update.props.subject, [commit.props.id for commit in update.props.commits])
+            for update in self.props.updates
+        ]
+
+    def compare_with_session_snapshot(
+        self,
+        groups: list[UpdateGroup],
+    ) -> Optional[RangeDiff]:
+        """Find updates changed since the previous session, expects patch-ids to be up to date."""
+        if self._session_snapshot is None:
+            return None
+        return compare_with_snapshot(self._session_snapshot, groups, self._patch_ids)
+
+    def apply_range_diff(self, range_diff: RangeDiff) -> SourceFuncResult:
+        for update in self.props.updates:
+            update.props.session_change = range_diff.changes.get(update.props.subject)
+
+        n_changed = len(range_diff.changes)
+        n_removed = len(range_diff.removed)
+        parts = []
+        if n_changed > 0:
+            parts.append(
+                f"{n_changed} update changed"
+                if n_changed == 1
+                else f"{n_changed} updates changed"
+            )
+        if n_removed > 0:
+            parts.append(
+                f"{n_removed} update removed"
+                if n_removed == 1
+                else f"{n_removed} updates removed"
+            )
+        if len(parts) > 0:
+            self.session_changes_banner.set_title(
+                " and ".join(parts) + " since last session"
+            )
+            self.session_changes_banner.set_button_label(
+                "_Show" if n_changed > 0 else None
+            )
+            # Removed subjects cannot be shown in the list.
+            self.session_changes_banner.set_tooltip_text(
+                "\n".join(f"Removed: {subject}" for subject in range_diff.removed)
+                or None
+            )
+        self.session_changes_banner.set_revealed(len(parts) > 0)
 
-            while (oid := revwalker.next()) is not None:
-                commit: Ggit.Commit = self._repo.lookup_commit(oid)
-                base_commit_subject = get_base_commit_subject(commit.get_subject())
+        if self._filter_session_changed:
+            self.updates_search_filter.changed(Gtk.FilterChange.DIFFERENT)
 
-                # Add commit to the group.
-                updates.setdefault(base_commit_subject, []).append(commit)
+        return GLib.SOURCE_REMOVE
 
-                if (n_revisions := n_revisions - 1) == 0:
-                    break
+    @Gtk.Template.Callback()
+    def on_session_changes_banner_clicked(self, banner: Adw.Banner) -> None:
+        self.activate_action("win.filter", GLib.Variant.new_string("session-changed"))
+        banner.set_revealed(False)
+
+    def save_session_snapshot(self) -> None:
+        """Remember the updates so that the next session can highlight their changes."""
+        if self._repo is None or self._branch_name is None:
+            return
+
+        groups = self.get_update_groups()
+        # Only stores what is known, commits created during the session were indexed in the background.
+        # Commits whose indexing did not finish are identified by their ID.
+        try:
+            self._snapshot_store.save(
+                Path(self._repo_path.get_path()),
+                self._branch_name,
+                create_snapshot(groups, self._patch_ids),
+            )
+        except OSError as error:
+            # Only highlighting changes in the next session suffers.
+            pass
 
-            GLib.idle_add(self.populate_updates, updates)
+    def update_patch_ids(self, commit_ids: Iterable[str]) -> None:
+        try:
+            self._patch_ids.update(Path(self._repo_path.get_path()), commit_ids)
+        except (subprocess.CalledProcessError, OSError) as error:
+            # Only caching suffers, e.g. when objects are missing from a partial clone.
+            pass
+
+    def show_reload_error(
+        self,
+        error: GLib.Error,
+        cancellable: Gio.Cancellable,
+    ) -> SourceFuncResult:
+        if not self.finish_reload(cancellable):
+            return GLib.SOURCE_REMOVE
+        make_error_dialog(
+            self,
+            text="Unable to reload commits",
+            secondary_text=error.message,
+        ).present()
+
+        return GLib.SOURCE_REMOVE
+
+    def on_update_diff_shape_changed(
+        self,
+        update: PackageUpdate,
+        _pspec: GObject.ParamSpec,
+    ) -> None:
+        if self._filter_shape is not None and self._refilter_source_id is None:
+            # Classification finished after the filter was applied.
+            # Results arrive in bursts, so the whole list is only filtered again once they stop.
+            self._refilter_source_id = GLib.idle_add(
+                self.refilter_updates,
+                priority=GLib.PRIORITY_LOW,
+            )
+
+    def refilter_updates(self) -> SourceFuncResult:
+        self._refilter_source_id = None
+        self.updates_search_filter.changed(Gtk.FilterChange.DIFFERENT)
+
+        return GLib.SOURCE_REMOVE
+
+    def show_error(self, error: GLib.Error) -> SourceFuncResult:
+        self.updates_list_stack.set_visible_child_name("error")
+        self.updates_list_error.set_description(error.message)
+
+        return GLib.SOURCE_REMOVE
+
+    def load_commit_history(self) -> None:
+        try:
+            repo = Ggit.Repository.open(self._repo_path)
+            # Workers only return texts of the commits, objects are looked up when an update needs them.
+            read_texts: dict[str, CommitText] = {}
+            groups = load_update_groups(
+                repo,
+                self._review_range,
+                self._merge_base_cache,
+                self._commit_subjects,
+                self._hydrator,
+                read_texts=read_texts,
+            )
+            updates = lookup_update_commits(repo, groups, read_texts)
+            self._identities.load_mailmap(repo)
+            self._repo = repo
+
+            fetch_remote_names = []
+            for remote_name in [
+                find_nixpkgs_remote_name(repo),
+                get_branch_remote_name(repo),
+            ]:
+                if remote_name is not None and remote_name not in fetch_remote_names:
+                    fetch_remote_names.append(remote_name)
+
+            # Commit objects belong to the main thread once passed there.
+            self._branch_name = repo.get_head().get_name()
+            GLib.idle_add(self.populate_updates, updates, fetch_remote_names)
+
+            self.update_patch_ids(
+                commit_id for _subject, commit_ids in groups for commit_id in commit_ids
+            )
+            # Results for rewritten commits are only reused when their patch-ids are known.
+            GLib.idle_add(self.classify_updates)
+
+            self._session_snapshot = self._snapshot_store.load(
+                Path(self._repo_path.get_path()),
+                self._branch_name,
+            )
+            if (range_diff := self.compare_with_session_snapshot(groups)) is not None:
+                GLib.idle_add(self.apply_range_diff, range_diff)
         except GLib.Error as error:
-            GLib.idle_add(self.show_error, error)
+            # Cancelled when the window is closed during loading.
+            if not error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                GLib.idle_add(self.show_error, error)
@@ -0,0 +1,161 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+"""Differential test comparing PackageUpdate folding with git rebase --autosquash.
+
+Random sequences of fixup!/squash!/amend! commits are generated, folded by
+PackageUpdate, and compared against what real git produces. To keep this fast,
+many sequences are imported into a single repository with git fast-import and
+autosquashed with a single rebase; batches run in parallel.
+
+The seed is printed and included in failure messages. To reproduce a failure,
+re-run with NONEMAST_FUZZ_SEED set to that seed. NONEMAST_FUZZ_CASES controls
+the number of generated sequences.
+"""
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import random
+import subprocess
+import tempfile
+
+try:
+    from ..src.nonemast.package_update import PackageUpdate
+    from .test_autosquashing import FakeCommit
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.package_update import PackageUpdate
+    from tests.test_autosquashing import FakeCommit
+
+FUZZ_CASES = int(os.environ.get("NONEMAST_FUZZ_CASES", "2000"))
+FUZZ_SEED = int(os.environ.get("NONEMAST_FUZZ_SEED", random.randrange(2**32)))
+BATCH_SIZE = 250
+
+BODY_LINES = [
+    "nothing to see here",
+    "https://gitlab.gnome.org/GNOME/glib/-/compare/2.78.4...2.80.0",
+    "Changelog-Reviewed-By: Tester <test@example.com>",
+    "Co-authored-by: Other <other@example.com>",
+    "foo",
+    "bar baz",
+]
+
+
+def random_body(rng: random.Random) -> str:
+    paragraphs = [
+        "\n".join(rng.choices(BODY_LINES, k=rng.randint(1, 3)))
+        for _ in range(rng.randint(1, 2))
+    ]
+    return "\n\n".join(paragraphs)
+
+
+def random_message(rng: random.Random, subject: str) -> str:
+    if rng.random() < 0.5:
+        return subject
+    return f"{subject}\n\n{random_body(rng)}"
+
+
+def random_sequence(rng: random.Random, index: int) -> list[str]:
+    """Generates commit messages of a single update: base commit followed by its fixups."""
+    # Numbering keeps subjects distinct so that the sequences do not interact.
+    subject = f"pkg{index:06}: 1.{index} -> 1.{index + 1}"
+    messages = [random_message(rng, subject)]
+    squashed = False
+    for _ in range(rng.randint(0, 6)):
+        kinds = ["fixup", "fixup-body", "squash", "squash-body"]
+        # There is a bug in git where if a squash commit is followed by an amend commit,
+        # the latter will be treated as a squash commit (see test_autosquashing_amend_after_squash).
+        if not squashed:
+            kinds.append("amend")
+        match rng.choice(kinds):
+            case "fixup":
+                messages.append(f"fixup! {subject}")
+            case "fixup-body":
+                messages.append(f"fixup! {subject}\n\n{random_body(rng)}")
+            case "squash":
+                squashed = True
+                messages.append(f"squash! {subject}")
+            case "squash-body":
+                squashed = True
+                messages.append(f"squash! {subject}\n\n{random_body(rng)}")
+            case "amend":
+                messages.append(
+                    f"amend! {subject}\n\n{random_message(rng, subject + ' (amended)')}"
+                )
+    return messages
+
+
+def autosquash_sequences_with_git(sequences: list[list[str]]) -> list[str]:
+    """Imports all sequences into a single repository, autosquashes them with one rebase, and returns the resulting commit messages."""
+    with tempfile.TemporaryDirectory() as repo_path:
+
+        def git(*args, input=None):
+            return subprocess.run(
+                ["git", *args],
+                input=input,
+                cwd=repo_path,
+                check=True,
+                capture_output=True,
+            ).stdout
+
+        git("init", "--quiet", "--initial-branch=fuzz")
+        # Set up commit author identity.
+        git("config", "user.name", "Tester")
+        git("config", "user.email", "test@example.com")
+        # Keep rebase todo and commit messages when squashing as is.
+        # Unlike other no-op editors, git does not even spawn a process for “:”.
+        git("config", "sequence.editor", ":")
+        git("config", "core.editor", ":")
+
+        # Creating commits one by one would spawn a process for each of them.
+        stream = bytearray()
+        for messages in sequences:
+            for message in messages:
+                data = (message + "\n").encode("utf-8")
+                stream += b"commit refs/heads/fuzz\n"
+                stream += b"committer Tester <test@example.com> 1700000000 +0000\n"
+                stream += b"data %d\n%b\n" % (len(data), data)
+        git("fast-import", "--quiet", input=bytes(stream))
+        git("reset", "--quiet", "--hard")
+
+        git("rebase", "--interactive", "--autosquash", "--root")
+
+        output = git("log", "-z", "--reverse", "--format=%B").decode("utf-8")
+        # Git forces two line breaks at the end.
+        return [message.rstrip("\n") for message in output.split("\0")[:-1]]
+
+
+def fold_with_package_update(messages: list[str]) -> str:
+    update = PackageUpdate(
+        subject="Foo",
+        commits=[FakeCommit(message=message) for message in messages],
+        repo=None,
+    )
+    return update.props.final_commit_message
+
+
+def test_autosquashing_fuzz() -> None:
+    print(f"Fuzzing with NONEMAST_FUZZ_SEED={FUZZ_SEED}")
+    rng = random.Random(FUZZ_SEED)
+    sequences = [random_sequence(rng, index) for index in range(FUZZ_CASES)]
+    batches = [
+        sequences[start : start + BATCH_SIZE]
+        for start in range(0, len(sequences), BATCH_SIZE)
+    ]
+
+    # The work is done by git subprocesses so threads are sufficient.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(autosquash_sequences_with_git, batches)
+        expected = [message for batch in results for message in batch]
+
+    assert len(expected) == len(sequences), f"seed {FUZZ_SEED}: squash mismatch"
+    for index, (messages, want) in enumerate(zip(sequences, expected)):
+        got = fold_with_package_update(messages)
+        assert (
+            got == want
+        ), f"seed {FUZZ_SEED}, case {index}: folding {messages!r} differs from git"
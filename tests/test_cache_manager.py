@@ -0,0 +1,145 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    from ..src.nonemast.cache_manager import MISSING, CacheManager, DiskTier, LruCache
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.cache_manager import MISSING, CacheManager, DiskTier, LruCache
+
+
+def test_entry_budget() -> None:
+    cache: LruCache[str, int] = LruCache("test", max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    # Using an entry protects it from eviction.
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    statistics = cache.get_statistics()
+    assert statistics.entries == 2
+    assert (statistics.hits, statistics.misses, statistics.evictions) == (3, 1, 1)
+    assert statistics.hit_ratio == 0.75
+
+
+def test_byte_budget() -> None:
+    cache: LruCache[str, str] = LruCache(
+        "test",
+        max_bytes=10,
+        size_of=lambda key, value: len(value),
+    )
+    cache.put("a", "x" * 4)
+    cache.put("b", "x" * 4)
+    cache.put("a", "x" * 5)
+    assert cache.get_statistics().size == 9
+    cache.put("c", "x" * 5)
+    assert cache.get("b") is None
+    assert cache.get_statistics().size == 10
+
+    # Entries larger than the whole budget are not kept.
+    cache.put("d", "x" * 11)
+    assert cache.get("d") is None
+    assert cache.get_statistics().entries == 0
+
+
+def test_cached_none() -> None:
+    cache: LruCache[str, None] = LruCache("test")
+    assert cache.get("a", MISSING) is MISSING
+    cache.put("a", None)
+    assert cache.get("a", MISSING) is None
+
+
+def test_disk_tier(tmp_path: Path) -> None:
+    manager = CacheManager()
+    cache = manager.create(
+        "versions",
+        max_entries=1,
+        persistent=True,
+        encode=lambda value: list(value),
+        decode=lambda value: tuple(value),
+    )
+    memory_only = manager.create("markup")
+    manager.enable_disk_tier(tmp_path)
+
+    cache.put(("old-blob", "new-blob"), ("1.0", "2.0"))
+    cache.put(("other-old-blob", "other-new-blob"), ("2.0", "3.0"))
+    memory_only.put("message", "markup")
+    manager.flush()
+    # The main thread never waits for the disk.
+    assert cache.get(("old-blob", "new-blob")) is None
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # Evicted from memory, but still found on disk.
+        assert executor.submit(cache.get, ("old-blob", "new-blob")).result() == (
+            "1.0",
+            "2.0",
+        )
+
+        # Next session.
+        manager.clear()
+        assert memory_only.get("message") is None
+        assert executor.submit(
+            cache.get, ("other-old-blob", "other-new-blob")
+        ).result() == ("2.0", "3.0")
+    assert not (tmp_path / "markup").exists()
+
+    versions, markup = manager.get_statistics()
+    assert (versions.hits, versions.disk_hits, versions.misses) == (0, 2, 1)
+    assert versions.evictions == 2
+    assert markup.misses == 1
+    assert manager.format_report().splitlines() == [
+        "versions: 1/1 entries, 67% hit ratio (0 hits, 2 disk hits, 1 misses, 2 evictions)",
+        "markup: 0 entries, 0% hit ratio (0 hits, 0 disk hits, 1 misses, 0 evictions)",
+    ]
+
+
+def test_disk_tier_skips_unserializable_entries(tmp_path: Path) -> None:
+    disk_tier = DiskTier(tmp_path)
+    broken = tmp_path / "versions" / "00" / "broken"
+    disk_tier.write(broken, {"version": object()})
+    disk_tier.write(tmp_path / "versions" / "00" / "failing", "1.0", encode=int)
+    disk_tier.write(tmp_path / "versions" / "00" / "entry", "1.0")
+    # Returns, rather than waiting for the entries forever.
+    disk_tier.flush()
+    assert sorted(path.name for path in (tmp_path / "versions" / "00").iterdir()) == [
+        "entry"
+    ]
+    assert disk_tier.read(broken) is MISSING
+    assert disk_tier.read(tmp_path / "versions" / "00" / "entry") == "1.0"
+
+    # The writer keeps running.
+    disk_tier.write(broken, "2.0")
+    disk_tier.flush()
+    assert disk_tier.read(broken) == "2.0"
+
+
+def test_disk_budget(tmp_path: Path) -> None:
+    (tmp_path / "versions" / "00").mkdir(parents=True)
+    # Left behind by an interrupted write.
+    (tmp_path / "versions" / "00" / "entry.tmp").write_text("[")
+    entry = '"' + "x" * 98 + '"'
+
+    disk_tier = DiskTier(tmp_path, max_bytes=250)
+    paths = [tmp_path / "versions" / "00" / f"entry{index}" for index in range(3)]
+    for path in paths:
+        disk_tier.write(path, "x" * 98)
+    disk_tier.flush()
+    assert not (tmp_path / "versions" / "00" / "entry.tmp").exists()
+    # The oldest entry is deleted to stay within the budget.
+    assert [path.exists() for path in paths] == [False, True, True]
+    assert disk_tier.get_size() == 2 * len(entry)
+    assert disk_tier.read(paths[0]) is MISSING
+    assert disk_tier.read(paths[2]) == "x" * 98
+
+    # Files from a previous session are indexed, and pruned when the budget shrinks.
+    disk_tier = DiskTier(tmp_path, max_bytes=150)
+    disk_tier.flush()
+    assert [path.exists() for path in paths] == [False, False, True]
+    assert disk_tier.read(paths[2]) == "x" * 98
@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+
+from gi.repository import Gio
+from gi.repository import GLib
+from types import SimpleNamespace
+from typing import Any
+
+try:
+    from ..src.nonemast.dbus_service import ReviewService
+    from ..src.nonemast.package_update import PackageUpdate
+    from .test_review_stats import make_update, review
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.dbus_service import ReviewService
+    from src.nonemast.package_update import PackageUpdate
+    from tests.test_review_stats import make_update, review
+
+ALICE = "Alice <alice@example.com>"
+
+
+class FakeConnection:
+    """Records emitted signals instead of sending them."""
+
+    def __init__(self) -> None:
+        self.signals: list[tuple[str, Any]] = []
+
+    def register_object(self, *args: Any) -> int:
+        return 1
+
+    def unregister_object(self, registration_id: int) -> bool:
+        return True
+
+    def emit_signal(
+        self,
+        destination: None,
+        object_path: str,
+        interface_name: str,
+        signal_name: str,
+        parameters: GLib.Variant,
+    ) -> bool:
+        self.signals.append((signal_name, parameters.unpack()))
+        return True
+
+
+def make_service() -> tuple[FakeConnection, ReviewService, Gio.ListStore]:
+    connection = FakeConnection()
+    service = ReviewService(connection, "/cz/ogion/Nonemast")
+    updates = Gio.ListStore(item_type=PackageUpdate)
+    service.set_window(SimpleNamespace(props=SimpleNamespace(updates=updates)))
+    return connection, service, updates
+
+
+def test_update_changed() -> None:
+    connection, service, updates = make_service()
+    foo = make_update("foo: 1 → 2")
+    updates.append(foo)
+    assert connection.signals == [("UpdatesChanged", (1,))]
+
+    review(foo, ALICE)
+    # The new commit changes the message before the update becomes reviewed.
+    assert connection.signals[1:] == [
+        ("UpdateChanged", ("foo: 1 → 2", False)),
+        ("UpdateChanged", ("foo: 1 → 2", True)),
+    ]
+
+    # Nothing exported changed.
+    foo.notify("changes-reviewed")
+    foo.notify("final-commit-message")
+    assert len(connection.signals) == 3
+
+
+def test_removed_updates_are_disconnected() -> None:
+    connection, service, updates = make_service()
+    foo = make_update("foo: 1 → 2")
+    bar = make_update("bar: 1 → 2")
+    updates.splice(0, 0, [foo, bar])
+    updates.remove(0)
+    assert connection.signals == [("UpdatesChanged", (2,)), ("UpdatesChanged", (1,))]
+
+    review(foo, ALICE)
+    assert len(connection.signals) == 2
+
+    service.unregister()
+    review(bar, ALICE)
+    updates.remove(0)
+    assert len(connection.signals) == 2
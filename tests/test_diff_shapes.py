@@ -0,0 +1,143 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+
+from gi.repository import Ggit
+from gi.repository import Gio
+from pathlib import Path
+
+try:
+    from ..src.nonemast.diff_shapes import (
+        SHAPE_DEPENDENCIES,
+        SHAPE_LARGE,
+        SHAPE_OTHER,
+        SHAPE_PATCHES,
+        SHAPE_VERSION_AND_HASH,
+        ChangedLine,
+        classify_changed_lines,
+        classify_commit,
+        get_changed_lines,
+        most_interesting_shape,
+    )
+    from .test_history import git
+    from .test_version_bumps import GLIB_NEW, GLIB_OLD
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.diff_shapes import (
+        SHAPE_DEPENDENCIES,
+        SHAPE_LARGE,
+        SHAPE_OTHER,
+        SHAPE_PATCHES,
+        SHAPE_VERSION_AND_HASH,
+        ChangedLine,
+        classify_changed_lines,
+        classify_commit,
+        get_changed_lines,
+        most_interesting_shape,
+    )
+    from tests.test_history import git
+    from tests.test_version_bumps import GLIB_NEW, GLIB_OLD
+
+Ggit.init()
+
+
+def shape_of_change(old_text: str, new_text: str) -> str:
+    return classify_changed_lines(
+        "default.nix",
+        get_changed_lines(old_text, new_text),
+    )
+
+
+def test_version_and_hash() -> None:
+    assert shape_of_change(GLIB_OLD, GLIB_NEW) == SHAPE_VERSION_AND_HASH
+
+
+def test_dependencies() -> None:
+    new_text = GLIB_NEW.replace(
+        "  };\n}",
+        "  };\n\n  buildInputs = [\n    libffi\n    pcre2\n  ];\n}",
+    )
+    assert shape_of_change(GLIB_OLD, new_text) == SHAPE_DEPENDENCIES
+
+
+def test_dependency_arguments() -> None:
+    old_text = "{\n  lib,\n  stdenv,\n}:\n\n" + GLIB_OLD
+    new_text = "{\n  lib,\n  stdenv,\n  libffi,\n}:\n\n" + GLIB_NEW
+    assert shape_of_change(old_text, new_text) == SHAPE_DEPENDENCIES
+
+
+def test_words_outside_input_lists() -> None:
+    # Only lists assigned to *Inputs contain dependencies.
+    for changed_text in [
+        "  meta = {\n    description = ''\n      Low level core library\n    '';\n  };\n",
+        "  let\n    pname = glib;\n  in\n  foo\n",
+        "  checkPhase = ''\n    make check\n  '';\n",
+        "  outputs = [\n    bin\n    dev\n  ];\n",
+    ]:
+        new_text = GLIB_NEW.replace("}\n", changed_text + "}\n")
+        assert shape_of_change(GLIB_OLD, new_text) == SHAPE_OTHER, changed_text
+
+    new_text = GLIB_NEW.replace(
+        "  };\n}",
+        "  };\n\n  nativeBuildInputs = [\n    meson ninja\n    python3.pkgs.packaging\n  ];\n}",
+    )
+    assert shape_of_change(GLIB_OLD, new_text) == SHAPE_DEPENDENCIES
+
+
+def test_patches() -> None:
+    new_text = GLIB_NEW.replace(
+        "  };\n}",
+        "  };\n\n  patches = [\n    ./fix-build.patch\n  ];\n}",
+    )
+    assert shape_of_change(GLIB_OLD, new_text) == SHAPE_PATCHES
+
+
+def test_other() -> None:
+    new_text = GLIB_NEW.replace(
+        "  };\n}",
+        '  };\n\n  mesonFlags = [ "-Dman=true" ];\n}',
+    )
+    assert shape_of_change(GLIB_OLD, new_text) == SHAPE_OTHER
+    assert classify_changed_lines("update.sh", [ChangedLine("echo")]) == SHAPE_OTHER
+
+
+def test_large() -> None:
+    new_text = GLIB_NEW + "".join(f"# line {i}\n" for i in range(100))
+    assert shape_of_change(GLIB_OLD, new_text) == SHAPE_LARGE
+
+
+def test_most_interesting_shape() -> None:
+    assert most_interesting_shape([]) is None
+    assert most_interesting_shape([None, SHAPE_VERSION_AND_HASH]) == (
+        SHAPE_VERSION_AND_HASH
+    )
+    assert (
+        most_interesting_shape([SHAPE_PATCHES, SHAPE_DEPENDENCIES, None])
+        == SHAPE_PATCHES
+    )
+
+
+def test_classify_commit(tmp_path: Path) -> None:
+    git(tmp_path, "init", "--quiet")
+    (tmp_path / "default.nix").write_text(GLIB_OLD)
+    git(tmp_path, "add", "default.nix")
+    git(tmp_path, "commit", "--quiet", "-m", "glib: init at 2.78.4")
+    (tmp_path / "default.nix").write_text(GLIB_NEW)
+    git(tmp_path, "commit", "--quiet", "--all", "-m", "glib: 2.78.4 → 2.80.0")
+    (tmp_path / "fix-build.patch").write_text("--- a\n+++ b\n")
+    git(tmp_path, "add", "fix-build.patch")
+    git(tmp_path, "commit", "--quiet", "-m", "glib: fix build")
+    git(tmp_path, "commit", "--quiet", "--allow-empty", "-m", "empty")
+
+    repo = Ggit.Repository.open(Gio.File.new_for_path(str(tmp_path)))
+
+    def classify(revspec: str) -> str:
+        return classify_commit(repo, repo.revparse(revspec))
+
+    assert classify("HEAD~2") == SHAPE_VERSION_AND_HASH
+    assert classify("HEAD~1") == SHAPE_PATCHES
+    assert classify("HEAD") is None
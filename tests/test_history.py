@@ -0,0 +1,245 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+
+from gi.repository import Ggit
+from gi.repository import Gio
+from gi.repository import GLib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import os
+import pytest
+import subprocess
+
+try:
+    from ..src.nonemast.git_utils import LazyCommit, ThreadRepositories, resolve_commit
+    from ..src.nonemast.history import (
+        CommitHydrator,
+        CommitSubjectCache,
+        CommitText,
+        ReviewRange,
+        load_commit_history,
+        load_update_groups,
+        lookup_update_commits,
+        plan_update_splices,
+    )
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.git_utils import LazyCommit, ThreadRepositories, resolve_commit
+    from src.nonemast.history import (
+        CommitHydrator,
+        CommitSubjectCache,
+        CommitText,
+        ReviewRange,
+        load_commit_history,
+        load_update_groups,
+        lookup_update_commits,
+        plan_update_splices,
+    )
+
+Ggit.init()
+
+
+def git(cwd: Path, *args: str, date: str = "2024-01-01T00:00:00Z") -> str:
+    return subprocess.check_output(
+        ["git", *args],
+        encoding="utf-8",
+        cwd=cwd,
+        env={
+            **os.environ,
+            "GIT_AUTHOR_NAME": "Tester",
+            "GIT_AUTHOR_EMAIL": "test@example.com",
+            "GIT_AUTHOR_DATE": date,
+            "GIT_COMMITTER_NAME": "Tester",
+            "GIT_COMMITTER_EMAIL": "test@example.com",
+            "GIT_COMMITTER_DATE": date,
+        },
+    )
+
+
+@pytest.fixture
+def upstream(tmp_path: Path) -> Path:
+    """Repository with two updates on top of some unrelated history."""
+    path = tmp_path / "upstream"
+    path.mkdir()
+    git(path, "init", "--quiet", "--initial-branch=gnome")
+    for day in range(1, 6):
+        git(
+            path,
+            "commit",
+            "--allow-empty",
+            "-m",
+            f"old commit {day}",
+            date=f"2024-01-0{day}T00:00:00Z",
+        )
+    for package in ["foo", "bar"]:
+        (path / f"{package}.nix").write_text('{ version = "2"; }\n')
+        git(path, "add", f"{package}.nix")
+        git(
+            path,
+            "commit",
+            "-m",
+            f"{package}: 1 → 2",
+            date="2024-02-01T00:00:00Z",
+        )
+    git(
+        path,
+        "commit",
+        "--allow-empty",
+        "-m",
+        "squash! foo: 1 → 2\n\nChangelog-Reviewed-By: Tester <test@example.com>",
+        date="2024-02-03T00:00:00Z",
+    )
+    return path
+
+
+def load(path: Path, review_range: ReviewRange) -> dict[str, list[str]]:
+    repo = Ggit.Repository.open(Gio.File.new_for_path(str(path)))
+    return {
+        subject: [commit.get_subject() for commit in commits]
+        for subject, commits in load_commit_history(repo, review_range).items()
+    }
+
+
+EXPECTED_UPDATES = {
+    "foo: 1 → 2": [
+        "foo: 1 → 2",
+        "squash! foo: 1 → 2",
+    ],
+    "bar: 1 → 2": [
+        "bar: 1 → 2",
+    ],
+}
+
+
+def test_base_commit(upstream: Path) -> None:
+    assert load(upstream, ReviewRange(base_revspec="HEAD~3")) == EXPECTED_UPDATES
+
+
+def test_depth(upstream: Path) -> None:
+    assert load(upstream, ReviewRange(depth=3)) == EXPECTED_UPDATES
+
+
+def test_since(upstream: Path) -> None:
+    since = GLib.DateTime.new_utc(2024, 1, 15, 0, 0, 0).to_unix()
+    assert load(upstream, ReviewRange(since=since)) == EXPECTED_UPDATES
+
+
+def test_missing_upstream_remote(upstream: Path) -> None:
+    with pytest.raises(GLib.Error):
+        load(upstream, ReviewRange())
+
+
+def test_bare_clone(upstream: Path, tmp_path: Path) -> None:
+    clone = tmp_path / "bare"
+    git(tmp_path, "clone", "--quiet", "--bare", upstream.as_uri(), str(clone))
+    assert load(clone, ReviewRange(depth=3)) == EXPECTED_UPDATES
+
+
+def test_shallow_clone(upstream: Path, tmp_path: Path) -> None:
+    clone = tmp_path / "shallow"
+    git(tmp_path, "clone", "--quiet", "--depth=3", upstream.as_uri(), str(clone))
+    # Walking stops at the shallow boundary.
+    assert load(clone, ReviewRange(depth=100)) == EXPECTED_UPDATES
+
+
+def test_partial_clone(upstream: Path, tmp_path: Path) -> None:
+    git(upstream, "config", "uploadpack.allowFilter", "true")
+    clone = tmp_path / "partial"
+    git(
+        tmp_path,
+        "clone",
+        "--quiet",
+        "--filter=blob:none",
+        "--no-checkout",
+        upstream.as_uri(),
+        str(clone),
+    )
+    assert load(clone, ReviewRange(base_revspec="HEAD~3")) == EXPECTED_UPDATES
+
+
+def test_load_update_groups_reuses_subjects(upstream: Path) -> None:
+    repo = Ggit.Repository.open(Gio.File.new_for_path(str(upstream)))
+    subjects = CommitSubjectCache()
+    narrow = load_update_groups(repo, ReviewRange(depth=2), subjects=subjects)
+    assert [subject for subject, _commit_ids in narrow] == ["bar: 1 → 2", "foo: 1 → 2"]
+
+    wide = load_update_groups(repo, ReviewRange(depth=3), subjects=subjects)
+    assert [subject for subject, _commit_ids in wide] == list(EXPECTED_UPDATES.keys())
+    assert wide[1][1] == narrow[0][1]
+
+
+def test_parallel_hydration_keeps_order(upstream: Path) -> None:
+    repo_path = Gio.File.new_for_path(str(upstream))
+    repo = Ggit.Repository.open(repo_path)
+    expected = load_update_groups(repo, ReviewRange(depth=3))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        hydrator = CommitHydrator(
+            ThreadRepositories(repo_path),
+            executor,
+            batch_size=1,
+        )
+        groups = load_update_groups(repo, ReviewRange(depth=3), hydrator=hydrator)
+    assert groups == expected
+
+
+def test_read_commits_are_looked_up_lazily(upstream: Path) -> None:
+    repo_path = Gio.File.new_for_path(str(upstream))
+    repo = Ggit.Repository.open(repo_path)
+    read_texts: dict[str, CommitText] = {}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        hydrator = CommitHydrator(ThreadRepositories(repo_path), executor)
+        groups = load_update_groups(
+            repo, ReviewRange(depth=3), hydrator=hydrator, read_texts=read_texts
+        )
+    commit_ids = [
+        commit_id for _subject, commit_ids in groups for commit_id in commit_ids
+    ]
+    assert list(read_texts.keys()) == commit_ids
+
+    updates = lookup_update_commits(repo, groups, read_texts)
+    commits = [commit for commits in updates.values() for commit in commits]
+    assert all(isinstance(commit, LazyCommit) for commit in commits)
+    assert [commit.get_id().to_string() for commit in commits] == commit_ids
+    for commit in commits:
+        resolved = resolve_commit(commit)
+        assert resolved.get_id().to_string() == commit.get_id().to_string()
+        assert resolved.get_message() == commit.get_message()
+        assert resolved.get_subject() == commit.get_subject()
+
+
+def test_load_update_groups_cancelled(upstream: Path) -> None:
+    repo = Ggit.Repository.open(Gio.File.new_for_path(str(upstream)))
+    cancellable = Gio.Cancellable()
+    cancellable.cancel()
+    with pytest.raises(GLib.Error) as error:
+        load_update_groups(repo, ReviewRange(depth=3), cancellable=cancellable)
+    assert error.value.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED)
+
+
+def test_plan_update_splices() -> None:
+    old = [
+        ("foo: 1 → 2", ["a"]),
+        ("bar: 1 → 2", ["b"]),
+        ("baz: 1 → 2", ["c"]),
+        ("qux: 1 → 2", ["d"]),
+    ]
+    new = [
+        ("bar: 1 → 2", ["b"]),
+        ("baz: 1 → 2", ["c", "e"]),
+        ("qux: 1 → 2", ["d"]),
+        ("quux: 1 → 2", ["f"]),
+    ]
+    splices = plan_update_splices(old, new)
+    # Unchanged groups are kept.
+    assert splices == [(4, 4, 3, 4), (2, 3, 1, 2), (0, 1, 0, 0)]
+
+    result = list(old)
+    for old_start, old_end, new_start, new_end in splices:
+        result[old_start:old_end] = new[new_start:new_end]
+    assert result == new
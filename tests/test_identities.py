@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+
+try:
+    from ..src.nonemast.identities import IdentityResolver, parse_identity
+    from ..src.nonemast.review_stats import ReviewStatistics
+    from .test_review_stats import make_update, review
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.identities import IdentityResolver, parse_identity
+    from src.nonemast.review_stats import ReviewStatistics
+    from tests.test_review_stats import make_update, review
+
+ALICE = "Alice <alice@example.com>"
+
+
+class FakeMailmap:
+    """Maps every address of Alice to the canonical one."""
+
+    def __init__(self):
+        self.n_resolved = 0
+
+    def resolve(self, name: str, email: str) -> tuple[str, str]:
+        self.n_resolved += 1
+        if email.startswith("alice"):
+            return "Alice", "alice@example.com"
+        return name, email
+
+
+def test_parse_identity() -> None:
+    assert parse_identity(" Alice  <alice@example.com> ") == (
+        "Alice",
+        "alice@example.com",
+    )
+    assert parse_identity("Alice") is None
+
+
+def test_resolve_is_cached() -> None:
+    mailmap = FakeMailmap()
+    identities = IdentityResolver(mailmap)
+    for _commit in range(1000):
+        assert identities.resolve("alice", "alice@old.example.com") == ALICE
+        assert identities.resolve_identity("A. <alice@work.example.com>") == ALICE
+        assert (
+            identities.resolve_identity("Bob <bob@example.com>")
+            == "Bob <bob@example.com>"
+        )
+    assert mailmap.n_resolved == 3
+
+    assert identities.resolve_identity("Not an identity") == "Not an identity"
+
+
+def test_statistics_merge_identities() -> None:
+    statistics = ReviewStatistics(IdentityResolver(FakeMailmap()))
+    foo = make_update("foo: 1 → 2")
+    bar = make_update("bar: 1 → 2")
+    statistics.track(foo)
+    statistics.track(bar)
+
+    review(foo, "Alice <alice@old.example.com>")
+    review(bar, ALICE)
+    # Reviewing the same update under another address does not count twice.
+    review(bar, "alice <alice@work.example.com>")
+    assert statistics.get_reviewer_counts() == [(ALICE, 2)]
@@ -0,0 +1,131 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+import pytest
+import subprocess
+
+try:
+    from ..src.nonemast.patch_ids import PatchIdIndex, compute_patch_ids
+    from .test_history import git
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.patch_ids import PatchIdIndex, compute_patch_ids
+    from tests.test_history import git
+
+
+def rev_list(path: Path, *args: str) -> list[str]:
+    return git(path, "rev-list", "--reverse", *args).split()
+
+
+@pytest.fixture
+def branch(tmp_path: Path) -> Path:
+    """Repository with updates on top of a base commit and an empty review commit."""
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "--quiet", "--initial-branch=gnome")
+    (path / "README").write_text("nixpkgs\n")
+    git(path, "add", "README")
+    git(path, "commit", "--quiet", "-m", "base")
+    for package in ["foo", "bar", "baz"]:
+        (path / f"{package}.nix").write_text('{ version = "2"; }\n')
+        git(path, "add", f"{package}.nix")
+        git(path, "commit", "--quiet", "-m", f"{package}: 1 → 2")
+    git(path, "commit", "--quiet", "--allow-empty", "-m", "squash! foo: 1 → 2")
+    return path
+
+
+def test_compute_patch_ids(branch: Path) -> None:
+    commit_ids = rev_list(branch, "HEAD~4..HEAD")
+    patch_ids = compute_patch_ids(branch, commit_ids)
+    # The empty commit has no patch-id.
+    assert list(patch_ids.keys()) == commit_ids[:3]
+    assert len(set(patch_ids.values())) == 3
+
+
+def test_match_rewritten(branch: Path, tmp_path: Path) -> None:
+    old_commit_ids = rev_list(branch, "HEAD~4..HEAD")
+
+    # Rewrite the whole branch on top of a different base.
+    git(branch, "checkout", "--quiet", "-b", "rebased", "HEAD~4")
+    git(branch, "commit", "--quiet", "--amend", "-m", "other base")
+    for commit_id in old_commit_ids[:3]:
+        git(branch, "cherry-pick", commit_id)
+    new_commit_ids = rev_list(branch, "HEAD~3..HEAD")
+
+    index = PatchIdIndex(tmp_path / "cache" / "patch-ids")
+    index.update(branch, old_commit_ids + new_commit_ids)
+    assert index.match_rewritten(old_commit_ids, new_commit_ids) == dict(
+        zip(new_commit_ids, old_commit_ids[:3])
+    )
+    assert index.get(old_commit_ids[3]) is None
+    assert index.get_cache_key(old_commit_ids[0]) == index.get_cache_key(
+        new_commit_ids[0]
+    )
+
+
+def test_index_is_persisted(branch: Path, tmp_path: Path) -> None:
+    commit_ids = rev_list(branch, "HEAD~4..HEAD")
+    index_path = tmp_path / "cache" / "patch-ids"
+    PatchIdIndex(index_path).update(branch, commit_ids)
+
+    index = PatchIdIndex(index_path)
+    # Nothing is computed, so a repository is not even needed.
+    index.update(tmp_path / "nonexistent", commit_ids)
+    assert [index.get(commit_id) is not None for commit_id in commit_ids] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+
+
+def test_index_is_compacted(branch: Path, tmp_path: Path) -> None:
+    commit_ids = rev_list(branch, "HEAD~4..HEAD")
+    index_path = tmp_path / "cache" / "patch-ids"
+    index_path.parent.mkdir()
+    index_path.write_text(
+        "".join(f"{commit_id} -\n" for commit_id in ["a", "b", "a"]) + "c"
+    )
+
+    index = PatchIdIndex(index_path, max_entries=4)
+    assert "a" in index
+    # Duplicated and truncated lines are dropped.
+    assert index_path.read_text() == "b -\na -\n"
+
+    index.update(branch, commit_ids)
+    # Only the most recent commits are kept over the limit.
+    assert [commit_id in index for commit_id in ["a", "b", *commit_ids]] == [
+        False,
+        False,
+        False,
+        True,
+        True,
+        True,
+    ]
+    assert PatchIdIndex(index_path).get(commit_ids[1]) == index.get(commit_ids[1])
+    assert len(index_path.read_text().splitlines()) == 3
+
+
+def test_many_commits(tmp_path: Path) -> None:
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "--quiet")
+    n_commits = 2000
+    stream = "".join(
+        f"commit refs/heads/master\n"
+        f"committer Tester <test@example.com> 0 +0000\n"
+        f"data 6\nbump {i % 10}\n"
+        f"M 644 inline pkg{i % 50}.nix\ndata {len(str(i)) + 1}\n{i}\n\n"
+        for i in range(n_commits)
+    )
+    subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        input=stream,
+        encoding="utf-8",
+        cwd=path,
+        check=True,
+    )
+    commit_ids = rev_list(path, "master")
+    assert len(compute_patch_ids(path, commit_ids)) == n_commits
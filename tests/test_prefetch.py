@@ -0,0 +1,155 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+
+from gi.repository import Ggit
+from gi.repository import Gio
+from gi.repository import GLib
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Optional
+
+try:
+    from ..src.nonemast.cache_manager import caches
+    from ..src.nonemast.package_update import PackageUpdate
+    from ..src.nonemast.prefetch import DetailsPrefetcher, get_neighbour_positions
+    from .test_autosquashing import FakeCommit
+    from .test_review_stats import make_update, review
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.cache_manager import caches
+    from src.nonemast.package_update import PackageUpdate
+    from src.nonemast.prefetch import DetailsPrefetcher, get_neighbour_positions
+    from tests.test_autosquashing import FakeCommit
+    from tests.test_review_stats import make_update, review
+
+
+class SynchronousExecutor(Executor):
+    """Runs submitted functions right away, so that tests do not need to wait for workers."""
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+class TreelessCommit(FakeCommit):
+    """Simulated commit whose objects are missing, like in a partial clone."""
+
+    def get_tree(self) -> None:
+        return None
+
+
+class FakeRepository:
+    """Records commits looked up by the prefetcher."""
+
+    def __init__(self):
+        self.looked_up: list[str] = []
+        self.on_lookup: Optional[Callable[[], None]] = None
+
+    def lookup_commit(self, oid: Ggit.OId) -> Ggit.Commit:
+        self.looked_up.append(oid.to_string())
+        if self.on_lookup is not None:
+            self.on_lookup()
+        return TreelessCommit(message="")
+
+
+class FakeRepositories:
+    def __init__(self, repo: FakeRepository):
+        self._repo = repo
+
+    def get(self) -> FakeRepository:
+        return self._repo
+
+
+def run_main_loop() -> None:
+    context = GLib.MainContext.default()
+    while context.iteration(False):
+        pass
+
+
+def make_updates(n_updates: int) -> Gio.ListStore:
+    updates = Gio.ListStore.new(PackageUpdate)
+    for index in range(n_updates):
+        updates.append(
+            make_update(
+                f"pkg{index}: 1 → 2",
+                f"squash! pkg{index}: 1 → 2\n\nhttps://example.com/pkg{index}",
+            )
+        )
+    return updates
+
+
+def get_rendered_count() -> int:
+    return next(
+        statistics.entries
+        for statistics in caches.get_statistics()
+        if statistics.name == "rendered-markup"
+    )
+
+
+def test_get_neighbour_positions() -> None:
+    assert get_neighbour_positions(5, 10, 2) == [6, 4, 7, 3]
+    assert get_neighbour_positions(0, 10, 2) == [1, 2]
+    assert get_neighbour_positions(9, 10, 2) == [8, 7]
+    assert get_neighbour_positions(0, 1, 3) == []
+
+
+def test_rich_message_follows_final_message() -> None:
+    update = make_update("foo: 1 → 2", "squash! foo: 1 → 2\n\nhttps://example.com/foo")
+    notified = []
+    update.connect(
+        "notify::final-commit-message-rich",
+        lambda update, _pspec: notified.append(update.props.final_commit_message_rich),
+    )
+    assert "<a href='https://example.com/foo'>" in (
+        update.props.final_commit_message_rich
+    )
+
+    review(update, "Alice <alice@example.com>")
+    assert len(notified) == 1
+    assert "Changelog-Reviewed-By" in notified[0]
+
+
+def test_retarget_warms_neighbours() -> None:
+    caches.clear()
+    repo = FakeRepository()
+    prefetcher = DetailsPrefetcher(
+        FakeRepositories(repo), SynchronousExecutor(), distance=2
+    )
+    updates = make_updates(10)
+
+    prefetcher.retarget(updates, 0)
+    # Superseded before the main loop was idle.
+    prefetcher.retarget(updates, 5)
+    assert repo.looked_up == []
+    run_main_loop()
+
+    # Positions 6, 4, 7 and 3, with two commits each.
+    assert get_rendered_count() == 4
+    assert len(repo.looked_up) == 8
+
+
+def test_cancel_stops_prefetching() -> None:
+    caches.clear()
+    repo = FakeRepository()
+    prefetcher = DetailsPrefetcher(
+        FakeRepositories(repo), SynchronousExecutor(), distance=2
+    )
+    updates = make_updates(10)
+
+    prefetcher.retarget(updates, 5)
+    prefetcher.cancel()
+    run_main_loop()
+    assert repo.looked_up == []
+    assert get_rendered_count() == 0
+
+    # Cancelled while the job is running, e.g. because the selection moved.
+    repo.on_lookup = prefetcher.cancel
+    prefetcher.retarget(updates, 5)
+    run_main_loop()
+    assert len(repo.looked_up) == 1
+    assert get_rendered_count() == 1
@@ -0,0 +1,140 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+
+from gi.repository import Ggit
+from gi.repository import Gio
+from gi.repository import GLib
+from pathlib import Path
+import pytest
+
+try:
+    from ..src.nonemast.history import (
+        MergeBaseCache,
+        NIXPKGS_REMOTE_URL,
+        ReviewRange,
+        find_review_bases,
+        group_commits_by_update,
+    )
+    from ..src.nonemast.remote_fetch import RemoteFetcher
+    from .test_history import git
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.history import (
+        MergeBaseCache,
+        NIXPKGS_REMOTE_URL,
+        ReviewRange,
+        find_review_bases,
+        group_commits_by_update,
+    )
+    from src.nonemast.remote_fetch import RemoteFetcher
+    from tests.test_history import git
+
+Ggit.init()
+
+
+@pytest.fixture
+def remote(tmp_path: Path) -> Path:
+    """Bare repository standing in for upstream Nixpkgs."""
+    source = tmp_path / "source"
+    source.mkdir()
+    git(source, "init", "--quiet", "--initial-branch=master")
+    git(source, "commit", "--quiet", "--allow-empty", "-m", "initial commit")
+    git(source, "branch", "staging")
+
+    path = tmp_path / "nixpkgs.git"
+    git(tmp_path, "clone", "--quiet", "--bare", source.as_uri(), str(path))
+    return path
+
+
+@pytest.fixture
+def checkout(remote: Path, tmp_path: Path) -> Path:
+    """Clone with two updates on top of upstream staging."""
+    path = tmp_path / "checkout"
+    git(tmp_path, "clone", "--quiet", "--branch=staging", remote.as_uri(), str(path))
+    # Make the remote look like upstream while still fetching from the local bare repository.
+    git(path, "remote", "set-url", "origin", NIXPKGS_REMOTE_URL)
+    git(path, "config", f"url.{remote.as_uri()}.insteadOf", NIXPKGS_REMOTE_URL)
+    git(path, "fetch", "--quiet", "origin")
+    for package in ["foo", "bar"]:
+        git(path, "commit", "--quiet", "--allow-empty", "-m", f"{package}: 1 → 2")
+    return path
+
+
+def merge_first_update(checkout: Path) -> None:
+    """Make upstream staging contain the first update, without fetching it."""
+    git(checkout, "push", "--quiet", "origin", "HEAD~1:refs/heads/staging")
+    git(checkout, "update-ref", "refs/remotes/origin/staging", "HEAD~2")
+
+
+def run_fetch(fetcher: RemoteFetcher, remote_names: list[str]) -> tuple[bool, str]:
+    loop = GLib.MainLoop()
+    results: list[tuple[bool, str]] = []
+
+    def on_finished(_fetcher: RemoteFetcher, success: bool, message: str) -> None:
+        results.append((success, message))
+        loop.quit()
+
+    fetcher.connect("finished", on_finished)
+    fetcher.fetch(remote_names)
+    if len(results) == 0:
+        loop.run()
+
+    assert not fetcher.props.fetching
+    return results[0]
+
+
+def test_fetch_updates_remote_branches(checkout: Path) -> None:
+    merge_first_update(checkout)
+
+    fetcher = RemoteFetcher(Gio.File.new_for_path(str(checkout)))
+    assert run_fetch(fetcher, ["origin"]) == (True, "")
+    assert git(checkout, "rev-parse", "origin/staging") == git(
+        checkout, "rev-parse", "HEAD~1"
+    )
+
+
+def test_fetch_failure(checkout: Path) -> None:
+    fetcher = RemoteFetcher(Gio.File.new_for_path(str(checkout)))
+    success, message = run_fetch(fetcher, ["nonexistent"])
+    assert not success
+    assert "nonexistent" in message
+
+
+def test_merge_bases_refresh_after_fetch(remote: Path, checkout: Path) -> None:
+    repo = Ggit.Repository.open(Gio.File.new_for_path(str(checkout)))
+    merge_bases = MergeBaseCache()
+
+    def load() -> list[str]:
+        head = repo.get_head().get_target()
+        bases = find_review_bases(repo, head, ReviewRange(), merge_bases)
+        return list(group_commits_by_update(repo, head, bases).keys())
+
+    assert load() == ["foo: 1 → 2", "bar: 1 → 2"]
+
+    merge_first_update(checkout)
+    fetcher = RemoteFetcher(Gio.File.new_for_path(str(checkout)))
+    assert run_fetch(fetcher, ["origin"]) == (True, "")
+
+    assert load() == ["bar: 1 → 2"]
+
+
+def test_fetch_cancelled(checkout: Path) -> None:
+    fetcher = RemoteFetcher(Gio.File.new_for_path(str(checkout)))
+    loop = GLib.MainLoop()
+    results: list[tuple[bool, str]] = []
+
+    def on_finished(_fetcher: RemoteFetcher, success: bool, message: str) -> None:
+        results.append((success, message))
+        loop.quit()
+
+    fetcher.connect("finished", on_finished)
+    fetcher.fetch(["origin"])
+    fetcher.cancel()
+    loop.run()
+
+    assert results == [(False, "Fetch was cancelled.")]
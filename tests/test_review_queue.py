@@ -0,0 +1,147 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+
+from typing import Optional
+import random
+
+try:
+    from ..src.nonemast.package_update import PackageUpdate
+    from ..src.nonemast.review_queue import PositionCounts, PositionSet, ReviewQueue
+    from .test_autosquashing import FakeCommit
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.package_update import PackageUpdate
+    from src.nonemast.review_queue import PositionCounts, PositionSet, ReviewQueue
+    from tests.test_autosquashing import FakeCommit
+
+
+def naive_next_after(members: set[int], position: int) -> Optional[int]:
+    return min((member for member in members if member > position), default=None)
+
+
+def naive_previous_before(members: set[int], position: int) -> Optional[int]:
+    return max((member for member in members if member < position), default=None)
+
+
+def test_position_set_matches_naive_implementation() -> None:
+    rng = random.Random(42)
+    positions = PositionSet()
+    members: set[int] = set()
+    # Spans three levels of the bitmap.
+    capacity = 64 * 64 + 100
+
+    for _ in range(5000):
+        position = rng.randrange(capacity)
+        if rng.random() < 0.6:
+            positions.add(position)
+            members.add(position)
+        else:
+            positions.discard(position)
+            members.discard(position)
+
+        query = rng.randrange(-1, capacity + 1)
+        assert positions.next_after(query) == naive_next_after(members, query)
+        assert positions.previous_before(query) == naive_previous_before(members, query)
+        assert len(positions) == len(members)
+
+
+def test_position_set_empty() -> None:
+    positions = PositionSet()
+    assert positions.next_after(-1) is None
+    assert positions.previous_before(1000) is None
+
+    positions.add(5000)
+    positions.discard(5000)
+    assert positions.next_after(-1) is None
+    assert positions.previous_before(10000) is None
+
+
+def test_position_counts_match_naive_implementation() -> None:
+    rng = random.Random(42)
+    counts = PositionCounts()
+    marked: list[bool] = []
+
+    for _ in range(2000):
+        if rng.random() < 0.3:
+            marked.append(rng.random() < 0.5)
+            counts.append(marked[-1])
+        elif len(marked) > 0:
+            position = rng.randrange(len(marked))
+            marked[position] = rng.random() < 0.5
+            counts.set(position, marked[position])
+
+        query = rng.randrange(len(marked) + 1)
+        assert counts.count_before(query) == sum(marked[:query])
+        assert len(counts) == len(marked)
+
+
+def test_review_queue_follows_reviews() -> None:
+    updates = [
+        PackageUpdate(
+            subject=f"pkg{i}: 1 → 2",
+            commits=[FakeCommit(message=f"pkg{i}: 1 → 2")],
+            repo=None,
+        )
+        for i in range(5)
+    ]
+    queue = ReviewQueue()
+    for position, update in enumerate(updates):
+        queue.track(update, position)
+
+    assert queue.next_unreviewed(None) == 0
+    assert queue.next_unreviewed(2) == 3
+
+    updates[3].add_commit(
+        FakeCommit(
+            message="squash! pkg3: 1 → 2\n\nChangelog-Reviewed-By: Tester <test@example.com>"
+        )
+    )
+    assert len(queue) == 4
+    assert queue.next_unreviewed(2) == 4
+    assert queue.previous_unreviewed(4) == 2
+    assert queue.previous_unreviewed(None) == 4
+    assert queue.next_unreviewed(4) is None
+
+    queue.clear()
+    assert queue.next_unreviewed(None) is None
+
+
+def test_review_queue_skips_hidden_updates() -> None:
+    updates = [
+        PackageUpdate(
+            subject=f"pkg{i}: 1 → 2",
+            commits=[FakeCommit(message=f"pkg{i}: 1 → 2")],
+            repo=None,
+        )
+        for i in range(5)
+    ]
+    queue = ReviewQueue()
+    # Filtered before the updates are indexed.
+    queue.set_visible(updates[1], False)
+    for position, update in enumerate(updates):
+        queue.track(update, position)
+    queue.set_visible(updates[3], False)
+
+    assert queue.next_unreviewed(0) == 2
+    assert queue.next_unreviewed(2) == 4
+    assert queue.previous_unreviewed(4) == 2
+    assert [queue.get_filtered_position(position) for position in range(5)] == [
+        0,
+        None,
+        1,
+        None,
+        2,
+    ]
+
+    # Visibility survives indexing the updates again.
+    queue.clear()
+    for position, update in enumerate(updates):
+        queue.track(update, position)
+    queue.set_visible(updates[1], True)
+    assert queue.next_unreviewed(0) == 1
+    assert queue.get_filtered_position(4) == 3
@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+
+try:
+    from ..src.nonemast.package_update import PackageUpdate
+    from ..src.nonemast.review_stats import ReviewStatistics
+    from .test_autosquashing import FakeCommit
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.package_update import PackageUpdate
+    from src.nonemast.review_stats import ReviewStatistics
+    from tests.test_autosquashing import FakeCommit
+
+ALICE = "Alice <alice@example.com>"
+BOB = "Bob <bob@example.com>"
+
+
+def make_update(subject: str, *messages: str) -> PackageUpdate:
+    return PackageUpdate(
+        subject=subject,
+        commits=[FakeCommit(message=message) for message in [subject, *messages]],
+        repo=None,
+    )
+
+
+def review(update: PackageUpdate, reviewer: str) -> None:
+    update.add_commit(
+        FakeCommit(
+            message=f"squash! {update.props.subject}\n\nChangelog-Reviewed-By: {reviewer}"
+        )
+    )
+
+
+def test_initial_counts() -> None:
+    statistics = ReviewStatistics()
+    statistics.track(make_update("foo: 1 → 2"))
+    statistics.track(
+        make_update(
+            "bar: 1 → 2", "squash! bar: 1 → 2\n\nChangelog-Reviewed-By: " + ALICE
+        )
+    )
+
+    assert statistics.props.n_updates == 2
+    assert statistics.props.n_reviewed == 1
+    assert statistics.props.n_unreviewed == 1
+    assert statistics.get_reviewer_counts() == [(ALICE, 1)]
+
+
+def test_review_updates_counts() -> None:
+    statistics = ReviewStatistics()
+    foo = make_update("foo: 1 → 2")
+    bar = make_update("bar: 1 → 2")
+    statistics.track(foo)
+    statistics.track(bar)
+
+    notified = []
+    statistics.connect("notify::n-reviewed", lambda *args: notified.append(args))
+
+    review(foo, ALICE)
+    assert statistics.props.n_reviewed == 1
+    assert len(notified) == 1
+
+    # Second review of the same update does not change progress.
+    review(foo, BOB)
+    assert statistics.props.n_reviewed == 1
+    assert len(notified) == 1
+
+    review(bar, ALICE)
+    assert statistics.props.n_reviewed == 2
+    assert statistics.props.summary == "2 of 2 reviewed"
+    assert statistics.get_reviewer_counts() == [(ALICE, 2), (BOB, 1)]
+
+
+def test_untrack() -> None:
+    statistics = ReviewStatistics()
+    foo = make_update("foo: 1 → 2")
+    statistics.track(foo)
+    review(foo, ALICE)
+    statistics.untrack(foo)
+
+    assert statistics.props.n_updates == 0
+    assert statistics.props.n_reviewed == 0
+    assert statistics.get_reviewer_counts() == []
+
+    # Changes to untracked updates are ignored.
+    review(foo, BOB)
+    assert statistics.get_reviewer_counts() == []
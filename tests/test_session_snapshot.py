@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+import pytest
+
+try:
+    from ..src.nonemast.patch_ids import PatchIdIndex
+    from ..src.nonemast.session_snapshot import (
+        SESSION_CHANGE_CHANGED,
+        SESSION_CHANGE_NEW,
+        SessionSnapshotStore,
+        compare_with_snapshot,
+        create_snapshot,
+    )
+    from .test_history import git
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.patch_ids import PatchIdIndex
+    from src.nonemast.session_snapshot import (
+        SESSION_CHANGE_CHANGED,
+        SESSION_CHANGE_NEW,
+        SessionSnapshotStore,
+        compare_with_snapshot,
+        create_snapshot,
+    )
+    from tests.test_history import git
+
+
+def commit_package(path: Path, package: str, version: str, subject: str) -> str:
+    (path / f"{package}.nix").write_text(f'{{ version = "{version}"; }}\n')
+    git(path, "add", f"{package}.nix")
+    git(path, "commit", "--quiet", "-m", subject)
+    return git(path, "rev-parse", "HEAD").strip()
+
+
+def commit_review(path: Path, subject: str) -> str:
+    git(path, "commit", "--quiet", "--allow-empty", "-m", f"squash! {subject}")
+    return git(path, "rev-parse", "HEAD").strip()
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "--quiet", "--initial-branch=gnome")
+    (path / "README").write_text("nixpkgs\n")
+    git(path, "add", "README")
+    git(path, "commit", "--quiet", "-m", "base")
+    git(path, "tag", "base")
+    return path
+
+
+def test_compare_with_snapshot(repo: Path, tmp_path: Path) -> None:
+    old_groups = [
+        ("foo: 1 → 2", [commit_package(repo, "foo", "2", "foo: 1 → 2")]),
+        ("bar: 1 → 2", [commit_package(repo, "bar", "2", "bar: 1 → 2")]),
+        ("baz: 1 → 2", [commit_package(repo, "baz", "2", "baz: 1 → 2")]),
+        ("qux: 1 → 2", [commit_package(repo, "qux", "2", "qux: 1 → 2")]),
+        ("quux: 1 → 2", [commit_package(repo, "quux", "2", "quux: 1 → 2")]),
+    ]
+    patch_ids = PatchIdIndex(tmp_path / "cache" / "patch-ids")
+    patch_ids.update(repo, (ids[0] for _subject, ids in old_groups))
+    snapshot = create_snapshot(old_groups, patch_ids)
+
+    # Rewrite the branch on top of a different base.
+    git(repo, "checkout", "--quiet", "-b", "rebased", "base")
+    git(repo, "commit", "--quiet", "--amend", "-m", "other base")
+    new_groups = [
+        # Same changes with a review on top.
+        (
+            "foo: 1 → 2",
+            [
+                commit_package(repo, "foo", "2", "foo: 1 → 2"),
+                commit_review(repo, "foo: 1 → 2"),
+            ],
+        ),
+        # Different changes.
+        ("bar: 1 → 2", [commit_package(repo, "bar", "3", "bar: 1 → 2")]),
+        # Same changes with a corrected subject.
+        ("baz: 1 → 2.0", [commit_package(repo, "baz", "2", "baz: 1 → 2.0")]),
+        ("new: 1 → 2", [commit_package(repo, "new", "2", "new: 1 → 2")]),
+        # Kept as is, qux was dropped.
+        old_groups[4],
+    ]
+    patch_ids.update(
+        repo,
+        (commit_id for _subject, commit_ids in new_groups for commit_id in commit_ids),
+    )
+
+    range_diff = compare_with_snapshot(snapshot, new_groups, patch_ids)
+    assert range_diff.changes == {
+        "bar: 1 → 2": SESSION_CHANGE_CHANGED,
+        "baz: 1 → 2.0": SESSION_CHANGE_CHANGED,
+        "new: 1 → 2": SESSION_CHANGE_NEW,
+    }
+    assert range_diff.removed == ["qux: 1 → 2"]
+
+
+def test_unindexed_commits_only_match_themselves(repo: Path, tmp_path: Path) -> None:
+    groups = [("foo: 1 → 2", [commit_package(repo, "foo", "2", "foo: 1 → 2")])]
+    patch_ids = PatchIdIndex(tmp_path / "cache" / "patch-ids")
+    snapshot = create_snapshot(groups, patch_ids)
+    assert snapshot.updates[0].content_ids == groups[0][1]
+    assert compare_with_snapshot(snapshot, groups, patch_ids).changes == {}
+
+    # Indexing the commit later does not make it look changed.
+    patch_ids.update(repo, groups[0][1])
+    assert compare_with_snapshot(snapshot, groups, patch_ids).changes == {}
+
+
+def test_store_round_trip(repo: Path, tmp_path: Path) -> None:
+    groups = [("foo: 1 → 2", [commit_package(repo, "foo", "2", "foo: 1 → 2")])]
+    patch_ids = PatchIdIndex(tmp_path / "cache" / "patch-ids")
+    patch_ids.update(repo, groups[0][1])
+    snapshot = create_snapshot(groups, patch_ids)
+
+    store = SessionSnapshotStore(tmp_path / "sessions")
+    assert store.load(repo, "refs/heads/gnome") is None
+    store.save(repo, "refs/heads/gnome", snapshot)
+    assert store.load(repo, "refs/heads/gnome") == snapshot
+    # Each branch has its own session.
+    assert store.load(repo, "refs/heads/staging") is None
@@ -0,0 +1,160 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+
+from gi.repository import Ggit
+from gi.repository import Gio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator
+import pytest
+
+try:
+    from ..src.nonemast.git_utils import ThreadRepositories
+    from ..src.nonemast.operations.split_branch import (
+        BranchSplitter,
+        SplitConflict,
+        SplitGroup,
+        create_branch,
+    )
+    from .test_history import git
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.git_utils import ThreadRepositories
+    from src.nonemast.operations.split_branch import (
+        BranchSplitter,
+        SplitConflict,
+        SplitGroup,
+        create_branch,
+    )
+    from tests.test_history import git
+
+
+def commit_file(path: Path, name: str, contents: str, subject: str) -> str:
+    (path / name).write_text(contents)
+    git(path, "add", name)
+    git(path, "commit", "--quiet", "-m", subject)
+    return git(path, "rev-parse", "HEAD").strip()
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "--quiet", "--initial-branch=gnome")
+    (path / "README").write_text("nixpkgs\n")
+    git(path, "add", "README")
+    git(path, "commit", "--quiet", "-m", "base")
+    return path
+
+
+@pytest.fixture
+def splitter(repo: Path) -> Iterator[BranchSplitter]:
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield BranchSplitter(
+            ThreadRepositories(Gio.File.new_for_path(str(repo))), executor
+        )
+
+
+def split(
+    repo: Path,
+    splitter: BranchSplitter,
+    groups: list[SplitGroup],
+) -> list[SplitConflict]:
+    ggit_repo = Ggit.Repository.open(Gio.File.new_for_path(str(repo)))
+    base_id = git(repo, "rev-list", "--max-parents=0", "HEAD").strip()
+    result = splitter.split(ggit_repo, groups, base_id)
+    create_branch(ggit_repo, "split", result.head_id)
+    return result.conflicts
+
+
+def test_split_branch(repo: Path, splitter: BranchSplitter) -> None:
+    foo = commit_file(repo, "foo.nix", "foo 2\n", "foo: 1 → 2")
+    bar = commit_file(repo, "bar.nix", "bar 2\n", "bar: 1 → 2")
+    foo_fixup = commit_file(repo, "foo.nix", "foo 2\nfixed\n", "fixup! foo: 1 → 2")
+    baz = commit_file(repo, "baz.nix", "baz 2\n", "baz: 1 → 2")
+    status = git(repo, "status", "--porcelain")
+
+    conflicts = split(
+        repo,
+        splitter,
+        [
+            SplitGroup("foo: 1 → 2", [foo, foo_fixup], "foo: 1 → 2\n\nReviewed."),
+            SplitGroup("baz: 1 → 2", [baz], "baz: 1 → 2"),
+        ],
+    )
+    assert conflicts == []
+
+    assert git(repo, "log", "--format=%B", "split").split("\n\n") == [
+        "baz: 1 → 2",
+        "foo: 1 → 2",
+        "Reviewed.",
+        "base",
+        "",
+    ]
+    assert git(repo, "ls-tree", "--name-only", "split").split() == [
+        "README",
+        "baz.nix",
+        "foo.nix",
+    ]
+    assert git(repo, "show", "split:foo.nix") == "foo 2\nfixed\n"
+    # Neither HEAD nor the working tree were touched.
+    assert git(repo, "rev-parse", "HEAD").strip() == baz
+    assert git(repo, "status", "--porcelain") == status
+
+
+def test_dependent_updates_are_replayed(repo: Path, splitter: BranchSplitter) -> None:
+    foo = commit_file(repo, "foo.nix", "foo 2\n", "foo: init at 2")
+    foo_update = commit_file(repo, "foo.nix", "foo 3\n", "foo: 2 → 3")
+
+    # The update only applies on top of the package introduction.
+    conflicts = split(
+        repo,
+        splitter,
+        [
+            SplitGroup("foo: init at 2", [foo], "foo: init at 2"),
+            SplitGroup("foo: 2 → 3", [foo_update], "foo: 2 → 3"),
+        ],
+    )
+    assert conflicts == []
+    assert git(repo, "show", "split:foo.nix") == "foo 3\n"
+
+
+def test_conflicts_are_reported(repo: Path, splitter: BranchSplitter) -> None:
+    commit_file(repo, "foo.nix", "foo 2\n", "foo: init at 2")
+    foo_update = commit_file(repo, "foo.nix", "foo 3\n", "foo: 2 → 3")
+    bar = commit_file(repo, "bar.nix", "bar 2\n", "bar: 1 → 2")
+
+    conflicts = split(
+        repo,
+        splitter,
+        [
+            SplitGroup("foo: 2 → 3", [foo_update], "foo: 2 → 3"),
+            SplitGroup("bar: 1 → 2", [bar], "bar: 1 → 2"),
+        ],
+    )
+    assert conflicts == [SplitConflict("foo: 2 → 3", ["foo.nix"])]
+    assert git(repo, "log", "--format=%s", "split").splitlines() == [
+        "bar: 1 → 2",
+        "base",
+    ]
+
+
+def test_select_by_paths(repo: Path, splitter: BranchSplitter) -> None:
+    core = SplitGroup(
+        "gnome-shell: 46 → 47",
+        [commit_file(repo, "gnome-shell.nix", "47\n", "gnome-shell: 46 → 47")],
+        "",
+    )
+    (repo / "apps").mkdir()
+    app = SplitGroup(
+        "gnome-maps: 46 → 47",
+        [commit_file(repo, "apps/gnome-maps.nix", "47\n", "gnome-maps: 46 → 47")],
+        "",
+    )
+    assert splitter.select_by_paths([core, app], ["apps/*"]) == [app]
+    assert splitter.select_by_paths([core, app], ["*.nix"]) == [core, app]
@@ -0,0 +1,158 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+from pathlib import Path
+import os
+import random
+import subprocess
+
+try:
+    from ..src.nonemast.subject_index import PrefixTree, SubjectIndex, get_fixup_target
+    from .test_history import git
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.subject_index import PrefixTree, SubjectIndex, get_fixup_target
+    from tests.test_history import git
+
+
+def make_commit_id(number: int) -> str:
+    return f"{number:040x}"
+
+
+def test_get_fixup_target() -> None:
+    assert get_fixup_target("foo: 1 → 2") is None
+    assert get_fixup_target("fixup! foo: 1 → 2") == "foo: 1 → 2"
+    assert get_fixup_target("squash! fixup!  amend! foo") == "foo"
+    assert get_fixup_target("fixup!foo") is None
+
+
+def test_prefix_tree_matches_naive_implementation() -> None:
+    rng = random.Random(42)
+    tree: PrefixTree[int] = PrefixTree()
+    keys: list[str] = []
+    assert tree.find_first("") is None
+
+    for _ in range(500):
+        key = "".join(rng.choice("ab: ") for _ in range(rng.randrange(1, 8)))
+        if key not in keys:
+            tree.add(key, len(keys))
+            keys.append(key)
+
+        prefix = "".join(rng.choice("ab: ") for _ in range(rng.randrange(0, 6)))
+        assert tree.find_first(prefix) == next(
+            (
+                position
+                for position, candidate in enumerate(keys)
+                if candidate.startswith(prefix)
+            ),
+            None,
+        )
+
+
+def test_resolve() -> None:
+    index = SubjectIndex()
+    assert index.add_commit(make_commit_id(0xABCDE1), "foo: 1 → 2") == "foo: 1 → 2"
+    assert index.add_commit(make_commit_id(0xABCDE2), "foo: 2 → 3") == "foo: 2 → 3"
+    assert index.add_commit(make_commit_id(0xBCDEF), "bar: 1 → 2") == "bar: 1 → 2"
+
+    # Exact subject.
+    assert index.resolve("foo: 2 → 3") == "foo: 2 → 3"
+    # The first commit starting with the prefix wins.
+    assert index.resolve("foo:") == "foo: 1 → 2"
+    # Unique abbreviation of commit ID.
+    assert index.resolve(make_commit_id(0xBCDEF)[:-2]) == "bar: 1 → 2"
+    assert index.resolve(make_commit_id(0xABCDE2)) == "foo: 2 → 3"
+    assert index.resolve(make_commit_id(0xABCDE2).upper()) == "foo: 2 → 3"
+    # Ambiguous abbreviation.
+    assert index.resolve(make_commit_id(0xABCDE2)[:-1]) is None
+    assert index.resolve("baz") is None
+
+
+def test_orphan_fixups_are_grouped_by_target() -> None:
+    index = SubjectIndex()
+    assert index.add_commit(make_commit_id(1), "fixup! gone: 1 → 2") == "gone: 1 → 2"
+    assert index.add_commit(make_commit_id(2), "squash! gone: 1 → 2") == "gone: 1 → 2"
+    # Fixups only target earlier commits.
+    assert index.add_commit(make_commit_id(3), "fixup! foo") == "foo"
+    assert index.add_commit(make_commit_id(4), "foo: 1 → 2") == "foo: 1 → 2"
+
+
+def test_many_subjects() -> None:
+    index = SubjectIndex()
+    n_updates = 5000
+    for number in range(n_updates):
+        index.add_commit(make_commit_id(number), f"pkg{number}: 1 → 2")
+    for number in range(n_updates):
+        assert (
+            index.add_commit(
+                make_commit_id(n_updates + number), f"squash! pkg{number}: 1 → 2"
+            )
+            == f"pkg{number}: 1 → 2"
+        )
+
+
+def get_autosquash_groups(path: Path, base: str) -> list[list[str]]:
+    """Return commit IDs grouped by the todo list git rebase --autosquash would use."""
+    todo_path = path.parent / "todo"
+    # Save the todo list and empty it, so that the rebase does nothing.
+    editor = f'cp "$1" \'{todo_path}\' && : > "$1"'
+    subprocess.run(
+        ["git", "rebase", "--interactive", "--autosquash", base],
+        cwd=path,
+        env={**os.environ, "GIT_SEQUENCE_EDITOR": editor},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    groups: list[list[str]] = []
+    for line in todo_path.read_text().splitlines():
+        match line.split():
+            case ["pick", commit_id, *_subject]:
+                groups.append([commit_id])
+            case ["fixup" | "squash", "-C" | "-c", commit_id, *_subject] | [
+                "fixup" | "squash",
+                commit_id,
+                *_subject,
+            ]:
+                groups[-1].append(commit_id)
+    return [
+        [git(path, "rev-parse", commit_id).strip() for commit_id in group]
+        for group in groups
+    ]
+
+
+def test_matches_git_autosquash(tmp_path: Path) -> None:
+    path = tmp_path / "repo"
+    path.mkdir()
+    git(path, "init", "--quiet", "--initial-branch=gnome")
+    git(path, "commit", "--quiet", "--allow-empty", "-m", "base")
+
+    def commit(subject: str) -> str:
+        git(path, "commit", "--quiet", "--allow-empty", "-m", subject)
+        return git(path, "rev-parse", "HEAD").strip()
+
+    foo = commit("foo: 1 → 2")
+    commit("foobar: 1 → 2")
+    commit("bar: 1 → 2")
+    commit("fixup! foo: 1 → 2")
+    commit(f"squash! {foo[:7]}")
+    commit("fixup! foob")
+    commit("amend! bar")
+    commit("fixup! fixup! bar: 1 → 2")
+    commit("squash! baz: 1 → 2")
+    commit("baz: 1 → 2")
+
+    commit_ids = git(path, "rev-list", "--reverse", "HEAD~10..HEAD").split()
+    index = SubjectIndex()
+    groups: dict[str, list[str]] = {}
+    for commit_id in commit_ids:
+        subject = git(path, "log", "-1", "--format=%s", commit_id).strip()
+        groups.setdefault(index.add_commit(commit_id, subject), []).append(commit_id)
+
+    expected_groups = get_autosquash_groups(path, "HEAD~10")
+    # Unlike git, nonemast groups the orphaned fixup with the later commit.
+    expected_groups = [group for group in expected_groups if len(group) > 1] + [
+        commit_ids[8:10]
+    ]
+    assert sorted(groups.values()) == sorted(expected_groups)
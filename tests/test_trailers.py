@@ -0,0 +1,103 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+
+import pytest
+import subprocess
+
+try:
+    from ..src.nonemast.package_update import PackageUpdate
+    from ..src.nonemast.trailers import parse_message
+    from .test_autosquashing import FakeCommit
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.package_update import PackageUpdate
+    from src.nonemast.trailers import parse_message
+    from tests.test_autosquashing import FakeCommit
+
+
+MESSAGES = [
+    "foo: 1 → 2",
+    "Key: looks like trailer but is the title",
+    "foo: 1 → 2\nCo-authored-by: Not <a@trailer>",
+    "foo: 1 → 2\n\nhttps://gitlab.gnome.org/GNOME/foo/-/compare/1...2\n\nChangelog-Reviewed-By: Tester <test@example.com>\n",
+    "foo: 1 → 2\n\nBody.\n\nSigned-off-by: A <a@example.com>\nCo-authored-by:  B <b@example.com>\n  continued\n",
+    "foo: 1 → 2\n\nsome text\nReviewed-by: X\n",
+    "foo: 1 → 2\n\nsome text\nmore\nmore2\nSigned-off-by: X\n",
+    "foo: 1 → 2\n\nsome text\nmore\nmore2\nmore3\nSigned-off-by: X\n",
+    "foo: 1 → 2\n\nKey : v\n# comment\nOther:v2\n\n\n",
+    "foo: 1 → 2\n\nKey: v\n---\nFoo: bar\n",
+    "foo: 1 → 2\n\nco-authored-by: lower <case@example.com>\nCO-AUTHORED-BY: upper <case@example.com>",
+    "foo: 1 → 2\n\nNot a trailer: because of spaces\nKey: v",
+    "foo: 1 → 2\n\nKey: v\n\nText after trailers.",
+    "foo: 1 → 2\n\nChangelog-Reviewed-By: A\n\nChangelog-Reviewed-By: B",
+    "squash! foo: 1 → 2\n\nChangelog-Reviewed-By: Tester <test@example.com>",
+    "foo: 1 → 2\n\n(cherry picked from commit 0123456789abcdef)\nSome text\nKey: v",
+    "title\n\n  cont\nnot: a trailer here",
+    "title\n\nKey: v\n# comment\n  cont\nOther: w",
+    "title\n\nKey: v\n# comment\n\tcont2",
+    "title\n\nSigned-off-by: v\nKey: w\n# comment\n\tcont2\nOther: x",
+    "title\n\nKey: v\n---",
+    "title\n\nKey: v\n---\r\nFoo: bar",
+]
+
+
+def parse_with_git(message: str) -> list[str]:
+    return subprocess.check_output(
+        ["git", "interpret-trailers", "--parse"],
+        input=message,
+        encoding="utf-8",
+    ).splitlines()
+
+
+@pytest.mark.parametrize("message", MESSAGES)
+def test_matches_git_interpret_trailers(message: str) -> None:
+    trailers = parse_message(message).trailers
+    assert [f"{key}: {value}" for key, value in trailers] == parse_with_git(message)
+
+
+def test_lookup_is_case_insensitive() -> None:
+    trailers = parse_message(MESSAGES[10]).trailers
+    assert trailers.get_all("Co-authored-by") == (
+        "lower <case@example.com>",
+        "upper <case@example.com>",
+    )
+
+
+def test_changelog_link() -> None:
+    assert (
+        parse_message(MESSAGES[3]).changelog_link
+        == "https://gitlab.gnome.org/GNOME/foo/-/compare/1...2"
+    )
+    assert parse_message(MESSAGES[0]).changelog_link is None
+
+
+def test_package_update_trailers() -> None:
+    update = PackageUpdate(
+        subject="foo: 1 → 2",
+        commits=[
+            FakeCommit(
+                message="foo: 1 → 2\n\nCo-authored-by: Alice <alice@example.com>"
+            ),
+            FakeCommit(message="fixup! foo: 1 → 2\n\nChangelog-Reviewed-By: Ignored"),
+            FakeCommit(
+                message="squash! foo: 1 → 2\n\nChangelog-Reviewed-By: Bob <bob@example.com>\nCo-authored-by: Carol <carol@example.com>"
+            ),
+        ],
+        repo=None,
+    )
+    assert update.props.reviewers == ["Bob <bob@example.com>"]
+    assert update.props.coauthors == [
+        "Alice <alice@example.com>",
+        "Carol <carol@example.com>",
+    ]
+
+    # Amending replaces the message, including its trailers.
+    update.add_commit(FakeCommit(message="amend! foo: 1 → 2\n\nfoo: 1 → 2\n\nBody."))
+    assert update.props.reviewers == []
+    assert update.props.coauthors == []
+    assert not update.props.changes_reviewed
@@ -0,0 +1,87 @@
+# SPDX-FileCopyrightText: 2026 Jan Tojnar
+# SPDX-License-Identifier: MIT
+
+import gi
+
+gi.require_version("Ggit", "1.0")
+
+from gi.repository import Ggit
+from gi.repository import Gio
+from pathlib import Path
+
+try:
+    from ..src.nonemast.version_bumps import (
+        VersionBump,
+        describe_version_bump_mismatch,
+        extract_version_bump,
+        find_version_change,
+        parse_subject_version_bump,
+    )
+    from .test_history import git
+except:
+    # For some reason, the above fails with the following inside nix-build:
+    #     ImportError: attempted relative import beyond top-level package
+    from src.nonemast.version_bumps import (
+        VersionBump,
+        describe_version_bump_mismatch,
+        extract_version_bump,
+        find_version_change,
+        parse_subject_version_bump,
+    )
+    from tests.test_history import git
+
+Ggit.init()
+
+GLIB_OLD = """{ stdenv, fetchurl }:
+
+stdenv.mkDerivation rec {
+  pname = "glib";
+  version = "2.78.4";
+
+  src = fetchurl {
+    url = "mirror://gnome/sources/glib/${lib.versions.majorMinor version}/glib-${version}.tar.xz";
+    hash = "sha256-AAAA";
+  };
+}
+"""
+
+GLIB_NEW = GLIB_OLD.replace("2.78.4", "2.80.0").replace("AAAA", "BBBB")
+
+
+def test_parse_subject() -> None:
+    assert parse_subject_version_bump("glib: 2.78.4 → 2.80.0") == VersionBump(
+        old="2.78.4", new="2.80.0"
+    )
+    assert parse_subject_version_bump("glib: 2.78.4 -> 2.80.0") == VersionBump(
+        old="2.78.4", new="2.80.0"
+    )
+    assert parse_subject_version_bump("glib: fix build") is None
+
+
+def test_find_version_change() -> None:
+    assert find_version_change(GLIB_OLD, GLIB_NEW) == VersionBump(
+        old="2.78.4", new="2.80.0"
+    )
+    assert find_version_change(GLIB_OLD, GLIB_OLD) is None
+
+
+def test_mismatch() -> None:
+    change = VersionBump(old="2.78.4", new="2.80.0")
+    assert describe_version_bump_mismatch("glib: 2.78.4 → 2.80.0", change) is None
+    assert describe_version_bump_mismatch("glib: 2.78.4 → 2.80.1", change) is not None
+    # Nothing to compare.
+    assert describe_version_bump_mismatch("glib: fix build", change) is None
+    assert describe_version_bump_mismatch("glib: 2.78.4 → 2.80.1", None) is None
+
+
+def test_extract_from_commit(tmp_path: Path) -> None:
+    git(tmp_path, "init", "--quiet")
+    (tmp_path / "default.nix").write_text(GLIB_OLD)
+    git(tmp_path, "add", "default.nix")
+    git(tmp_path, "commit", "--quiet", "-m", "glib: init at 2.78.4")
+    (tmp_path / "default.nix").write_text(GLIB_NEW)
+    git(tmp_path, "commit", "--quiet", "--all", "-m", "glib: 2.78.4 → 2.80.0")
+
+    repo = Ggit.Repository.open(Gio.File.new_for_path(str(tmp_path)))
+    commit = repo.lookup_commit(repo.get_head().get_target())
+    assert extract_version_bump(repo, commit) == VersionBump(old="2.78.4", new="2.80.0")